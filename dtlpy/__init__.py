@@ -13,6 +13,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with DTLPY.  If not, see <http://www.gnu.org/licenses/>.
+import importlib
 import warnings
 import logging
 import sys
@@ -60,7 +61,7 @@ from .services import DataloopLogger, DtlpyFilter, check_sdk, Reporter, service_
 from .services.api_reference import api_reference as _api_reference
 from .caches.cache import CacheConfig, CacheType
 from .exceptions import PlatformException
-from . import repositories, exceptions, entities, examples
+from . import repositories, exceptions, entities
 from .entities import (
     # main entities
     Project, Dataset, ExpirationOptions, ExportVersion, Trigger, Item, Execution, AnnotationCollection, Annotation,
@@ -112,7 +113,6 @@ from .entities import (
     # V3 Export
     DatasetExportVersion, ExportMode, ExportManifest, ExportPartition, ExportFile, ExportStatistics
 )
-from .ml import BaseModelAdapter
 from .utilities import Converter, BaseServiceRunner, Progress, Context, AnnotationFormat
 from .repositories import FUNCTION_END_LINE, PackageCatalog
 
@@ -195,6 +195,27 @@ attributes_mode = client_api.attributes_mode
 sdk_cache = client_api.sdk_cache
 
 
+# heavy sub packages - imported on first access (PEP 562)
+_LAZY_ATTRIBUTES = {'ml': ('.ml', None),
+                    'examples': ('.examples', None),
+                    'BaseModelAdapter': ('.ml', 'BaseModelAdapter')}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name, package=__name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
 def get_secret(secret):
     return os.environ.get(secret, None)
 
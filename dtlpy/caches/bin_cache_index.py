@@ -0,0 +1,167 @@
+import threading
+import sqlite3
+import logging
+import json
+import time
+import os
+
+logger = logging.getLogger(name='dtlpy')
+
+
+class BinaryCacheIndex:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_last_access ON files (last_access);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('size', 0);
+        CREATE TRIGGER IF NOT EXISTS files_insert AFTER INSERT ON files BEGIN
+            UPDATE meta SET value = value + NEW.size WHERE key = 'size';
+        END;
+        CREATE TRIGGER IF NOT EXISTS files_delete AFTER DELETE ON files BEGIN
+            UPDATE meta SET value = value - OLD.size WHERE key = 'size';
+        END;
+        CREATE TRIGGER IF NOT EXISTS files_update AFTER UPDATE OF size ON files BEGIN
+            UPDATE meta SET value = value - OLD.size + NEW.size WHERE key = 'size';
+        END;
+    """
+
+    def __init__(self, cache_path, eviction_batch=500):
+        """
+        LRU index of the binary cache files, stored in a SQLite db next to the files.
+        Access time and total size are kept in indexed tables so a cache hit is a single row update,
+        and WAL mode + busy timeout make it safe to share between processes.
+
+        :param str cache_path: binary cache directory
+        :param int eviction_batch: number of files to remove in each eviction transaction
+        """
+        self.cache_path = cache_path
+        self.db_path = os.path.join(cache_path, 'cacheIndex.db')
+        self.eviction_batch = eviction_batch
+        self._local = threading.local()
+        self._pid = os.getpid()
+        os.makedirs(cache_path, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+        self._migrate_config_file()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        sqlite connections can't be shared between threads or forked processes - one per thread
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _migrate_config_file(self):
+        """
+        Import the keys of the old json index (kept in LRU order) and remove it
+        """
+        config_file_path = os.path.join(self.cache_path, 'cacheConfig.json')
+        if not os.path.isfile(config_file_path):
+            return
+        try:
+            with open(config_file_path, mode="r", encoding="utf-8") as f:
+                keys = json.loads(f.read().replace("'", '"')).get('keys', list())
+            now = time.time()
+            rows = list()
+            for i_key, filepath in enumerate(keys):
+                if os.path.isfile(filepath):
+                    rows.append((filepath, os.path.getsize(filepath), now - len(keys) + i_key))
+            self._upsert(rows=rows)
+            os.remove(config_file_path)
+        except Exception as e:
+            logger.warning('Failed to migrate binary cache config file: {}'.format(e))
+
+    def _upsert(self, rows):
+        with self._connection() as conn:
+            conn.executemany('INSERT INTO files (path, size, last_access) VALUES (?, ?, ?) '
+                             'ON CONFLICT(path) DO UPDATE SET size=excluded.size, last_access=excluded.last_access',
+                             rows)
+
+    def add(self, filepath: str, size: int):
+        """
+        Add (or update) a file in the index and mark it as the most recently used
+
+        :param str filepath: cached file path
+        :param int size: file size in bytes
+        """
+        self._upsert(rows=[(filepath, int(size), time.time())])
+
+    def touch(self, filepath: str):
+        """
+        Mark a file as the most recently used
+
+        :param str filepath: cached file path
+        :return: True if the file is in the index
+        """
+        with self._connection() as conn:
+            cursor = conn.execute('UPDATE files SET last_access = ? WHERE path = ?', (time.time(), filepath))
+        return cursor.rowcount > 0
+
+    def remove(self, filepath: str):
+        """
+        Remove a file from the index (the file itself is not deleted)
+
+        :param str filepath: cached file path
+        """
+        with self._connection() as conn:
+            conn.execute('DELETE FROM files WHERE path = ?', (filepath,))
+
+    @property
+    def size(self) -> int:
+        """
+        Total size in bytes of the indexed files
+        """
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'size'").fetchone()
+        return row[0] if row is not None else 0
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def evict(self, target_size: int) -> int:
+        """
+        Remove the least recently used files until the total size is at most target_size
+
+        :param int target_size: size in bytes to keep
+        :return: number of bytes freed
+        """
+        freed = 0
+        while True:
+            excess = self.size - target_size
+            if excess <= 0:
+                break
+            rows = self._connection().execute('SELECT path, size FROM files ORDER BY last_access LIMIT ?',
+                                              (self.eviction_batch,)).fetchall()
+            if len(rows) == 0:
+                break
+            to_remove = list()
+            for filepath, size in rows:
+                if excess <= 0:
+                    break
+                try:
+                    os.remove(filepath)
+                except FileNotFoundError:
+                    # already removed (by another process or the cache cleaner)
+                    pass
+                except OSError as e:
+                    logger.warning('Failed to remove cached file {}: {}'.format(filepath, e))
+                to_remove.append((filepath,))
+                excess -= size
+                freed += size
+            with self._connection() as conn:
+                conn.executemany('DELETE FROM files WHERE path = ?', to_remove)
+        return freed
@@ -0,0 +1,216 @@
+import threading
+import hashlib
+import logging
+import shutil
+import os
+
+from .bin_cache_index import BinaryCacheIndex
+
+try:
+    import fcntl
+except ImportError:
+    # not available on windows - no reflinks
+    fcntl = None
+
+logger = logging.getLogger(name='dtlpy')
+
+# linux ioctl to clone a file (copy on write) on btrfs, xfs, etc
+_FICLONE = 0x40049409
+
+
+def _reflink(source, target):
+    if fcntl is None:
+        raise OSError('reflink is not supported on this platform')
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+class BlobStore:
+    LINK_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+    # item fields of the content hash - the first that exists is used
+    HASH_FIELDS = (('metadata', 'system', 'md5'), ('metadata', 'system', 'hash'), ('hash',))
+
+    def __init__(self, path, max_size=0, link_mode='auto'):
+        """
+        Local content-addressed store of the items binaries, keyed by the item content hash and size.
+        Items with the same content (e.g cloned datasets) are downloaded once and linked to every download path.
+
+        Link modes:
+         - auto: reflink (copy on write) if the filesystem supports it, otherwise copy
+         - reflink: same as auto
+         - hardlink: hardlink, otherwise copy (e.g different devices)
+         - copy: always copy
+
+        Hardlinked files share the content with the store - they must not be modified in place.
+        The blobs size is checked against the item size - a blob that was changed is dropped.
+
+        :param str path: store directory
+        :param int max_size: max size of the store in MB. 0 for no limit
+        :param str link_mode: how to link the blobs to the download paths
+        """
+        if link_mode not in self.LINK_MODES:
+            raise ValueError('Unknown link mode: {}. must be one of: {}'.format(link_mode, self.LINK_MODES))
+        self.path = path
+        self.max_size = max_size
+        self.link_mode = link_mode
+        self.index = BinaryCacheIndex(cache_path=path)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def item_size(item):
+        """
+        Item binary size from the platform metadata
+
+        :param dtlpy.entities.item.Item item: item entity
+        :return: size in bytes, or None
+        """
+        return (item.metadata or dict()).get('system', dict()).get('size')
+
+    @classmethod
+    def key(cls, item):
+        """
+        Content key of an item - by its platform hash and size
+
+        :param dtlpy.entities.item.Item item: item entity
+        :return: key, or None if the item has no hash
+        """
+        _json = dict(item._platform_dict or dict(), metadata=item.metadata)
+        content_hash = None
+        for field in cls.HASH_FIELDS:
+            value = _json
+            for key in field:
+                value = value.get(key) if isinstance(value, dict) else None
+            if value:
+                content_hash = value
+                break
+        size = cls.item_size(item)
+        if content_hash is None or size is None:
+            return None
+        return hashlib.sha256('{}:{}'.format(content_hash, size).encode('utf-8')).hexdigest()
+
+    def blob_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def _link(self, source, target):
+        if self.link_mode in ['auto', 'reflink']:
+            try:
+                _reflink(source, target)
+                return
+            except OSError:
+                if os.path.isfile(target):
+                    os.remove(target)
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, target)
+
+    def _temp_path(self, filepath):
+        return '{}.{}.{}.tmp'.format(filepath, os.getpid(), threading.get_ident())
+
+    def _drop(self, blob_path):
+        logger.warning('Blob store: {} was changed - removing it from the store'.format(blob_path))
+        try:
+            os.remove(blob_path)
+        except OSError:
+            pass
+        self.index.remove(filepath=blob_path)
+
+    def get(self, key, size=None):
+        """
+        Get the blob path of a key
+
+        :param str key: content key
+        :param int size: expected size in bytes. a blob of another size is dropped
+        :return: the blob path or None
+        """
+        blob_path = self.blob_path(key)
+        if not os.path.isfile(blob_path):
+            return None
+        blob_size = os.path.getsize(blob_path)
+        if size is not None and blob_size != size:
+            self._drop(blob_path)
+            return None
+        if not self.index.touch(filepath=blob_path):
+            self.index.add(filepath=blob_path, size=blob_size)
+        return blob_path
+
+    def add(self, key, filepath, size=None):
+        """
+        Add a downloaded file to the store
+
+        :param str key: content key
+        :param str filepath: downloaded file
+        :param int size: expected size in bytes. a file of another size is not added
+        """
+        if size is not None and os.path.getsize(filepath) != size:
+            logger.debug('Blob store: {} size does not match the item size - not added'.format(filepath))
+            return
+        if self.get(key, size=size) is not None:
+            return
+        blob_path = self.blob_path(key)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = self._temp_path(blob_path)
+        try:
+            self._link(source=filepath, target=temp_path)
+            os.replace(temp_path, blob_path)
+        finally:
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+        self.index.add(filepath=blob_path, size=os.path.getsize(blob_path))
+        max_size = self.max_size * 1000000
+        if 0 < max_size < self.index.size:
+            # remove 30% of the store (least recently used first). linked files are not affected
+            self.index.evict(target_size=0.7 * max_size)
+
+    def materialize(self, key, filepath, size=None):
+        """
+        Link a blob to a download path (replaces an existing file)
+
+        :param str key: content key
+        :param str filepath: target file path
+        :param int size: expected size in bytes. a blob of another size is dropped
+        :return: True if the blob is in the store and was linked
+        """
+        blob_path = self.get(key, size=size)
+        if blob_path is None:
+            with self._stats_lock:
+                self.misses += 1
+            return False
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = self._temp_path(filepath)
+        try:
+            self._link(source=blob_path, target=temp_path)
+            os.replace(temp_path, filepath)
+        except OSError as e:
+            # e.g evicted by another process
+            logger.debug('Failed to link blob {} to {}: {}'.format(blob_path, filepath, e))
+            with self._stats_lock:
+                self.misses += 1
+            return False
+        finally:
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+        size = os.path.getsize(filepath)
+        with self._stats_lock:
+            self.hits += 1
+            self.bytes_saved += size
+        return True
+
+    def stats(self):
+        """
+        Store statistics
+
+        :return: dict of hits, misses, bytes saved (not downloaded), blobs and bytes in the store
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'bytes_saved': self.bytes_saved,
+                'blobs': len(self.index),
+                'bytes': self.index.size}
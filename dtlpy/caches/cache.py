@@ -4,13 +4,11 @@ import shutil
 import time
 from enum import Enum
 from pathlib import Path
-import mmap
-from filelock import FileLock
 import logging
 import base64
 
-from .dl_cache import DiskCache
-from .redis_cache import RedisCache
+from .bin_cache_index import BinaryCacheIndex
+from .memory_cache import MemoryCache
 from .filesystem_cache import FileSystemCache
 
 logger = logging.getLogger(name='dtlpy')
@@ -130,18 +128,27 @@ class CacheKey:
 
 
 class CacheManger:
-    def __init__(self, cache_configs: list, bin_cache_size=1000):
+    def __init__(self, cache_configs: list, bin_cache_size=1000,
+                 memory_cache_items=1000, memory_cache_size=64, memory_cache_ttl=60):
         """
         Cache manger for config and mange the cache
 
         :param cache_configs: CacheConfig object
         :param bin_cache_size: size on MB for binary cache
-        """
+        :param memory_cache_items: max number of entities in the in-process (level 0) cache. 0 to disable
+        :param memory_cache_size: size on MB for the in-process (level 0) cache
+        :param memory_cache_ttl: time to hold an entity in the in-process (level 0) cache in seconds
+        """
+        self.memory_cache = None
+        if memory_cache_items > 0:
+            self.memory_cache = MemoryCache(max_items=memory_cache_items,
+                                            max_bytes=memory_cache_size * 1000000,
+                                            ttl=memory_cache_ttl)
         self.cache_levels = dict()
         self._max_level = 1
         self.bin_cache_size = bin_cache_size
         self.bin_cache_path = os.environ['DEFAULT_CACHE_PATH']
-        self._current_bin_cache_size = 0
+        self._bin_index = None
         for config in cache_configs:
             try:
                 self.cache_levels[config.level] = self._load_cache_handler(config)
@@ -163,6 +170,20 @@ class CacheManger:
             "services": 'packages',
         }
 
+    @property
+    def bin_index(self) -> BinaryCacheIndex:
+        """
+        LRU index of the binary cache files
+        """
+        if self._bin_index is None:
+            self._bin_index = BinaryCacheIndex(cache_path=self.bin_cache_path)
+        return self._bin_index
+
+    def _remove_binary(self, filepath):
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+        self.bin_index.remove(filepath)
+
     def _load_cache_handler(self, config: CacheConfig):
         """
         the function the build the cache form the configs that get
@@ -171,12 +192,14 @@ class CacheManger:
         cache = None
         if config.type == CacheType.REDIS.value:
             try:
+                from .redis_cache import RedisCache
                 cache = RedisCache(options=config.options, ttl=config.ttl)
             except:
                 logger.warning("Failed to build Redis")
                 raise Exception("Failed to build Redis")
 
         elif config.type == CacheType.DISKCACHE.value:
+            from .dl_cache import DiskCache
             cache = DiskCache(name='object_cache', options=config.options, ttl=config.ttl)
         elif config.type == CacheType.FILESYSTEM.value:
             cache = FileSystemCache(options=config.options, ttl=config.ttl)
@@ -195,10 +218,16 @@ class CacheManger:
         """
         res = []
         success = False
+        if self.memory_cache is not None:
+            res = self.memory_cache.get(key=key.get_key())
+            if res:
+                return True, res
         for i in range(1, self._max_level + 1):
             res = self.cache_levels[i].get(key=key.get_key())
             if res:
                 success = True
+                if self.memory_cache is not None:
+                    self.memory_cache.set(key=key.get_key(), value=res)
                 break
         return success, res
 
@@ -220,8 +249,13 @@ class CacheManger:
         :param CacheKey key: CacheKey object
         :param value: value to set
         """
+        memory_value = value
         if isinstance(value, dict):
             value = json.dumps(value)
+            # keep a private copy - the caller may still change the dict it passed
+            memory_value = json.loads(value)
+        if self.memory_cache is not None:
+            self.memory_cache.set(key=key, value=memory_value, size=len(value) if isinstance(value, str) else None)
         self.cache_levels[1].set(key, value)
 
     def _delete_parent(self, key: CacheKey, level):
@@ -233,16 +267,28 @@ class CacheManger:
         for k in list_keys:
             if 'binary' in k:
                 val = self.cache_levels[level].get(key=k)
-                if os.path.isfile(val):
-                    os.remove(val)
+                self._remove_binary(filepath=val)
             self.cache_levels[level].delete(k)
 
+    def _delete_memory(self, key: CacheKey):
+        if self.memory_cache is None:
+            return
+        self.memory_cache.delete(key.get_key())
+        for pattern in [CacheKey(entity_type=key.entity_type, entity_id=key.entity_id, object_type='*').get_key(),
+                        CacheKey(master_type=self.parent_dict.get(key.entity_type, '**'),
+                                 entity_type=key.entity_type,
+                                 entity_id=key.entity_id,
+                                 object_type='*').get()]:
+            for k in self.memory_cache.list(pattern=pattern):
+                self.memory_cache.delete(k)
+
     def delete(self, key: CacheKey):
         """
         Cache delete
 
         :param CacheKey key: CacheKey object
         """
+        self._delete_memory(key=key)
         for i in range(1, self._max_level + 1):
             self.cache_levels[i].delete(key.get_key())
             self._delete_parent(key=key, level=i)
@@ -251,9 +297,10 @@ class CacheManger:
             for k in list_keys:
                 val = self.cache_levels[i].get(key=k)
                 self.cache_levels[i].delete(k)
+                if self.memory_cache is not None:
+                    self.memory_cache.delete(k)
                 if 'binary' in k:
-                    if os.path.isfile(val):
-                        os.remove(val)
+                    self._remove_binary(filepath=val)
                     continue
                 e_type, e_id, e_obj = val.split('\\')
                 self.delete(key=CacheKey(entity_type=e_type, entity_id=e_id, object_type=e_obj))
@@ -288,71 +335,13 @@ class CacheManger:
 
         return CacheKey(master_type=master_type, master_id=master_id, entity_type=entity_type, entity_id=entity_id)
 
-    def _update_config_file(self, filepath: str, update: bool, size: float = 0):
-        """
-        Update the config file the have all the details about binary cache
-
-        :param str filepath: path of the file the work on
-        :param bool update: if True update the use of the file
-        :param int size: file size
-        """
-        config_file_path = os.path.join(self.bin_cache_path, 'cacheConfig.json')
-        if os.path.isfile(config_file_path):
-            with FileLock(config_file_path + ".lock"):
-                with open(config_file_path, mode="r", encoding="utf-8") as con:
-                    with mmap.mmap(con.fileno(), length=0, access=mmap.ACCESS_READ) as mmap_obj:
-                        text = mmap_obj.read().decode('utf8').replace("'", '"')
-                        config_file = json.loads(text)
-        else:
-            config_file = {'size': 0, 'keys': []}
-
-        if update and filepath in config_file['keys']:
-            config_file['keys'].remove(filepath)
-
-        if filepath not in config_file['keys']:
-            config_file['keys'].append(filepath)
-        config_file['size'] += size
-        self._current_bin_cache_size = config_file['size']
-        json_object = json.dumps(config_file, indent=4)
-        with FileLock(config_file_path + ".lock"):
-            with open(config_file_path, mode="w", encoding="utf-8") as outfile:
-                outfile.write(json_object)
-
-    def _lru_cache(self):
-        """
-        Make lru on the binary cache remove 30% of the files
-        """
-        config_file_path = os.path.join(self.bin_cache_path, 'cacheConfig.json')
-        with FileLock(config_file_path + ".lock"):
-            with open(config_file_path, mode="r", encoding="utf-8") as con:
-                with mmap.mmap(con.fileno(), length=0, access=mmap.ACCESS_READ) as mmap_obj:
-                    text = mmap_obj.read().decode('utf8').replace("'", '"')
-                    config_file = json.loads(text)
-
-        size = config_file['size']
-        end = 70 / 100 * self.bin_cache_size
-
-        while size > end and len(config_file['keys']) > 1:
-            to_delete = config_file['keys'][0]
-
-            size -= (Path(to_delete).stat().st_size / 1000000)
-            os.remove(to_delete)
-            config_file['keys'].remove(to_delete)
-
-        config_file['size'] = size
-        json_object = json.dumps(config_file, indent=4)
-
-        with FileLock(config_file_path + ".lock"):
-            with open(config_file_path, "w") as outfile:
-                outfile.write(json_object)
-
     def read_stream(self, request_path, dataset_id=None):
         """
         Cache binary get
 
         :param str request_path: the request
         :param str dataset_id: dataset id of the binary object
-        :return: success, list of the get result
+        :return: success, the cached file path
         """
         entity_id = request_path.split('/')[-2]
         key = CacheKey(master_type='datasets',
@@ -360,11 +349,24 @@ class CacheManger:
                        entity_id=entity_id,
                        entity_type='items',
                        object_type=ObjectType.BINARY.value)
-        hit, response = self.get(key=key)
+        # binary keys are set with the full (master) key - see write_stream
+        hit, response = False, None
+        for i in range(1, self._max_level + 1):
+            response = self.cache_levels[i].get(key=key.get())
+            if response:
+                hit = True
+                break
         if hit:
-            source_path = os.path.normpath(response[0])
-            self._update_config_file(filepath=source_path, update=True)
-            return hit, [source_path]
+            if isinstance(response, list):
+                response = response[0]
+            source_path = os.path.normpath(response)
+            if not os.path.isfile(source_path):
+                # already evicted from the binary cache
+                return False, None
+            if not self.bin_index.touch(filepath=source_path):
+                # file is cached but missing from the index
+                self.bin_index.add(filepath=source_path, size=os.path.getsize(source_path))
+            return hit, source_path
         else:
             return False, None
 
@@ -397,9 +399,11 @@ class CacheManger:
         filepath = self.bin_cache_path
         if file_name is None:
             file_name = (dict(response.headers)['Content-Disposition'].split('=')[1][2:-1])
+        # by item id - items with the same filename don't collide
         filepath = os.path.join(
             filepath,
             'items',
+            entity_id,
             file_name
         )
         self.set(key=key.get(), value=filepath)
@@ -423,9 +427,11 @@ class CacheManger:
                 else:
                     with open(filepath, "wb") as f:
                         f.write(buffer.getbuffer())
-        self._update_config_file(filepath=filepath, update=False, size=(Path(filepath).stat().st_size / 1000000))
-        if (Path(filepath).stat().st_size / 1000000) + self._current_bin_cache_size > self.bin_cache_size:
-            self._lru_cache()
+        self.bin_index.add(filepath=filepath, size=Path(filepath).stat().st_size)
+        max_size = self.bin_cache_size * 1000000
+        if self.bin_index.size > max_size:
+            # remove 30% of the cache (least recently used first)
+            self.bin_index.evict(target_size=0.7 * max_size)
         return filepath
 
     def read(self, request_path: str):
@@ -467,7 +473,19 @@ class CacheManger:
         self.delete(key)
 
     def clear(self):
+        if self.memory_cache is not None:
+            self.memory_cache.clear()
         self.cache_levels[1].clear()
 
+    def stats(self):
+        """
+        Statistics of the in-process (level 0) cache
+
+        :return: dict of hits, misses, evictions, expirations, items and bytes
+        """
+        if self.memory_cache is None:
+            return dict()
+        return self.memory_cache.stats()
+
     def keys(self):
         return [k for k in self.cache_levels[1].keys()]
@@ -37,8 +37,7 @@ class DiskCache(BaseCache):
         """
         if not isinstance(key, str) and not isinstance(key, int):
             raise ValueError("key must be string or int")
-        with Cache(self.cache.directory, disk=JSONDisk) as reference:
-            reference.set(key=key, value=value, expire=self.ttl)
+        self.cache.set(key=key, value=value, expire=self.ttl)
 
     def _key_fix(self, key):
         if '**' in key:
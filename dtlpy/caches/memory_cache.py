@@ -0,0 +1,126 @@
+import threading
+import fnmatch
+import time
+from collections import OrderedDict
+
+from .base_cache import BaseCache
+
+
+class MemoryCache(BaseCache):
+    def __init__(self, max_items=1000, max_bytes=64 * 1024 * 1024, ttl=60):
+        """
+        In-process LRU cache, bounded by number of items, approximate size and ttl.
+        Values are returned as stored (not copied) - callers must not change them.
+
+        :param int max_items: maximum number of keys
+        :param int max_bytes: maximum total size of the values (approximate, in bytes)
+        :param int ttl: time to hold a key in seconds
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _pop(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def set(self, key, value, size=None):
+        """
+        set or add a key and value to the cache
+        :param key: str type of key
+        :param value: any value
+        :param size: size of the value in bytes. default: length of the value
+        :return:
+        """
+        if size is None:
+            try:
+                size = len(value)
+            except TypeError:
+                size = 0
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._data) > self.max_items or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def get(self, key):
+        """
+        get the value of the key from the cache
+        :param key: str type of key
+        :return: the value of the key or None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expire_at, _ = entry
+            if expire_at < time.monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def delete(self, key):
+        """
+        delete the element from the cache
+        :param key: str type of key
+        :return:
+        """
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def list(self, pattern):
+        """
+        list the keys matching a glob pattern ('*' and '**' match any sub string)
+        :param pattern: glob pattern
+        :return: list of keys
+        """
+        with self._lock:
+            return [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+
+    def keys(self):
+        """
+        return all the cache keys
+        :return: list of the keys
+        """
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def ping(self):
+        return True
+
+    def stats(self):
+        """
+        Cache statistics
+
+        :return: dict of hits, misses, evictions, expirations, current items and bytes
+        """
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'items': len(self._data),
+                    'bytes': self._bytes}
@@ -29,6 +29,7 @@ from .annotation import Annotation, FrameAnnotation, ViewAnnotationOptions, Anno
     ExportVersion
 from .annotation_collection import AnnotationCollection
 from .paged_entities import PagedEntities
+from .entity_view import EntityView
 from .filters import Filters, FiltersKnownFields, FiltersResource, FiltersOperations, FiltersMethod, \
     FiltersOrderByDirection
 from .recipe import Recipe
@@ -728,6 +728,33 @@ class Annotation(entities.BaseEntity):
                             annotation_format=dl.VIEW_ANNOTATION_OPTIONS_MASK,
                             )
         """
+        return self._show(image=image,
+                          thickness=thickness,
+                          with_text=with_text,
+                          height=height,
+                          width=width,
+                          annotation_format=annotation_format,
+                          color=color,
+                          label_instance_dict=label_instance_dict,
+                          alpha=alpha,
+                          frame_num=frame_num)
+
+    def _show(self,
+              image=None,
+              thickness=None,
+              with_text=False,
+              height=None,
+              width=None,
+              annotation_format: ViewAnnotationOptions = ViewAnnotationOptions.MASK,
+              color=None,
+              label_instance_dict=None,
+              alpha=1,
+              frame_num=None,
+              inplace=False):
+        """
+        See `show`. With inplace=True the annotation is drawn on the input image (with opacity - only the annotation
+        region is blended), so drawing many annotations doesn't copy the image for each one
+        """
         try:
             import cv2
         except (ImportError, ModuleNotFoundError):
@@ -787,7 +814,8 @@ class Annotation(entities.BaseEntity):
                                             width=width,
                                             annotation_format=annotation_format,
                                             color=color,
-                                            label_instance_dict=label_instance_dict)
+                                            label_instance_dict=label_instance_dict,
+                                            inplace=inplace)
         return image
 
     def _show_single_frame(self,
@@ -799,7 +827,8 @@ class Annotation(entities.BaseEntity):
                            annotation_format: ViewAnnotationOptions = ViewAnnotationOptions.MASK,
                            color=None,
                            label_instance_dict=None,
-                           alpha=None):
+                           alpha=None,
+                           inplace=False):
         """
         Show annotations
         mark the annotation of the single frame array and return it
@@ -812,6 +841,7 @@ class Annotation(entities.BaseEntity):
         :param color: optional - color tuple
         :param label_instance_dict: the instance labels
         :param alpha: opacity value [0 1], default 1
+        :param inplace: draw on the input image
         :return: ndarray of the annotations
         """
         try:
@@ -877,6 +907,9 @@ class Annotation(entities.BaseEntity):
                                         message='unknown annotations format: {}. known formats: "{}"'.format(
                                             annotation_format, '", "'.join(list(entities.ViewAnnotationOptions))))
 
+        kwargs = dict()
+        if inplace and isinstance(self.annotation_definition, (entities.Box, entities.Polygon, entities.Segmentation)):
+            kwargs['inplace'] = True
         return self.annotation_definition.show(image=image,
                                                thickness=thickness,
                                                with_text=with_text,
@@ -884,7 +917,8 @@ class Annotation(entities.BaseEntity):
                                                width=width,
                                                annotation_format=annotation_format,
                                                color=color,
-                                               alpha=alpha)
+                                               alpha=alpha,
+                                               **kwargs)
 
     def _get_color_for_show(self, annotation_format, alpha=1, label_instance_dict=None):
         if annotation_format == entities.ViewAnnotationOptions.MASK:
@@ -200,6 +200,19 @@ class AnnotationCollection(entities.BaseEntity):
                 'Import Error! Cant import cv2. Annotations operations will be limited. import manually and fix errors')
             raise
 
+        return self._show_annotations(annotations=self._binaries_first(),
+                                      image=image,
+                                      thickness=thickness,
+                                      with_text=with_text,
+                                      height=height,
+                                      width=width,
+                                      annotation_format=annotation_format,
+                                      label_instance_dict=label_instance_dict,
+                                      color=color,
+                                      alpha=alpha,
+                                      frame_num=frame_num)
+
+    def _binaries_first(self):
         # split the annotations to binary and not binary to put the binaries first
         segment_annotations = list()
         rest_annotations = list()
@@ -208,20 +221,37 @@ class AnnotationCollection(entities.BaseEntity):
                 segment_annotations.append(annotation)
             else:
                 rest_annotations.append(annotation)
-        all_annotations = segment_annotations + rest_annotations
+        return segment_annotations + rest_annotations
+
+    @staticmethod
+    def _show_annotations(annotations,
+                          image,
+                          thickness,
+                          with_text,
+                          height,
+                          width,
+                          annotation_format,
+                          label_instance_dict,
+                          color,
+                          alpha,
+                          frame_num):
+        if image is not None and alpha != 1:
+            # the annotations are drawn in place - keep the input image
+            image = image.copy()
         # gor over all annotations and put the id where the annotations are
-        for annotation in all_annotations:
-            # get the mask of the annotation
-            image = annotation.show(thickness=thickness,
-                                    with_text=with_text,
-                                    height=height,
-                                    width=width,
-                                    label_instance_dict=label_instance_dict,
-                                    annotation_format=annotation_format,
-                                    image=image,
-                                    alpha=alpha,
-                                    color=color,
-                                    frame_num=frame_num)
+        for annotation in annotations:
+            # get the mask of the annotation (all drawn on the same image)
+            image = annotation._show(thickness=thickness,
+                                     with_text=with_text,
+                                     height=height,
+                                     width=width,
+                                     label_instance_dict=label_instance_dict,
+                                     annotation_format=annotation_format,
+                                     image=image,
+                                     alpha=alpha,
+                                     color=color,
+                                     frame_num=frame_num,
+                                     inplace=True)
         return image
 
     def _video_maker(self,
@@ -268,23 +298,44 @@ class AnnotationCollection(entities.BaseEntity):
         else:
             reader = None
 
+        # sweep the frames and draw only the annotations that are in range of the frame (instead of all of them)
+        all_annotations = self._binaries_first()
+        starts = dict()
+        ends = dict()
+        for i_annotation, annotation in enumerate(all_annotations):
+            if annotation.is_video:
+                first, last = annotation.frames.start, annotation.frames._last()
+            else:
+                first, last = 0, nb_frames
+            starts.setdefault(max(first, 0), list()).append(i_annotation)
+            ends.setdefault(last, list()).append(i_annotation)
+        active = set()
         for frame_num in range(nb_frames):
+            active.update(starts.get(frame_num, list()))
             if reader is not None:
                 ret, frame = reader.read()
                 frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
             else:
                 frame = None
-            frame = self.show(image=frame,
-                              annotation_format=annotation_format,
-                              thickness=thickness,
-                              alpha=alpha,
-                              height=height,
-                              width=width,
-                              with_text=with_text,
-                              frame_num=frame_num)
+            in_range = sorted(active)
+            if frame is None and len(all_annotations) > 0 and (len(in_range) == 0 or in_range[0] != 0):
+                # the first annotation creates the empty mask (even if not in range)
+                in_range.insert(0, 0)
+            frame = self._show_annotations(annotations=[all_annotations[i] for i in in_range],
+                                           image=frame,
+                                           annotation_format=annotation_format,
+                                           thickness=thickness,
+                                           alpha=alpha,
+                                           height=height,
+                                           width=width,
+                                           with_text=with_text,
+                                           label_instance_dict=None,
+                                           color=None,
+                                           frame_num=frame_num)
             if is_color:
                 frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
             writer.write(frame)
+            active.difference_update(ends.get(frame_num, list()))
         writer.release()
         if reader is not None:
             reader.release()
@@ -95,6 +95,84 @@ class BaseAnnotationDefinition:
                            fontScale=1,
                            thickness=2)
 
+    @staticmethod
+    def _blend_region(image, overlay, region, alpha):
+        """
+        Blend an overlay of a region into the image (in place) - only the region is blended, not the whole image
+
+        :param image: image to draw on
+        :param overlay: the region of the image with the annotation drawn on it
+        :param region: (left, top, right, bottom) of the region in the image
+        :param alpha: opacity value [0 1]
+        :return: the image
+        """
+        import cv2
+        left, top, right, bottom = region
+        image[top:bottom, left:right] = cv2.addWeighted(src1=overlay,
+                                                        alpha=alpha,
+                                                        src2=image[top:bottom, left:right],
+                                                        beta=1 - alpha,
+                                                        gamma=0)
+        return image
+
+    @staticmethod
+    def _contour_region(image, points, thickness):
+        """
+        Region of the image that a contour drawing can change (bounding box of the points with the line thickness)
+
+        :return: (left, top, right, bottom) or None if the drawing is outside the image
+        """
+        if len(points) == 0:
+            return None
+        height, width = image.shape[:2]
+        margin = max(thickness, 1) + 2
+        left = max(int(points[:, 0].min()) - margin, 0)
+        top = max(int(points[:, 1].min()) - margin, 0)
+        right = min(int(points[:, 0].max()) + margin + 1, width)
+        bottom = min(int(points[:, 1].max()) + margin + 1, height)
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right, bottom
+
+    def _show_contour(self, image, points, color, thickness, alpha, inplace, line_type=None):
+        """
+        Draw a contour with opacity. The image is copied once (unless inplace) and only the region of the contour
+        is blended
+
+        :param image: image to draw on
+        :param points: contour points (N, 2)
+        :param color: color
+        :param thickness: line thickness (-1 to fill)
+        :param alpha: opacity value [0 1]
+        :param inplace: draw on the input image
+        :param line_type: optional - opencv line type
+        :return: ndarray
+        """
+        import cv2
+        kwargs = dict() if line_type is None else {'lineType': line_type}
+        if alpha != 1 and not inplace:
+            image = image.copy()
+        if not isinstance(color, int) and len(color) == 4 and color[3] != 255:
+            # add with opacity
+            region = self._contour_region(image=image, points=points, thickness=thickness)
+            if region is not None:
+                left, top, right, bottom = region
+                overlay = cv2.drawContours(image=image[top:bottom, left:right].copy(),
+                                           contours=[points - np.array([left, top])],
+                                           contourIdx=-1,
+                                           color=color,
+                                           thickness=thickness,
+                                           **kwargs)
+                image = self._blend_region(image=image, overlay=overlay, region=region, alpha=alpha)
+        else:
+            image = cv2.drawContours(image=image,
+                                     contours=[points],
+                                     contourIdx=-1,
+                                     color=color,
+                                     thickness=thickness,
+                                     **kwargs)
+        return image
+
     @property
     def logger(self):
         return logger
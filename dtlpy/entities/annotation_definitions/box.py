@@ -62,7 +62,7 @@ class Box(BaseAnnotationDefinition):
     def four_points(self):
         return [self.top_left, self.bottom_left, self.bottom_right, self.top_right]
 
-    def show(self, image, thickness, with_text, height, width, annotation_format, color, alpha=1):
+    def show(self, image, thickness, with_text, height, width, annotation_format, color, alpha=1, inplace=False):
         """
         Show annotation as ndarray
         :param image: empty or image to draw on
@@ -73,6 +73,7 @@ class Box(BaseAnnotationDefinition):
         :param annotation_format: options: list(dl.ViewAnnotationOptions)
         :param color: color
         :param alpha: opacity value [0 1], default 1
+        :param inplace: draw on the input image (otherwise it is copied when alpha is not 1)
         :return: ndarray
         """
         try:
@@ -86,33 +87,13 @@ class Box(BaseAnnotationDefinition):
             thickness = 2
 
         # draw annotation
-        points = self.four_points
-
-        # create image to draw on
-        if alpha != 1:
-            overlay = image.copy()
-        else:
-            overlay = image
-
-        # draw annotation
-        overlay = cv2.drawContours(
-            image=overlay,
-            contours=[np.round(points).astype(int)],
-            contourIdx=-1,
-            color=color,
-            thickness=thickness,
-            lineType=cv2.LINE_AA
-        )
-
-        if not isinstance(color, int) and len(color) == 4 and color[3] != 255:
-            # add with opacity
-            image = cv2.addWeighted(src1=overlay,
-                                    alpha=alpha,
-                                    src2=image,
-                                    beta=1 - alpha,
-                                    gamma=0)
-        else:
-            image = overlay
+        image = self._show_contour(image=image,
+                                   points=np.round(self.four_points).astype(int),
+                                   color=color,
+                                   thickness=thickness,
+                                   alpha=alpha,
+                                   inplace=inplace,
+                                   line_type=cv2.LINE_AA)
 
         if with_text:
             image = self.add_text_to_image(image=image, annotation=self)
@@ -1,5 +1,6 @@
 import numpy as np
 import base64
+import sys
 import io
 from PIL import Image
 
@@ -17,29 +18,137 @@ class Segmentation(BaseAnnotationDefinition):
 
     def __init__(self, geo: np.ndarray, label: str, attributes=None, description=None, color=None):
         super().__init__(description=description, attributes=attributes)
-        self._geo = geo
+        # the mask is kept cropped to its bounding box and expanded to the full image size only on `geo`
+        self._mask = None
+        self._mask_top = 0
+        self._mask_left = 0
+        self._shape = None
+        self._geo_dtype = float
+        # the full size mask that was returned by `geo` - it may be changed in place
+        self._geo = None
+        self._bounds = None
+        self._area = None
         self._coordinates = None
         self.label = label
         self._color = color
+        if geo is not None:
+            self._set_geo(geo)
+
+    def _set_geo(self, geo):
+        self._geo = None
+        self._bounds = None
+        self._area = None
+        if geo is None:
+            self._shape = None
+            self._geo_dtype = float
+            self._mask_top, self._mask_left = 0, 0
+            self._mask = None
+            return
+        self._crop(geo)
+
+    def _crop(self, geo):
+        geo = np.asarray(geo)
+        self._shape = geo.shape[:2]
+        self._geo_dtype = geo.dtype
+        self._bounds = None
+        self._area = None
+        rows = np.flatnonzero(geo.any(axis=1))
+        cols = np.flatnonzero(geo.any(axis=0))
+        if len(rows) == 0:
+            self._mask_top, self._mask_left = 0, 0
+            self._mask = np.zeros((0, 0), dtype=geo.dtype)
+        else:
+            self._mask_top, self._mask_left = int(rows[0]), int(cols[0])
+            self._mask = geo[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1].copy()
+
+    def _decode(self):
+        if self._geo is not None:
+            self._sync_geo()
+            if sys.getrefcount(self._geo) <= 2:
+                # no one else holds the full size mask - it can not be changed anymore
+                self._geo = None
+        elif self._mask is None and self._coordinates is not None:
+            shape, top, left, mask, color = self._decode_coordinates(self._coordinates)
+            self._shape = shape
+            self._mask_top, self._mask_left, self._mask = top, left, mask
+            self._geo_dtype = float
+            self._bounds = None
+            self._area = None
+            if self._color is None:
+                self._color = color
+
+    def _sync_geo(self):
+        """
+        Apply in place changes of the full size mask to the cropped mask. The caches are cleared only if it changed
+        """
+        geo = self._geo
+        rows = np.flatnonzero(geo.any(axis=1))
+        if len(rows) == 0:
+            if self._mask.size == 0:
+                return
+            top, left, mask = 0, 0, np.zeros((0, 0), dtype=geo.dtype)
+        else:
+            top = int(rows[0])
+            cols = np.flatnonzero(geo[top:rows[-1] + 1].any(axis=0))
+            left = int(cols[0])
+            mask = geo[top:rows[-1] + 1, left:cols[-1] + 1]
+            if (top, left) == (self._mask_top, self._mask_left) and np.array_equal(mask, self._mask):
+                return
+            mask = mask.copy()
+        self._mask_top, self._mask_left, self._mask = top, left, mask
+        self._bounds = None
+        self._area = None
+        self._coordinates = None
 
     @property
     def geo(self) -> np.ndarray:
+        """
+        Full size mask. Built from the cropped mask on the first call and kept - changes made to it in place
+        are applied to the annotation
+        """
         if self._geo is None:
-            self._geo = self.from_coordinates(self._coordinates)
-            if self._color is None:
-                color = None
-                fill_coordinates = self._geo.nonzero()
-                if len(fill_coordinates) > 0 and len(fill_coordinates[0]) > 0 and len(fill_coordinates[1]) > 0:
-                    color = self._geo[fill_coordinates[0][0]][fill_coordinates[1][0]]
-                self._color = color
-            self._geo = (self._geo[:, :, 3] > 127).astype(float)
+            self._decode()
+            if self._shape is None:
+                return None
+            geo = np.zeros(self._shape, dtype=self._geo_dtype)
+            height, width = self._mask.shape[:2]
+            geo[self._mask_top:self._mask_top + height, self._mask_left:self._mask_left + width] = self._mask
+            self._geo = geo
         return self._geo
 
     @geo.setter
     def geo(self, geo: np.ndarray):
-        self._geo = geo
+        self._set_geo(geo)
         self._coordinates = None
 
+    @property
+    def shape(self):
+        """
+        Full size mask shape (height, width)
+        """
+        self._decode()
+        return self._shape
+
+    @property
+    def cropped_mask(self):
+        """
+        The mask cropped to its bounding box, without expanding to the image size
+
+        :return: tuple of (left, top, mask)
+        """
+        self._decode()
+        return self._mask_left, self._mask_top, self._mask
+
+    @property
+    def area(self) -> int:
+        """
+        Number of pixels in the mask
+        """
+        self._decode()
+        if self._area is None:
+            self._area = int(np.count_nonzero(self._mask > 0)) if self._mask is not None else 0
+        return self._area
+
     @property
     def x(self):
         return
@@ -50,37 +159,41 @@ class Segmentation(BaseAnnotationDefinition):
 
     @property
     def pts(self):
-        return np.where(self.geo > 0)
+        self._decode()
+        rows, cols = np.where(self._mask > 0)
+        return rows + self._mask_top, cols + self._mask_left
+
+    def _get_bounds(self):
+        self._decode()
+        if self._bounds is None:
+            left, top, right, bottom = 0, 0, 0, 0
+            if self._mask is not None:
+                positive = self._mask > 0
+                rows = np.flatnonzero(positive.any(axis=1))
+                cols = np.flatnonzero(positive.any(axis=0))
+                if len(rows) > 0:
+                    top, bottom = self._mask_top + rows[0], self._mask_top + rows[-1]
+                    left, right = self._mask_left + cols[0], self._mask_left + cols[-1]
+            self._bounds = (left, top, right, bottom)
+        return self._bounds
 
     @property
     def left(self):
-        left = 0
-        if len(self.pts[1]) > 0:
-            left = np.min(self.pts[1])
-        return left
+        return self._get_bounds()[0]
 
     @property
     def top(self):
-        top = 0
-        if len(self.pts[0]) > 0:
-            top = np.min(self.pts[0])
-        return top
+        return self._get_bounds()[1]
 
     @property
     def right(self):
-        right = 0
-        if len(self.pts[1]) > 0:
-            right = np.max(self.pts[1])
-        return right
+        return self._get_bounds()[2]
 
     @property
     def bottom(self):
-        bottom = 0
-        if len(self.pts[0]) > 0:
-            bottom = np.max(self.pts[0])
-        return bottom
+        return self._get_bounds()[3]
 
-    def show(self, image, thickness, with_text, height, width, annotation_format, color, alpha=1):
+    def show(self, image, thickness, with_text, height, width, annotation_format, color, alpha=1, inplace=False):
         """
         Show annotation as ndarray
         :param image: empty or image to draw on
@@ -91,6 +204,7 @@ class Segmentation(BaseAnnotationDefinition):
         :param annotation_format: options: list(dl.ViewAnnotationOptions)
         :param color: color
         :param alpha: opacity value [0 1], default 1
+        :param inplace: draw on the input image (otherwise it is copied when alpha is not 1)
         :return: ndarray
         """
         try:
@@ -98,27 +212,29 @@ class Segmentation(BaseAnnotationDefinition):
         except (ImportError, ModuleNotFoundError):
             raise ImportError('opencv not found. Must install to perform this function')
 
-        if alpha != 1:
-            overlay = image.copy()
-        else:
-            overlay = image
+        if alpha != 1 and not inplace:
+            image = image.copy()
         if color is None:
             if self._color:
                 color = self._color
             else:
                 color = (255, 255, 255)
-        # draw annotation
-        overlay[np.where(self.geo)] = color
-
-        if not isinstance(color, int) and len(color) == 4 and color[3] != 255:
+        # draw annotation - only the mask bounding box
+        left, top, mask = self.cropped_mask
+        region = image[top:top + mask.shape[0], left:left + mask.shape[1]]
+        mask = mask[:region.shape[0], :region.shape[1]] != 0
+        if region.size == 0:
+            pass
+        elif not isinstance(color, int) and len(color) == 4 and color[3] != 255:
             # add with opacity
-            image = cv2.addWeighted(src1=overlay,
-                                    alpha=alpha,
-                                    src2=image,
-                                    beta=1 - alpha,
-                                    gamma=0)
+            overlay = region.copy()
+            overlay[mask] = color
+            image = self._blend_region(image=image,
+                                       overlay=overlay,
+                                       region=(left, top, left + region.shape[1], top + region.shape[0]),
+                                       alpha=alpha)
         else:
-            image = overlay
+            region[mask] = color
 
         if with_text:
             image = self.add_text_to_image(image=image, annotation=self)
@@ -132,6 +248,8 @@ class Segmentation(BaseAnnotationDefinition):
         :param color: color
         :return: coordinates
         """
+        # the full size mask may have been changed in place
+        self._decode()
         need_encode = False
         if color is not None and self._color is not None:
             # if input color is not the same as the annotation's color - need to re-encode
@@ -144,15 +262,24 @@ class Segmentation(BaseAnnotationDefinition):
                     color = self._color
                 else:
                     color = (255, 255, 255)
-            max_val = np.max(self.geo)
-            if max_val > 1:
-                self.geo = self.geo / max_val
-            png_ann = np.stack((color[0] * self.geo,
-                                color[1] * self.geo,
-                                color[2] * self.geo,
-                                255 * self.geo),
-                               axis=2).astype(np.uint8)
-            pil_img = Image.fromarray(png_ann)
+            # color the cropped mask and paste it on a transparent image (no full size intermediate arrays)
+            left, top, mask = self.cropped_mask
+            if mask.dtype == bool:
+                png_crop = np.zeros(mask.shape + (4,), dtype=np.uint8)
+                png_crop[mask] = (color[0], color[1], color[2], 255)
+            else:
+                max_val = np.max(mask) if mask.size > 0 else 0
+                if max_val > 1:
+                    mask = mask / max_val
+                png_crop = np.stack((color[0] * mask,
+                                     color[1] * mask,
+                                     color[2] * mask,
+                                     255 * mask),
+                                    axis=2).astype(np.uint8)
+            height, width = self._shape
+            pil_img = Image.new('RGBA', (width, height))
+            if png_crop.size > 0:
+                pil_img.paste(Image.fromarray(png_crop), (left, top))
             buff = io.BytesIO()
             pil_img.save(buff, format="PNG")
             new_image_string = base64.b64encode(buff.getvalue()).decode("utf-8")
@@ -196,19 +323,30 @@ class Segmentation(BaseAnnotationDefinition):
 
         thickness = -1
 
-        # plot polygon on a blank mask with thickness -1 to fill the polyline
-        mask = np.zeros(shape=shape, dtype=np.uint8)
+        # plot polygon on a blank mask (of the polygon bounding box) with thickness -1 to fill the polyline
+        pts = np.asarray(geo).astype('int').reshape(-1, 2)
+        height, width = shape[:2]
+        left, top = max(int(pts[:, 0].min()), 0), max(int(pts[:, 1].min()), 0)
+        right, bottom = min(int(pts[:, 0].max()), width - 1), min(int(pts[:, 1].max()), height - 1)
+        inst = cls(
+            geo=None,
+            label=label,
+            attributes=attributes,
+        )
+        inst._shape = (height, width)
+        inst._geo_dtype = np.uint8
+        if right < left or bottom < top:
+            # polygon is outside the image
+            inst._mask = np.zeros((0, 0), dtype=np.uint8)
+            return inst
+        mask = np.zeros(shape=(bottom - top + 1, right - left + 1), dtype=np.uint8)
         mask = cv2.drawContours(image=mask,
-                                contours=[np.asarray(geo).astype('int')],
+                                contours=[pts - np.array([left, top])],
                                 contourIdx=-1,
                                 color=1,
                                 thickness=thickness)
-
-        return cls(
-            geo=mask,
-            label=label,
-            attributes=attributes,
-        )
+        inst._mask, inst._mask_top, inst._mask_left = mask, top, left
+        return inst
 
     @staticmethod
     def from_coordinates(coordinates):
@@ -222,6 +360,35 @@ class Segmentation(BaseAnnotationDefinition):
         mask = np.array(Image.open(io.BytesIO(decode)))
         return mask
 
+    @staticmethod
+    def _decode_coordinates(coordinates):
+        """
+        Decode the binary png to a mask cropped to its bounding box, without a full size RGBA array
+
+        :return: tuple of (shape, top, left, cropped bool mask, color)
+        """
+        if isinstance(coordinates, dict):
+            data = coordinates["data"][22:]
+        elif isinstance(coordinates, str):
+            data = coordinates[22:]
+        else:
+            raise TypeError('unknown binary data type')
+        image = Image.open(io.BytesIO(base64.b64decode(data)))
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        width, height = image.size
+        # pixels with alpha over 127 are in the mask
+        mask_image = image.getchannel('A').point([0] * 128 + [255] * 128)
+        bbox = mask_image.getbbox()
+        if bbox is None:
+            return (height, width), 0, 0, np.zeros((0, 0), dtype=bool), None
+        left, top, right, bottom = bbox
+        mask = np.asarray(mask_image.crop(bbox)) > 0
+        # color of the first pixel of the mask
+        first = int(np.argmax(mask.ravel()))
+        color = tuple(image.getpixel((left + first % mask.shape[1], top + first // mask.shape[1]))[:3])
+        return (height, width), top, left, mask, color
+
     @classmethod
     def from_json(cls, _json):
         if "coordinates" in _json:
@@ -0,0 +1,144 @@
+import copy
+import logging
+
+logger = logging.getLogger(name='dtlpy')
+
+
+def _snake_to_camel(name: str) -> str:
+    first, *rest = name.split('_')
+    return first + ''.join(word.capitalize() for word in rest)
+
+
+def _get_path(_json: dict, path: str):
+    """
+    Get a value from a nested json by a dot separated path (e.g 'metadata.system.mimetype')
+
+    :raises KeyError: if the path does not exist
+    """
+    value = _json
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            raise KeyError(path)
+        value = value[key]
+    return value
+
+
+def select_fields(_json: dict, fields: list) -> dict:
+    """
+    Build a new json with only the requested (dot separated) fields. 'id' is always kept.
+
+    :param dict _json: entity json
+    :param list fields: list of fields to keep
+    :return: trimmed json
+    """
+    selected = dict()
+    if 'id' in _json:
+        selected['id'] = _json['id']
+    for path in fields:
+        try:
+            value = _get_path(_json, path)
+        except KeyError:
+            continue
+        keys = path.split('.')
+        node = selected
+        for key in keys[:-1]:
+            node = node.setdefault(key, dict())
+        node[keys[-1]] = value
+    return selected
+
+
+class EntityView:
+    """
+    Lightweight read-only view over the platform json of an entity, returned by list(raw=True).
+    Attributes are read from the json on access (snake_case names are mapped to the camelCase keys) and the full
+    entity is built only when calling `to_entity()`.
+    """
+    __slots__ = ('_json', '_loader', '_entity')
+
+    def __init__(self, _json: dict, loader):
+        object.__setattr__(self, '_json', _json)
+        object.__setattr__(self, '_loader', loader)
+        object.__setattr__(self, '_entity', None)
+
+    def __getattr__(self, name):
+        _json = object.__getattribute__(self, '_json')
+        if name in _json:
+            return _json[name]
+        camel = _snake_to_camel(name)
+        if camel in _json:
+            return _json[camel]
+        raise AttributeError('{!r} has no field {!r}'.format(self.__class__.__name__, name))
+
+    def __setattr__(self, key, value):
+        raise AttributeError('EntityView is read-only. Use to_entity() to get an editable entity')
+
+    def __delattr__(self, item):
+        raise AttributeError('EntityView is read-only. Use to_entity() to get an editable entity')
+
+    def __copy__(self):
+        view = self.__class__(_json=self._json, loader=self._loader)
+        object.__setattr__(view, '_entity', self._entity)
+        return view
+
+    def __deepcopy__(self, memo):
+        # the loader is shared, the entity is built again on to_entity()
+        view = self.__class__(_json=copy.deepcopy(self._json, memo), loader=self._loader)
+        memo[id(self)] = view
+        return view
+
+    def __reduce__(self):
+        # the loader (usually bound to a repository) is not pickled - use to_entity() before sending to a process
+        return self.__class__, (self._json, None)
+
+    def __getitem__(self, path):
+        return _get_path(self._json, path)
+
+    def __contains__(self, path):
+        try:
+            _get_path(self._json, path)
+            return True
+        except KeyError:
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, EntityView):
+            return self._json == other._json
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'EntityView(id={!r})'.format(self._json.get('id'))
+
+    def get(self, path, default=None):
+        """
+        Get a field by a dot separated path (e.g 'metadata.system.mimetype')
+
+        :param str path: field path
+        :param default: value to return if the field does not exist
+        """
+        try:
+            return _get_path(self._json, path)
+        except KeyError:
+            return default
+
+    def to_json(self):
+        """
+        Returns a copy of the platform json of the view
+
+        :return: platform json
+        :rtype: dict
+        """
+        return copy.deepcopy(self._json)
+
+    def to_entity(self):
+        """
+        Promote the view to the full entity. The entity is built once and cached on the view.
+
+        :return: entity (Item, Annotation, etc)
+        """
+        if self._entity is None:
+            if self._loader is None:
+                raise ValueError('EntityView has no loader (e.g an unpickled view) - cannot build the entity')
+            object.__setattr__(self, '_entity', self._loader(self._json))
+        return self._entity
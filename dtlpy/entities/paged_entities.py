@@ -1,14 +1,18 @@
 import logging
+import threading
+import queue
 import math
 import time
 import tqdm
 import copy
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Any
 
 import attr
 
 from .filters import FiltersOperations, FiltersOrderByDirection, FiltersResource
+from .entity_view import EntityView, select_fields
 from .. import miscellaneous, exceptions
 from ..services.api_client import ApiClient
 
@@ -22,6 +26,9 @@ class PagedEntities:
     Defaults to offset-based pagination for compatibility with all operations.
     Switches to keyset/cursor-based pagination (using 'id' as the cursor) during iteration for performance.
     Falls back to offset-based pagination if keyset is not possible (e.g., custom sort).
+    With `prefetch` > 0 iteration reads up to `prefetch` pages ahead in background threads (concurrent requests for
+    offset-based pages, a background cursor for keyset pages). Pages are still yielded in order.
+    With `raw` (or `fields`) pages hold read-only EntityView objects over the platform json instead of full entities.
     """
     # api
     _client_api: ApiClient = attr.ib(repr=False)
@@ -39,6 +46,13 @@ class PagedEntities:
     use_id_based_paging: bool = attr.ib(default=False)  # Default to False for offset-based pagination
     last_seen_id: Optional[Any] = attr.ib(default=None)
 
+    # number of pages to read ahead while iterating (0 - no read ahead)
+    prefetch: int = attr.ib(default=0)
+
+    # lightweight views instead of entities
+    raw: bool = attr.ib(default=False)
+    fields: Optional[List[str]] = attr.ib(default=None)
+
     # execution attribute
     _service_id = attr.ib(default=None, repr=False)
     _list_function = attr.ib(default=None, repr=False)
@@ -106,11 +120,47 @@ class PagedEntities:
         if 'totalPagesCount' in result:
             self.total_pages_count = result['totalPagesCount']
         if 'items' in result:
-            items = self.items_repository._build_entities_from_response(response_items=result['items'])
+            if self.raw or self.fields is not None:
+                items = self._build_views(response_items=result['items'])
+            else:
+                items = self.items_repository._build_entities_from_response(response_items=result['items'])
         else:
             items = miscellaneous.List(list())
         return items
 
+    def _build_views(self, response_items: List[dict]) -> List[EntityView]:
+        """
+        Build read-only views over the items json. Views are promoted to entities only on `to_entity()`.
+        :param response_items: list of json objects
+        :return: list of views
+        """
+        repository = self.items_repository
+        if self.fields is None:
+            def loader(_json):
+                built = repository._build_entities_from_response(response_items=[_json])
+                if len(built) == 0:
+                    raise exceptions.PlatformException(error='400',
+                                                       message='Failed to build entity from json: {}'.format(
+                                                           _json.get('id')))
+                return built[0]
+
+            return miscellaneous.List([EntityView(_json=_json, loader=loader) for _json in response_items])
+
+        # the view holds only part of the json - the entity must be fetched from the platform
+        get_param = {FiltersResource.ITEM: 'item_id',
+                     FiltersResource.ANNOTATION: 'annotation_id',
+                     FiltersResource.FEATURE: 'feature_id'}.get(self.filters.resource)
+        if get_param is None:
+            raise exceptions.PlatformException(error='400',
+                                               message='fields is not supported for resource: {}'.format(
+                                                   self.filters.resource))
+
+        def loader(_json):
+            return repository.get(**{get_param: _json['id']})
+
+        return miscellaneous.List([EntityView(_json=select_fields(_json=_json, fields=self.fields), loader=loader)
+                                   for _json in response_items])
+
     def __getitem__(self, y: int) -> List[Any]:
         # If we're already on the requested page, return current items
         if y == self.page_offset:
@@ -138,7 +188,16 @@ class PagedEntities:
         if self.items:
             yield self.items
             pbar.update()
-        
+
+        # Read ahead the next pages in the background (total pages count is needed for offset-based pages)
+        if self.prefetch > 0 and self.has_next_page and self.filters.custom_filter is None and \
+                (self.use_id_based_paging or self.total_pages_count > 0):
+            for items in self._iter_prefetch():
+                yield items
+                pbar.update()
+            pbar.close()
+            return
+
         # Continue with next pages
         while self.has_next_page:
             if self.use_id_based_paging:
@@ -194,12 +253,35 @@ class PagedEntities:
             raise ValueError("Can't return page. Filters is empty")
         self.filters.page_size = self.page_size
         self.filters.page = self.page_offset
-        req = copy.deepcopy(self.filters)
 
         # Determine pagination method based on page offset and resource type
         self.use_id_based_paging = self._should_use_keyset_pagination()
+        result = self._fetch_result(page_offset=self.page_offset,
+                                    use_id_based_paging=self.use_id_based_paging,
+                                    last_seen_id=self.last_seen_id)
+        items = self.process_result(result)
 
-        if self.use_id_based_paging:
+        # Update last_seen_id for keyset
+        if self.use_id_based_paging and items and hasattr(items[-1], "id"):
+            self.last_seen_id = items[-1].id
+        elif self.use_id_based_paging and not items:
+            self.last_seen_id = None
+        return items
+
+    def _fetch_result(self, page_offset: int, use_id_based_paging: bool, last_seen_id: Optional[Any] = None) -> dict:
+        """
+        Fetch the raw json of a single page. Does not change the paging state, so it is safe to call from
+        the read-ahead threads.
+        :param page_offset: page offset (for offset-based)
+        :param use_id_based_paging: use keyset/cursor-based pagination
+        :param last_seen_id: last id of the previous page (for keyset)
+        :return: json object
+        """
+        req = copy.deepcopy(self.filters)
+        req.page_size = self.page_size
+        req.page = page_offset
+
+        if use_id_based_paging:
             # Use keyset/cursor-based pagination
             prepared = req.prepare()
             sort_spec = prepared.get("sort", {})
@@ -210,14 +292,14 @@ class PagedEntities:
                 operator_value = FiltersOperations.LESS_THAN
             else:
                 operator_value = FiltersOperations.GREATER_THAN
-                
+
             req.sort_by(field="id", value=order)
             req.page = 0  # always fetch from the start for keyset
             # Only add last_seen_id filter if we're not explicitly requesting page 0
-            if self.last_seen_id:
+            if last_seen_id:
                 req.add(
                     field="id",
-                    values=self.last_seen_id,
+                    values=last_seen_id,
                     operator=operator_value,
                     method=FiltersOperations.AND,
                 )
@@ -226,15 +308,105 @@ class PagedEntities:
             result = self.items_repository._list(filters=req)
         else:
             result = self._list_function(filters=req)
+        return result
 
-        items = self.process_result(result)
+    def _read_ahead_offset(self, first_page: int, last_page: int):
+        """
+        Fetch offset-based pages concurrently, keeping at most `prefetch` requests in flight.
+        :param first_page: first page offset to fetch
+        :param last_page: last page offset to fetch (inclusive)
+        :return: generator of (page_offset, json)
+        """
+        futures = list()
+        next_page = first_page
+        with ThreadPoolExecutor(max_workers=self.prefetch) as pool:
+            try:
+                while next_page <= last_page or futures:
+                    while next_page <= last_page and len(futures) < self.prefetch:
+                        futures.append((next_page, pool.submit(self._fetch_result,
+                                                               page_offset=next_page,
+                                                               use_id_based_paging=False)))
+                        next_page += 1
+                    page_offset, future = futures.pop(0)
+                    yield page_offset, future.result()
+            finally:
+                # iteration stopped - drop the pages that were not started yet
+                for _, future in futures:
+                    future.cancel()
 
-        # Update last_seen_id for keyset
-        if self.use_id_based_paging and items and hasattr(items[-1], "id"):
-            self.last_seen_id = items[-1].id
-        elif self.use_id_based_paging and not items:
-            self.last_seen_id = None
-        return items
+    def _read_ahead_keyset(self, last_seen_id: Any):
+        """
+        Fetch keyset pages with a background cursor, staying at most `prefetch` pages ahead of the caller.
+        :param last_seen_id: last id of the page the caller already has
+        :return: generator of (page_offset, json)
+        """
+        pages = queue.Queue(maxsize=self.prefetch)
+        stopped = threading.Event()
+
+        def put(page):
+            while not stopped.is_set():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def cursor(cursor_id):
+            try:
+                while not stopped.is_set():
+                    result = self._fetch_result(page_offset=0,
+                                                use_id_based_paging=True,
+                                                last_seen_id=cursor_id)
+                    if not put((result, None)):
+                        return
+                    result_items = result.get('items', list())
+                    if not result.get('hasNextPage', False) or not result_items:
+                        break
+                    cursor_id = result_items[-1].get('id')
+            except Exception as err:
+                put((None, err))
+                return
+            put((None, None))
+
+        thread = threading.Thread(target=cursor, args=(last_seen_id,), daemon=True)
+        thread.start()
+        try:
+            while True:
+                result, err = pages.get()
+                if err is not None:
+                    raise err
+                if result is None:
+                    break
+                yield 0, result
+        finally:
+            stopped.set()
+
+    def _iter_prefetch(self):
+        """
+        Iterate pages after the first one using the read-ahead threads.
+        :return: generator of pages
+        """
+        if self.use_id_based_paging:
+            results = self._read_ahead_keyset(last_seen_id=self.last_seen_id)
+        else:
+            results = self._read_ahead_offset(first_page=self.page_offset + 1,
+                                              last_page=self.total_pages_count - 1)
+        try:
+            for page_offset, result in results:
+                self.page_offset = page_offset
+                items = self.process_result(result)
+                if self.use_id_based_paging:
+                    self.last_seen_id = items[-1].id if items and hasattr(items[-1], "id") else None
+                self.items = items
+                if not items:
+                    break
+                yield items
+        except exceptions.BadRequest as e:
+            logger.warning(f"BadRequest error received: {str(e)}")
+            self.items = miscellaneous.List(list())
+        finally:
+            results.close()
 
     def get_page(self, page_offset: Optional[int] = None, page_size: Optional[int] = None) -> None:
         """
@@ -1,3 +1,6 @@
+import bisect
+
+
 class ReflectDict(dict):
 
     def __init__(self, value_type: type, start: int = None, end: int = None, on_access: callable = None):
@@ -6,6 +9,8 @@ class ReflectDict(dict):
         self.on_access = on_access
         self._start = int(start) if start is not None else 0
         self._end = int(end) if end is not None else 0
+        # sorted actual keys (for bisect lookups), built on demand and dropped on changes
+        self._sorted_keys = None
 
     @property
     def start(self):
@@ -27,28 +32,32 @@ class ReflectDict(dict):
             raise ValueError('Must input a valid number')
         self._end = int(end) if end is not None else 0
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_sorted_keys'] = None
+        return state
+
+    def _get_sorted_keys(self):
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(super(ReflectDict, self).keys())
+        return self._sorted_keys
+
+    def _last(self):
+        """
+        Last reflected key - the end or the last actual key (if after the end)
+        """
+        sorted_keys = self._get_sorted_keys()
+        last = self._end
+        if len(sorted_keys) > 0 and sorted_keys[-1] > last:
+            last = sorted_keys[-1]
+        return max(last, self._start)
+
     def actual_keys(self):
         return super(ReflectDict, self).keys()
 
     def keys(self):
-        sorted_keys = list(super(ReflectDict, self).keys())
-        sorted_keys.sort()
-
-        yield self._start
-        last_yielded = self._start
-
-        for key in sorted_keys:
-            if last_yielded == key - 1:
-                last_yielded = key
-                yield key
-            else:
-                while last_yielded < key:
-                    last_yielded = last_yielded + 1
-                    yield last_yielded
-
-        while last_yielded < self._end:
-            last_yielded = last_yielded + 1
-            yield last_yielded
+        # all the keys between the start and the last key
+        yield from range(self._start, self._last() + 1)
 
     def values(self):
         for key in self.keys():
@@ -62,7 +71,10 @@ class ReflectDict(dict):
         return self.keys()
 
     def __contains__(self, key):
-        return key in list(self.keys())
+        try:
+            return key == int(key) and self._start <= key <= self._last()
+        except (TypeError, ValueError, OverflowError):
+            return False
 
     def __setitem__(self, key, value):
         if not isinstance(key, int):
@@ -74,8 +86,34 @@ class ReflectDict(dict):
         if key < self._start:
             self._start = key
 
+        if self._sorted_keys is not None and not super(ReflectDict, self).__contains__(key):
+            bisect.insort(self._sorted_keys, key)
         super(ReflectDict, self).__setitem__(key, value)
 
+    def __delitem__(self, key):
+        self._sorted_keys = None
+        super(ReflectDict, self).__delitem__(key)
+
+    def pop(self, *args, **kwargs):
+        self._sorted_keys = None
+        return super(ReflectDict, self).pop(*args, **kwargs)
+
+    def popitem(self):
+        self._sorted_keys = None
+        return super(ReflectDict, self).popitem()
+
+    def clear(self):
+        self._sorted_keys = None
+        super(ReflectDict, self).clear()
+
+    def update(self, *args, **kwargs):
+        self._sorted_keys = None
+        super(ReflectDict, self).update(*args, **kwargs)
+
+    def setdefault(self, *args, **kwargs):
+        self._sorted_keys = None
+        return super(ReflectDict, self).setdefault(*args, **kwargs)
+
     def __getitem__(self, key):
         requested_key = key
         if not isinstance(key, int):
@@ -86,17 +124,20 @@ class ReflectDict(dict):
         elif super(ReflectDict, self).__contains__(key):
             return super(ReflectDict, self).__getitem__(key)
         else:
-            while key > self._start:
-                key = key - 1
-                if super(ReflectDict, self).__contains__(key):
-                    item = super(ReflectDict, self).__getitem__(key)
-                    if isinstance(item, self.value_type):
-                        if self.on_access is not None:
-                            item = self.on_access(self, actual_key=key, requested_key=requested_key, val=item)
-                        return item
-                    else:
-                        raise Exception('Unknown value type, dict must be of type: {}'.format(
-                            self.value_type))
+            # the closest actual key before the requested key (and not before the start)
+            sorted_keys = self._get_sorted_keys()
+            i_key = bisect.bisect_left(sorted_keys, key) - 1
+            if i_key < 0 or sorted_keys[i_key] < self._start:
+                return None
+            key = sorted_keys[i_key]
+            item = super(ReflectDict, self).__getitem__(key)
+            if isinstance(item, self.value_type):
+                if self.on_access is not None:
+                    item = self.on_access(self, actual_key=key, requested_key=requested_key, val=item)
+                return item
+            else:
+                raise Exception('Unknown value type, dict must be of type: {}'.format(
+                    self.value_type))
 
     def __len__(self):
-        return len(list(self.keys()))
+        return self._last() - self._start + 1
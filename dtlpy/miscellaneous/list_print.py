@@ -1,8 +1,6 @@
 import datetime
-import tabulate
 import typing
 import logging
-import pandas
 
 from .. import exceptions
 
@@ -13,6 +11,8 @@ T = typing.TypeVar('T')
 
 class List(list, typing.MutableSequence[T]):
     def to_df(self, show_all=False, columns=None):
+        # pandas is slow to import - only when printing
+        import pandas
         try:
             to_print = list()
             keys_list = list()
@@ -86,6 +86,7 @@ class List(list, typing.MutableSequence[T]):
                                                message='Failed converting to DataFrame')
 
     def print(self, show_all=False, level='print', to_return=False, columns=None):
+        import tabulate
         try:
             df = self.to_df(show_all=show_all, columns=columns)
             if 'name' in list(df.columns.values):
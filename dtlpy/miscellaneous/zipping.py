@@ -1,4 +1,9 @@
+import concurrent.futures
+import collections
+import hashlib
 import logging
+import shutil
+import zlib
 import os
 import zipfile
 from typing import List
@@ -9,6 +14,21 @@ import pathspec
 logger = logging.getLogger(name='dtlpy')
 
 MAX_ZIP_FILE = 100e6  # 100MB
+# fixed entries time - the same files give the same zip
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+HASH_CHUNK_SIZE = 1024 * 1024
+# files from this size are hashed in parallel
+PARALLEL_HASH_MIN_SIZE = 1024 * 1024
+# files up to this size are compressed in memory by the workers, larger files are streamed (in order)
+PARALLEL_ZIP_MAX_SIZE = 32 * 1024 * 1024
+ZIP_MAX_WORKERS = os.cpu_count() or 1
+# already compressed formats - stored without compression
+# ZipFile internals used to write the entries that were compressed by the workers (as ZipFile.open(..., 'w')
+# does). checked against CPython 3.9, 3.10, 3.11, 3.12 and 3.13 - without them the files are zipped one by one
+_ZIP_FILE_INTERNALS = ('fp', 'start_dir', 'filelist', 'NameToInfo', '_didModify', '_writecheck')
+STORED_EXTENSIONS = {'.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.whl',
+                     '.jpg', '.jpeg', '.png', '.gif', '.webp',
+                     '.mp4', '.mov', '.avi', '.mkv', '.webm', '.mp3', '.aac', '.ogg'}
 
 
 class Zipping:
@@ -16,15 +36,93 @@ class Zipping:
         pass
 
     @staticmethod
-    def zip_directory(zip_filename, directory=None, ignore_max_file_size=False, ignore_directories: List[str] = None):
+    def _ignore_spec(directory, ignore_directories: List[str] = None):
+        if '.gitignore' in os.listdir(directory):
+            with open(os.path.join(directory, '.gitignore')) as f:
+                spec_src = f.read()
+        else:
+            spec_src = ''
+        ignore_lines = spec_src.splitlines() + ['.git', '.dataloop']
+        if ignore_directories is not None:
+            ignore_lines += ignore_directories
+        return pathspec.PathSpec.from_lines('gitignore', ignore_lines)
+
+    @staticmethod
+    def list_directory(directory, ignore_directories: List[str] = None):
+        """
+        List the directory files to zip (sorted relative paths)
+        Will ignore .gitignore files
+
+        :param directory: the directory to list
+        :param list[str] ignore_directories: directories to ignore.
+        :return: list of relative file paths
+        """
+        spec = Zipping._ignore_spec(directory=directory, ignore_directories=ignore_directories)
+        filepaths = list()
+        for root, dirs, files in os.walk(directory):
+            # remove dirs to avoid going file by file
+            dirs[:] = [d for d in dirs
+                       if not spec.match_file(os.path.relpath(os.path.join(root, d), directory))]
+            for file in files:
+                relpath = os.path.relpath(os.path.join(root, file), directory)
+                if not spec.match_file(relpath):
+                    filepaths.append(relpath)
+        return sorted(filepaths, key=lambda path: path.replace(os.sep, '/'))
+
+    @staticmethod
+    def _file_hash(filepath):
+        m = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                m.update(chunk)
+        return m.hexdigest()
+
+    @staticmethod
+    def directory_hash(directory, ignore_directories: List[str] = None):
+        """
+        Deterministic hash of the directory content - the files (as zipped) paths, executable bit and content.
+        Same sources give the same hash on any machine, regardless of the files times
+
+        :param directory: the directory to hash
+        :param list[str] ignore_directories: directories to ignore.
+        :return: hex digest
+        """
+        filepaths = Zipping.list_directory(directory=directory, ignore_directories=ignore_directories)
+        hashes = dict()
+        futures = dict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 4)) as pool:
+            for relpath in filepaths:
+                filepath = os.path.join(directory, relpath)
+                if os.path.getsize(filepath) >= PARALLEL_HASH_MIN_SIZE:
+                    futures[relpath] = pool.submit(Zipping._file_hash, filepath)
+                else:
+                    hashes[relpath] = Zipping._file_hash(filepath)
+            for relpath, future in futures.items():
+                hashes[relpath] = future.result()
+        m = hashlib.sha256()
+        for relpath in filepaths:
+            executable = os.access(os.path.join(directory, relpath), os.X_OK)
+            entry = '{}\0{:d}\0{}\n'.format(relpath.replace(os.sep, '/'), executable, hashes[relpath])
+            m.update(entry.encode('utf-8'))
+        return m.hexdigest()
+
+    @staticmethod
+    def zip_directory(zip_filename,
+                      directory=None,
+                      ignore_max_file_size=False,
+                      ignore_directories: List[str] = None,
+                      store_only=False):
         """
         Zip Directory
         Will ignore .gitignore files
+        The zip is deterministic - sorted entries with fixed times.
+        Files are compressed in parallel, already compressed formats (images, videos, archives) are stored as is
 
         :param directory: the directory to zip
         :param zip_filename: the name of the zipfile.
         :param ignore_max_file_size: ignore the limitation on the zip file size
         :param list[str] ignore_directories: directories to ignore.
+        :param bool store_only: store all the files without compression
         :return: None
         """
         # default path
@@ -33,31 +131,108 @@ class Zipping:
         # check if directory
         assert os.path.isdir(directory), '[ERROR] Directory does not exists: {}'.format(directory)
 
-        if '.gitignore' in os.listdir(directory):
-            with open(os.path.join(directory, '.gitignore')) as f:
-                spec_src = f.read()
-        else:
-            spec_src = ''
-        ignore_lines = spec_src.splitlines() + ['.git', '.dataloop']
-        if ignore_directories is not None:
-            ignore_lines += ignore_directories
-        spec = pathspec.PathSpec.from_lines('gitignore', ignore_lines)
+        filepaths = Zipping.list_directory(directory=directory, ignore_directories=ignore_directories)
 
         # init zip file
         zip_file = zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED)
+        parallel = Zipping._can_write_compressed(zip_file)
+        if not parallel:
+            logger.debug('ZipFile internals not found - zipping the files one by one')
         try:
-            for root, dirs, files in os.walk(directory):
-                # remove dirs to avoid going file by file
-                for d in dirs:
-                    if spec.match_file(os.path.relpath(os.path.join(root, d), directory)):
-                        dirs.remove(d)
-                for file in files:
-                    filepath = os.path.join(root, file)
-                    if not spec.match_file(os.path.relpath(filepath, directory)):
-                        Zipping.__add_to_zip_file(directory, filepath, ignore_max_file_size, zip_file)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=ZIP_MAX_WORKERS if parallel else 1) as pool:
+                # compressed by the workers, written in order
+                pending = collections.deque()
+                total_size = 0
+                for relpath in filepaths:
+                    filepath = os.path.join(directory, relpath)
+                    size = os.path.getsize(filepath)
+                    total_size += size
+                    if not ignore_max_file_size and total_size > MAX_ZIP_FILE:
+                        Zipping.__raise_max_size(filepath)
+                    store = store_only or os.path.splitext(relpath)[1].lower() in STORED_EXTENSIONS
+                    if size > PARALLEL_ZIP_MAX_SIZE or not parallel:
+                        while pending:
+                            Zipping.__write_compressed_entry(zip_file, *pending.popleft())
+                        Zipping.__add_deterministic_entry(zip_file=zip_file,
+                                                          filepath=filepath,
+                                                          arcname=relpath,
+                                                          store=store)
+                        continue
+                    pending.append((Zipping.__zip_info(filepath=filepath, arcname=relpath),
+                                    pool.submit(Zipping._compress_file, filepath, store)))
+                    # limit the compressed files in memory
+                    while len(pending) > 2 * ZIP_MAX_WORKERS:
+                        Zipping.__write_compressed_entry(zip_file, *pending.popleft())
+                while pending:
+                    Zipping.__write_compressed_entry(zip_file, *pending.popleft())
         finally:
             zip_file.close()
 
+    @staticmethod
+    def _can_write_compressed(zip_file):
+        return all(hasattr(zip_file, name) for name in _ZIP_FILE_INTERNALS) and \
+            hasattr(zipfile.ZipInfo, 'FileHeader')
+
+    @staticmethod
+    def __zip_info(filepath, arcname):
+        zip_info = zipfile.ZipInfo(filename=arcname.replace(os.sep, '/'), date_time=ZIP_DATE_TIME)
+        zip_info.external_attr = (os.stat(filepath).st_mode & 0xFFFF) << 16
+        return zip_info
+
+    @staticmethod
+    def _compress_file(filepath, store=False):
+        """
+        Compress a file in memory (zlib releases the GIL - runs in parallel on threads)
+
+        :return: compress type, compressed data, crc and the file size
+        """
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        crc = zlib.crc32(data)
+        if not store:
+            # same as the zipfile deflate compressor
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            compressed = compressor.compress(data) + compressor.flush()
+            if len(compressed) < len(data):
+                return zipfile.ZIP_DEFLATED, compressed, crc, len(data)
+        return zipfile.ZIP_STORED, data, crc, len(data)
+
+    @staticmethod
+    def __write_compressed_entry(zip_file, zip_info, future):
+        # the same as ZipFile.open(zip_info, 'w') - with data that was already compressed
+        compress_type, data, crc, file_size = future.result()
+        zip_info.compress_type = compress_type
+        zip_info.file_size = file_size
+        zip_info.compress_size = len(data)
+        zip_info.CRC = crc
+        zip_info.flag_bits = 0x00
+        zip_file.fp.seek(zip_file.start_dir)
+        zip_info.header_offset = zip_file.fp.tell()
+        zip_file._writecheck(zip_info)
+        zip_file._didModify = True
+        zip_file.fp.write(zip_info.FileHeader(False))
+        zip_file.fp.write(data)
+        zip_file.filelist.append(zip_info)
+        zip_file.NameToInfo[zip_info.filename] = zip_info
+        zip_file.start_dir = zip_file.fp.tell()
+
+    @staticmethod
+    def __add_deterministic_entry(zip_file, filepath, arcname, store=False):
+        zip_info = Zipping.__zip_info(filepath=filepath, arcname=arcname)
+        zip_info.compress_type = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+        # the size is set for the zip64 decision
+        zip_info.file_size = os.path.getsize(filepath)
+        with open(filepath, 'rb') as src, zip_file.open(zip_info, 'w') as dst:
+            shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+
+    @staticmethod
+    def __raise_max_size(filepath):
+        logger.error('Failed zipping in file: {}'.format(filepath))
+        raise ValueError(
+            'Zip file cant be over 100MB. '
+            'Please verify that only code is being uploaded or '
+            'add files to .gitignore so they wont be zipped and uploaded as code.')
+
     @staticmethod
     def zip_directory_inclusive(zip_filename, directory=None, ignore_max_file_size=False,
                                 subpaths: List[str] = None):
@@ -77,13 +252,7 @@ class Zipping:
         # check if directory
         assert os.path.isdir(directory), '[ERROR] Directory does not exists: %s' % directory
 
-        if '.gitignore' in os.listdir(directory):
-            with open(os.path.join(directory, '.gitignore')) as f:
-                spec_src = f.read()
-        else:
-            spec_src = ''
-        ignore_lines = spec_src.splitlines() + ['.git', '.dataloop']
-        spec = pathspec.PathSpec.from_lines('gitignore', ignore_lines)
+        spec = Zipping._ignore_spec(directory=directory)
 
         # init zip file
         zip_file = zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED)
@@ -109,14 +278,17 @@ class Zipping:
         zip_file.write(filepath, arcname=os.path.relpath(filepath, directory))
         if not ignore_max_file_size:
             if np.sum([f.file_size for f in list(zip_file.NameToInfo.values())]) > MAX_ZIP_FILE:
-                logger.error('Failed zipping in file: {}'.format(filepath))
-                raise ValueError(
-                    'Zip file cant be over 100MB. '
-                    'Please verify that only code is being uploaded or '
-                    'add files to .gitignore so they wont be zipped and uploaded as code.')
+                Zipping.__raise_max_size(filepath)
 
     @staticmethod
     def unzip_directory(zip_filename, to_directory=None):
+        """
+        Unzip to a directory. The files are extracted (decompressed and written) in parallel
+
+        :param zip_filename: the zip file
+        :param to_directory: the directory to extract to. default: current directory
+        :return: None
+        """
         with zipfile.ZipFile(zip_filename) as zipdata:
             zipinfos = zipdata.infolist()
             # iterate through each file
@@ -127,4 +299,24 @@ class Zipping:
                 # so we encode the name back
                 if not zipinfo.flag_bits:
                     zipinfo.filename = zipinfo.filename.encode('cp437').decode('utf-8')
-                zipdata.extract(zipinfo, to_directory)
+            if len(zipinfos) < 2:
+                for zipinfo in zipinfos:
+                    zipdata.extract(zipinfo, to_directory)
+                return
+        # each worker extracts a part of the files with its own zip file handle
+        num_workers = min(ZIP_MAX_WORKERS, len(zipinfos))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as pool:
+            futures = [pool.submit(Zipping.__extract_members, zip_filename, zipinfos[i::num_workers], to_directory)
+                       for i in range(num_workers)]
+            for future in futures:
+                future.result()
+
+    @staticmethod
+    def __extract_members(zip_filename, zipinfos, to_directory):
+        with zipfile.ZipFile(zip_filename) as zipdata:
+            for zipinfo in zipinfos:
+                try:
+                    zipdata.extract(zipinfo, to_directory)
+                except FileExistsError:
+                    # the file directory was created by another worker
+                    zipdata.extract(zipinfo, to_directory)
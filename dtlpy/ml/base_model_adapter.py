@@ -11,6 +11,7 @@ import copy
 import time
 import tqdm
 import traceback
+import queue
 import sys
 import io
 import os
@@ -595,6 +596,10 @@ class BaseModelAdapter(utilities.BaseServiceRunner):
         Run the predict function on the input list of items (or single) and return the items and the predictions.
         Each prediction is by the model output type (package.output_type) and model_info in the metadata
 
+        The batches run in a pipeline: the next batches are prepared (configuration `prefetch_batches`, default 2)
+        and the previous predictions are uploaded (configuration `upload_queue_size`, default 2) while the model
+        predicts the current batch.
+
         :param items: `List[dl.Item]` list of items to predict
         :param batch_size: `int` size of batch to run a single inference
 
@@ -602,39 +607,60 @@ class BaseModelAdapter(utilities.BaseServiceRunner):
         """
         if batch_size is None:
             batch_size = self.configuration.get('batch_size', 4)
+        prefetch_batches = max(1, self.configuration.get('prefetch_batches', 2))
+        upload_queue_size = max(1, self.configuration.get('upload_queue_size', 2))
         input_type = self.model_entity.input_type
         self.logger.debug("Predicting {} items, using batch size {}. input type: {}".format(len(items), batch_size, input_type))
         pool = ThreadPoolExecutor(max_workers=16)
+        upload_pool = ThreadPoolExecutor(max_workers=1)
+        prepared_queue = queue.Queue(maxsize=prefetch_batches)
+        stop_event = threading.Event()
+        timings = {'prepare': 0.0, 'predict': 0.0, 'wait_for_prepare': 0.0, 'upload': 0.0, 'wait_for_upload': 0.0}
         errors = list()
         fail_ids = list()
         annotations = list()
-        for i_batch in tqdm.tqdm(range(0, len(items), batch_size), desc='predicting', unit='bt', leave=None, file=sys.stdout):
-            batch_items = items[i_batch : i_batch + batch_size]
-            batch = list(pool.map(self.prepare_item_func, batch_items))
+
+        def prepare_batches():
+            # stage 1 - download and prepare the batches ahead of the model
             try:
-                batch_collections = self.predict(batch, **kwargs)
+                for i_batch in range(0, len(items), batch_size):
+                    if stop_event.is_set():
+                        return
+                    batch_items = items[i_batch : i_batch + batch_size]
+                    tic = time.time()
+                    batch = list(pool.map(self.prepare_item_func, batch_items))
+                    timings['prepare'] += time.time() - tic
+                    prepared_queue.put((i_batch, batch_items, batch, None))
             except Exception as e:
-                item_ids = [item.id for item in batch_items]
-                error_message = f"Failed to predict batch {i_batch} for items {item_ids}. Error: {e}\n{traceback.format_exc()}"
-                self.logger.error(error_message)
-                errors.append(error_message)
-                fail_ids.extend(item_ids)
-                continue
-            _futures = list(pool.map(partial(self._update_predictions_metadata), batch_items, batch_collections))
-            # Loop over the futures to make sure they are all done to avoid race conditions
-            _ = [_f for _f in _futures]
-            self.logger.debug("Uploading items' annotation for model {!r}.".format(self.model_entity.name))
-            try:
-                batch_collections = list(
-                    pool.map(partial(self._upload_model_annotations), batch_items, batch_collections)
-                )
-            except Exception as err:
-                item_ids = [item.id for item in batch_items]
-                error_message = f"Failed to upload annotations for items {item_ids}. Error: {err}\n{traceback.format_exc()}"
-                self.logger.error(error_message)
-                errors.append(error_message)
-                fail_ids.extend(item_ids)
+                prepared_queue.put((None, None, None, e))
+            prepared_queue.put(None)
 
+        def upload_batch(batch_items, batch_collections):
+            # stage 3 - update the predictions metadata and upload them
+            tic = time.time()
+            try:
+                _futures = list(pool.map(partial(self._update_predictions_metadata), batch_items, batch_collections))
+                # Loop over the futures to make sure they are all done to avoid race conditions
+                _ = [_f for _f in _futures]
+                self.logger.debug("Uploading items' annotation for model {!r}.".format(self.model_entity.name))
+                try:
+                    batch_collections = list(
+                        pool.map(partial(self._upload_model_annotations), batch_items, batch_collections)
+                    )
+                except Exception as err:
+                    item_ids = [item.id for item in batch_items]
+                    error_message = f"Failed to upload annotations for items {item_ids}. Error: {err}\n{traceback.format_exc()}"
+                    self.logger.error(error_message)
+                    errors.append(error_message)
+                    fail_ids.extend(item_ids)
+                return batch_collections
+            finally:
+                timings['upload'] += time.time() - tic
+
+        def collect_batch(upload_future):
+            tic = time.time()
+            batch_collections = upload_future.result()
+            timings['wait_for_upload'] += time.time() - tic
             for collection in batch_collections:
                 # function needs to return `List[List[dl.Annotation]]`
                 # convert annotation collection to a list of dl.Annotation for each batch
@@ -643,9 +669,65 @@ class BaseModelAdapter(utilities.BaseServiceRunner):
                 else:
                     logger.warning(f'RETURN TYPE MAY BE INVALID: {type(collection)}')
                     annotations.extend(collection)
-            # TODO call the callback
 
-        pool.shutdown()
+        start_time = time.time()
+        prepare_thread = threading.Thread(target=prepare_batches, name='predict-items-prepare', daemon=True)
+        prepare_thread.start()
+        upload_futures = list()
+        pbar = tqdm.tqdm(total=(len(items) + batch_size - 1) // batch_size, desc='predicting', unit='bt', leave=None, file=sys.stdout)
+        try:
+            while True:
+                tic = time.time()
+                prepared = prepared_queue.get()
+                timings['wait_for_prepare'] += time.time() - tic
+                if prepared is None:
+                    break
+                i_batch, batch_items, batch, error = prepared
+                if error is not None:
+                    raise error
+                # stage 2 - predict, while the next batches are prepared and the previous ones are uploaded
+                tic = time.time()
+                try:
+                    batch_collections = self.predict(batch, **kwargs)
+                except Exception as e:
+                    item_ids = [item.id for item in batch_items]
+                    error_message = f"Failed to predict batch {i_batch} for items {item_ids}. Error: {e}\n{traceback.format_exc()}"
+                    self.logger.error(error_message)
+                    errors.append(error_message)
+                    fail_ids.extend(item_ids)
+                    continue
+                finally:
+                    timings['predict'] += time.time() - tic
+                    pbar.update()
+                if len(upload_futures) >= upload_queue_size:
+                    collect_batch(upload_futures.pop(0))
+                upload_futures.append(upload_pool.submit(upload_batch, batch_items, batch_collections))
+            for upload_future in upload_futures:
+                collect_batch(upload_future)
+            # TODO call the callback
+        finally:
+            stop_event.set()
+            # release the prepare thread if it is blocked on a full queue
+            while prepare_thread.is_alive():
+                try:
+                    prepared_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            pbar.close()
+            upload_pool.shutdown()
+            pool.shutdown()
+        self.logger.info(
+            "Predicted {} items in {:.2f}[s]. prepare: {:.2f}[s], predict: {:.2f}[s], upload: {:.2f}[s], "
+            "model waiting for data: {:.2f}[s], waiting for uploads: {:.2f}[s]".format(
+                len(items),
+                time.time() - start_time,
+                timings['prepare'],
+                timings['predict'],
+                timings['upload'],
+                timings['wait_for_prepare'],
+                timings['wait_for_upload'],
+            )
+        )
         if len(errors) > 0:
             errors_str = "\n".join(errors)
             raise Exception(f"Failed to predict all items. Failed IDs: {fail_ids}.\nErrors:\n{errors_str}")
@@ -1091,30 +1173,25 @@ class BaseModelAdapter(utilities.BaseServiceRunner):
         if executions:
             self.logger.info(f'Created {len(executions)} executions for {operation_type}, ' f'execution ids: {[ex.id for ex in executions]}')
 
-            wait_time = 5
-            start_time = time.time()
             last_perc = 0
-            self.logger.debug(f"Waiting for executions with timeout {predict_embed_timeout}")
-            while time.time() - start_time < predict_embed_timeout:
-                continue_loop = False
-                total_perc = 0
-
-                for ex in executions:
-                    execution = self.project.executions.get(execution_id=ex.id)
-                    perc = execution.latest_status.get('percentComplete', 0)
-                    total_perc += perc
-                    if execution.in_progress():
-                        continue_loop = True
-
-                avg_perc = round(total_perc / len(executions), 0)
+
+            def update_progress(latest_executions):
+                nonlocal last_perc
+                total_perc = sum(execution.latest_status.get('percentComplete', 0) for execution in latest_executions)
+                avg_perc = round(total_perc / len(latest_executions), 0)
                 if progress is not None and last_perc != avg_perc:
                     last_perc = avg_perc
                     progress.update(progress=last_perc, message=f'running {operation_type}')
 
-                if not continue_loop:
-                    break
-
-                time.sleep(wait_time)
+            self.logger.debug(f"Waiting for executions with timeout {predict_embed_timeout}")
+            try:
+                # a single list query per cycle for all the running executions
+                self.project.executions.wait_many(executions=executions,
+                                                  timeout=predict_embed_timeout,
+                                                  max_sleep_time=5,
+                                                  iteration_callback=update_progress)
+            except TimeoutError as e:
+                self.logger.debug(str(e))
             self.logger.debug("End waiting for executions")
             # Check if any execution failed
             executions_filter = entities.Filters(resource=entities.FiltersResource.EXECUTION)
@@ -1153,8 +1230,7 @@ class BaseModelAdapter(utilities.BaseServiceRunner):
         :return:
         """
         try:
-            buffer = item.download(save_locally=False)
-            image = np.asarray(Image.open(buffer))
+            image = item.items.download_arrays(items=[item], raise_on_error=True)[0]
         except Exception as e:
             logger.error(f"Failed to convert image to np.array, Error: {e}\n{traceback.format_exc()}")
             image = None
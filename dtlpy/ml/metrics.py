@@ -7,6 +7,9 @@ from .. import entities
 
 logger = logging.getLogger(name='dtlpy')
 
+# number of set bits for each byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
 
 class Results:
     def __init__(self, matches, annotation_type):
@@ -298,6 +301,216 @@ class Matchers:
         """
         return int(label1 in label2 or label2 in label1)
 
+    @staticmethod
+    def calculate_iou_matrix_box(geos1, geos2):
+        """
+        Pairwise IoU of two lists of boxes. Regular (2 points) boxes are computed in one vectorized step, rotated
+        (4 points) boxes fall back to `calculate_iou_box`
+
+        :param geos1: list of ann.geo coordinates
+        :param geos2: list of ann.geo coordinates
+        :return: `np.ndarray` of shape (len(geos1), len(geos2)) with the IoU of each pair
+        """
+        scores = np.zeros((len(geos1), len(geos2)))
+        if len(geos1) == 0 or len(geos2) == 0:
+            return scores
+        rotated1 = np.array([len(geo) != 2 for geo in geos1])
+        rotated2 = np.array([len(geo) != 2 for geo in geos2])
+
+        def to_bounds(geos, rotated):
+            bounds = np.zeros((len(geos), 4))
+            for i_geo, geo in enumerate(geos):
+                if not rotated[i_geo]:
+                    pts = np.asarray(geo, dtype=float)
+                    bounds[i_geo] = [pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max()]
+            return bounds
+
+        boxes1 = to_bounds(geos1, rotated1)
+        boxes2 = to_bounds(geos2, rotated2)
+        inter_w = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2]) - np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+        inter_h = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3]) - np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+        intersection = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+        area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+        area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+        union = area1[:, None] + area2[None, :] - intersection
+        np.divide(intersection, union, out=scores, where=union > 0)
+        for i_geo, j_geo in zip(*np.nonzero(union <= 0)):
+            if not rotated1[i_geo] and not rotated2[j_geo]:
+                logger.warning('Found boxes with area=0!: indices: {}, {}'.format(i_geo, j_geo))
+        # rotated boxes
+        for i_geo, j_geo in zip(*np.nonzero(rotated1[:, None] | rotated2[None, :])):
+            try:
+                scores[i_geo, j_geo] = Matchers.calculate_iou_box(geos1[i_geo], geos2[j_geo], config=None)
+            except ZeroDivisionError:
+                logger.warning('Found boxes with area=0!: indices: {}, {}'.format(i_geo, j_geo))
+                scores[i_geo, j_geo] = 0
+        return scores
+
+    @staticmethod
+    def _rasterize_polygon(pts):
+        """
+        Rasterize a polygon into a bool mask cropped to its bounding box (clipped at the image origin)
+
+        :param pts: polygon points
+        :return: (x offset, y offset, mask)
+        """
+        try:
+            import cv2
+        except (ImportError, ModuleNotFoundError) as err:
+            raise RuntimeError('dtlpy depends on external package. Please install ') from err
+        pts = np.asarray(pts).round().astype(int)
+        x_min = max(0, int(pts[:, 0].min()))
+        y_min = max(0, int(pts[:, 1].min()))
+        x_max = int(pts[:, 0].max())
+        y_max = int(pts[:, 1].max())
+        if x_max < x_min or y_max < y_min:
+            # polygon is outside the image
+            return x_min, y_min, np.zeros((0, 0), dtype=bool)
+        mask = np.zeros((y_max - y_min + 1, x_max - x_min + 1), dtype=np.uint8)
+        mask = cv2.drawContours(image=mask,
+                                contours=[pts - np.array([x_min, y_min])],
+                                contourIdx=-1,
+                                color=1,
+                                thickness=-1)
+        return x_min, y_min, mask.astype(bool)
+
+    @staticmethod
+    def calculate_iou_matrix_polygon(geos1, geos2):
+        """
+        Pairwise IoU of two lists of polygons. Each polygon is rasterized once into a mask cropped to its bounding box,
+        and only pairs with overlapping bounding boxes are intersected
+
+        :param geos1: list of ann.geo coordinates
+        :param geos2: list of ann.geo coordinates
+        :return: `np.ndarray` of shape (len(geos1), len(geos2)) with the IoU of each pair
+        """
+        masks1 = [Matchers._rasterize_polygon(geo) for geo in geos1]
+        masks2 = [Matchers._rasterize_polygon(geo) for geo in geos2]
+        return Matchers.calculate_iou_matrix_cropped(masks1, masks2)
+
+    @staticmethod
+    def calculate_iou_matrix_cropped(masks1, masks2):
+        """
+        Pairwise IoU of two lists of bool masks cropped to their bounding boxes. Only pairs with overlapping
+        bounding boxes are intersected
+
+        :param masks1: list of (x offset, y offset, mask)
+        :param masks2: list of (x offset, y offset, mask)
+        :return: `np.ndarray` of shape (len(masks1), len(masks2)) with the IoU of each pair
+        """
+        scores = np.zeros((len(masks1), len(masks2)))
+        areas1 = [int(np.count_nonzero(mask)) for _, _, mask in masks1]
+        areas2 = [int(np.count_nonzero(mask)) for _, _, mask in masks2]
+        for i_geo, (x1, y1, mask1) in enumerate(masks1):
+            for j_geo, (x2, y2, mask2) in enumerate(masks2):
+                left, top = max(x1, x2), max(y1, y2)
+                right = min(x1 + mask1.shape[1], x2 + mask2.shape[1])
+                bottom = min(y1 + mask1.shape[0], y2 + mask2.shape[0])
+                intersection = 0
+                if right > left and bottom > top:
+                    intersection = np.count_nonzero(mask1[top - y1:bottom - y1, left - x1:right - x1] &
+                                                    mask2[top - y2:bottom - y2, left - x2:right - x2])
+                union = areas1[i_geo] + areas2[j_geo] - intersection
+                scores[i_geo, j_geo] = intersection / union if union > 0 else np.nan
+        return scores
+
+    @staticmethod
+    def calculate_iou_matrix_semantic(masks1, masks2):
+        """
+        Pairwise IoU of two lists of binary masks, using bit-packed masks
+
+        :param masks1: list of ann.geo masks
+        :param masks2: list of ann.geo masks
+        :return: `np.ndarray` of shape (len(masks1), len(masks2)) with the IoU of each pair
+        """
+        scores = np.zeros((len(masks1), len(masks2)))
+        packed1 = [np.packbits(np.asarray(mask) > 0) for mask in masks1]
+        packed2 = [np.packbits(np.asarray(mask) > 0) for mask in masks2]
+        areas1 = [int(_POPCOUNT[bits].sum()) for bits in packed1]
+        areas2 = [int(_POPCOUNT[bits].sum()) for bits in packed2]
+        for i_mask, bits1 in enumerate(packed1):
+            for j_mask, bits2 in enumerate(packed2):
+                intersection = int(_POPCOUNT[bits1 & bits2].sum())
+                union = areas1[i_mask] + areas2[j_mask] - intersection
+                scores[i_mask, j_mask] = intersection / union if union > 0 else np.nan
+        return scores
+
+    @staticmethod
+    def _cropped_segmentation(annotation):
+        """
+        Bool mask of a segmentation annotation cropped to its bounding box, without the full size mask
+
+        :param annotation: annotation (or a lite annotation with `cropped_mask`)
+        :return: (x offset, y offset, mask)
+        """
+        cropped = getattr(annotation, 'cropped_mask', None)
+        if cropped is None:
+            definition = getattr(annotation, 'annotation_definition', None)
+            cropped = getattr(definition, 'cropped_mask', None)
+        if cropped is None:
+            return 0, 0, np.asarray(annotation.geo) > 0
+        left, top, mask = cropped
+        return left, top, np.asarray(mask) > 0
+
+    @staticmethod
+    def calculate_iou_matrix(first_set, second_set, match_type):
+        """
+        Pairwise geometry scores of two annotations sets
+
+        :param first_set: list of annotations
+        :param second_set: list of annotations
+        :param match_type: annotation type
+        :return: `np.ndarray` of shape (len(second_set), len(first_set)) - rows are the second set
+        """
+        if match_type == entities.AnnotationType.SEGMENTATION:
+            # cropped masks - the full size masks are not needed
+            return Matchers.calculate_iou_matrix_cropped([Matchers._cropped_segmentation(a) for a in second_set],
+                                                         [Matchers._cropped_segmentation(a) for a in first_set])
+        first_geos = [a.geo for a in first_set]
+        second_geos = [a.geo for a in second_set]
+        if match_type == entities.AnnotationType.BOX:
+            scores = Matchers.calculate_iou_matrix_box(second_geos, first_geos)
+        elif match_type == entities.AnnotationType.POLYGON:
+            scores = Matchers.calculate_iou_matrix_polygon(second_geos, first_geos)
+        elif match_type == entities.AnnotationType.CLASSIFICATION:
+            scores = np.ones((len(second_set), len(first_set)))
+        elif match_type == entities.AnnotationType.POINT:
+            # the tolerance depends on the first annotation's image size
+            diag = np.array([np.sqrt((a._item.height if a._item is not None else 500) ** 2 +
+                                     (a._item.width if a._item is not None else 500) ** 2) for a in first_set])
+            first_pts = np.asarray(first_geos, dtype=float).reshape(-1, 2)
+            second_pts = np.asarray(second_geos, dtype=float).reshape(-1, 2)
+            distance = np.linalg.norm(second_pts[:, None, :] - first_pts[None, :, :], axis=-1)
+            scores = np.exp(-1 / diag[None, :] * 20 * distance)
+        else:
+            raise ValueError('unsupported type: {}'.format(match_type))
+        return scores
+
+    @staticmethod
+    def greedy_match(scores, match_threshold):
+        """
+        Greedy one-to-one assignment - repeatedly take the highest remaining score (ties by row then column)
+        until no score is above the threshold
+
+        :param scores: `np.ndarray` of pairs scores. NaN scores are never matched
+        :param match_threshold: minimal score for a match
+        :return: list of (row, column) matches, in matching order
+        """
+        with np.errstate(invalid='ignore'):
+            rows, cols = np.nonzero(scores >= match_threshold)
+        # stable sort keeps the row-major order between equal scores
+        order = np.argsort(-scores[rows, cols], kind='stable')
+        used_rows = np.zeros(scores.shape[0], dtype=bool)
+        used_cols = np.zeros(scores.shape[1], dtype=bool)
+        pairs = list()
+        for row, col in zip(rows[order], cols[order]):
+            if used_rows[row] or used_cols[col]:
+                continue
+            used_rows[row] = True
+            used_cols[col] = True
+            pairs.append((int(row), int(col)))
+        return pairs
+
     @staticmethod
     def general_match(matches: Matches,
                       first_set: entities.AnnotationCollection,
@@ -317,51 +530,26 @@ class Matchers:
         :param ignore_labels:
         :return:
         """
-        annotation_type_to_func = {
-            entities.AnnotationType.BOX: Matchers.calculate_iou_box,
-            entities.AnnotationType.CLASSIFICATION: Matchers.calculate_iou_classification,
-            entities.AnnotationType.SEGMENTATION: Matchers.calculate_iou_semantic,
-            entities.AnnotationType.POLYGON: Matchers.calculate_iou_polygon,
-            entities.AnnotationType.POINT: Matchers.calculate_iou_point,
-        }
-        df = pd.DataFrame(data=-1 * np.ones((len(second_set), len(first_set))),
-                          columns=[a.id for a in first_set],
-                          index=[a.id for a in second_set])
-        for annotation_one in first_set:
-            for annotation_two in second_set:
-                if match_type not in annotation_type_to_func:
-                    raise ValueError('unsupported type: {}'.format(match_type))
-                if df[annotation_one.id][annotation_two.id] == -1:
-                    try:
-                        config = {'height': annotation_one._item.height if annotation_one._item is not None else 500,
-                                  'width': annotation_one._item.width if annotation_one._item is not None else 500}
-                        df[annotation_one.id][annotation_two.id] = annotation_type_to_func[match_type](
-                            annotation_one.geo,
-                            annotation_two.geo,
-                            config)
-                    except ZeroDivisionError:
-                        logger.warning(
-                            'Found annotations with area=0!: annotations ids: {!r}, {!r}'.format(annotation_one.id,
-                                                                                                 annotation_two.id))
-                        df[annotation_one.id][annotation_two.id] = 0
+        first_set = list(first_set)
+        second_set = list(second_set)
+        if len(first_set) > 0 and len(second_set) > 0:
+            scores = Matchers.calculate_iou_matrix(first_set=first_set,
+                                                   second_set=second_set,
+                                                   match_type=match_type)
+        else:
+            scores = np.zeros((len(second_set), len(first_set)))
         # for debug - save the annotations scoring matrix
-        matches._annotations_raw_df.append(df.copy())
-
-        # go over all matches
-        while True:
-            # take max IoU score, list the match and remove annotations' ids from columns and rows
-            # keep doing that until no more matches or lower than match threshold
-            max_cell = df.max().max()
-            if max_cell < match_threshold or np.isnan(max_cell):
-                break
-            row_index, col_index = np.where(df == max_cell)
-            row_index = row_index[0]
-            col_index = col_index[0]
-            first_annotation_id = df.columns[col_index]
-            second_annotation_id = df.index[row_index]
-            first_annotation = [a for a in first_set if a.id == first_annotation_id][0]
-            second_annotation = [a for a in second_set if a.id == second_annotation_id][0]
-            geometry_score = df.iloc[row_index, col_index]
+        matches._annotations_raw_df.append(pd.DataFrame(data=scores,
+                                                        columns=[a.id for a in first_set],
+                                                        index=[a.id for a in second_set]))
+
+        # go over all matches - highest IoU first, until no more matches or lower than match threshold
+        matched_first = set()
+        matched_second = set()
+        for row_index, col_index in Matchers.greedy_match(scores=scores, match_threshold=match_threshold):
+            first_annotation = first_set[col_index]
+            second_annotation = second_set[row_index]
+            geometry_score = scores[row_index, col_index]
             labels_score = Matchers.match_labels(label1=first_annotation.label,
                                                  label2=second_annotation.label)
             attribute_score = Matchers.match_attributes(attributes1=first_annotation.attributes,
@@ -369,11 +557,11 @@ class Matchers:
 
             # TODO use ignores for final score
             annotation_score = (geometry_score + attribute_score + labels_score) / 3
-            matches.add(Match(first_annotation_id=first_annotation_id,
+            matches.add(Match(first_annotation_id=first_annotation.id,
                               first_annotation_label=first_annotation.label,
                               first_annotation_confidence=
                               first_annotation.metadata.get('user', dict()).get('model', dict()).get('confidence', 1),
-                              second_annotation_id=second_annotation_id,
+                              second_annotation_id=second_annotation.id,
                               second_annotation_label=second_annotation.label,
                               second_annotation_confidence=
                               second_annotation.metadata.get('user', dict()).get('model', dict()).get('confidence', 1),
@@ -381,23 +569,25 @@ class Matchers:
                               annotation_score=annotation_score,
                               label_score=labels_score,
                               attributes_score=attribute_score))
-            df.drop(index=second_annotation_id, inplace=True)
-            df.drop(columns=first_annotation_id, inplace=True)
+            matched_first.add(col_index)
+            matched_second.add(row_index)
         # add un-matched
-        for second_id in df.index:
-            second_annotation = [a for a in second_set if a.id == second_id][0]
+        for row_index, second_annotation in enumerate(second_set):
+            if row_index in matched_second:
+                continue
             matches.add(match=Match(first_annotation_id=None,
                                     first_annotation_label=None,
                                     first_annotation_confidence=None,
-                                    second_annotation_id=second_id,
+                                    second_annotation_id=second_annotation.id,
                                     second_annotation_label=second_annotation.label,
                                     second_annotation_confidence=
                                     second_annotation.metadata.get('user', dict()).get('model', dict()).get(
                                         'confidence', 1),
                                     ))
-        for first_id in df.columns:
-            first_annotation = [a for a in first_set if a.id == first_id][0]
-            matches.add(match=Match(first_annotation_id=first_id,
+        for col_index, first_annotation in enumerate(first_set):
+            if col_index in matched_first:
+                continue
+            matches.add(match=Match(first_annotation_id=first_annotation.id,
                                     first_annotation_label=first_annotation.label,
                                     first_annotation_confidence=
                                     first_annotation.metadata.get('user', dict()).get('model', dict()).get('confidence',
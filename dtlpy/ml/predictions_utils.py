@@ -5,9 +5,12 @@ import numpy as np
 import traceback
 import datetime
 import logging
+import types
+import time
 import tqdm
 import uuid
 import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from .. import entities
 from . import BaseModelAdapter, metrics
@@ -184,38 +187,219 @@ def measure_item(ref_item: entities.Item, test_item: entities.Item,
             pbar.update()
 
 
+def _lite_annotation(annotation: entities.Annotation, height=None, width=None):
+    """
+    Picklable copy of the annotation fields needed for matching (to send to the measuring processes)
+    """
+    item = None
+    if height is not None and width is not None:
+        item = types.SimpleNamespace(height=height, width=width)
+    geo, cropped_mask = None, None
+    if annotation.type == entities.AnnotationType.SEGMENTATION:
+        # the mask cropped to its bounding box - much smaller to pickle than the full size mask
+        cropped_mask = annotation.annotation_definition.cropped_mask
+    else:
+        geo = annotation.geo
+    return types.SimpleNamespace(id=annotation.id,
+                                 type=annotation.type,
+                                 label=annotation.label,
+                                 attributes=annotation.attributes,
+                                 metadata=annotation.metadata,
+                                 geo=geo,
+                                 cropped_mask=cropped_mask,
+                                 _item=item)
+
+
+def _list_items_annotations(dataset: entities.Dataset, items_sizes: dict, page_size=1000):
+    """
+    Get the annotations of many items using dataset level annotations queries
+
+    :param dataset: dataset of the items
+    :param items_sizes: dictionary of item id to (height, width)
+    :param page_size: annotations page size
+    :return: dictionary of item id to list of annotations
+    """
+    items_annotations = {item_id: list() for item_id in items_sizes}
+    if len(items_sizes) == 0:
+        return items_annotations
+    filters = entities.Filters(resource=entities.FiltersResource.ANNOTATION,
+                               field='itemId',
+                               values=list(items_sizes.keys()),
+                               operator=entities.FiltersOperations.IN)
+    filters.page_size = page_size
+    for page in dataset.annotations.list(filters=filters):
+        for annotation in page:
+            if annotation.item_id not in items_annotations:
+                continue
+            height, width = items_sizes[annotation.item_id]
+            items_annotations[annotation.item_id].append(_lite_annotation(annotation=annotation,
+                                                                          height=height,
+                                                                          width=width))
+    return items_annotations
+
+
+def _measure_annotations_summary(annotations_set_one, annotations_set_two, match_threshold=0.5,
+                                 ignore_labels=False, ignore_attributes=False):
+    """
+    Run measure_annotations and keep only the summaries (runs in the measuring processes)
+    """
+    try:
+        final = measure_annotations(annotations_set_one=annotations_set_one,
+                                    annotations_set_two=annotations_set_two,
+                                    match_threshold=match_threshold,
+                                    ignore_labels=ignore_labels,
+                                    ignore_attributes=ignore_attributes)
+        return True, {key: val.summary() if isinstance(val, metrics.Results) else val for key, val in final.items()}
+    except Exception:
+        return False, traceback.format_exc()
+
+
+def _item_duration(item, project):
+    try:
+        item_duration_s = metrics.item_annotation_duration(item=item, project=project)
+        item_duration = str(datetime.timedelta(seconds=int(np.round(item_duration_s))))
+    except Exception:
+        item_duration_s = -1
+        item_duration = ''
+    return item_duration_s, item_duration
+
+
 def measure_items(ref_items, ref_project, ref_dataset, ref_name,
                   test_items, test_project, test_dataset, test_name,
-                  dump_path=None):
-    from multiprocessing.pool import ThreadPool
-    ref_items_filepath_dict = {item.filename: item for page in ref_items for item in page}
-    test_items_filepath_dict = {item.filename: item for page in test_items for item in page}
-    pool = ThreadPool(processes=32)
-    pbar = tqdm.tqdm(total=len(ref_items_filepath_dict), file=sys.stdout)
-    jobs = dict()
-    for filepath, ref_item in ref_items_filepath_dict.items():
-        if filepath in test_items_filepath_dict:
-            test_item = test_items_filepath_dict[filepath]
-            jobs[ref_item.filename] = pool.apply_async(measure_item, kwds={'test_item': test_item,
-                                                                           'ref_item': ref_item,
-                                                                           'ref_project': ref_project,
-                                                                           'test_project': test_project,
-                                                                           'pbar': pbar})
-    pool.close()
-    pool.join()
-    _ = [job.wait() for job in jobs.values()]
+                  dump_path=None,
+                  match_threshold=0.5,
+                  ignore_labels=False,
+                  ignore_attributes=False,
+                  num_workers=None,
+                  measure_durations=True):
+    """
+    Compare the annotations of two sets of items, matched by filename.
+    Items are streamed page by page: the annotations of each page are fetched with dataset level queries, the geometry
+    matching runs in a process pool and only the per item summaries (not the annotations) are kept.
+
+    :param ref_items: pages of the reference items (e.g dataset.items.list())
+    :param ref_project: reference project
+    :param ref_dataset: reference dataset
+    :param ref_name: reference name for the summary
+    :param test_items: pages of the test items
+    :param test_project: test project
+    :param test_dataset: test dataset
+    :param test_name: test name for the summary
+    :param dump_path: directory to save the summary html and csv
+    :param match_threshold: IoU threshold to count as a match
+    :param ignore_labels: ignore label when comparing - measure only geometry
+    :param ignore_attributes: ignore attribute score for final annotation score
+    :param num_workers: number of measuring processes. default: cpu count. 0 - measure in the calling process
+    :param measure_durations: get the annotation duration of each item (one analytics request per item)
+    :return: summary DataFrame, dictionary of filename to the item results, dictionary of filename to error
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    ref_column_name = 'Ref-{!r}'.format(ref_name)
+    test_column_name = 'Test-{!r}'.format(test_name)
+
+    # keep only the light info of the test items
+    test_items_info = dict()
+    for page in test_items:
+        for item in page:
+            test_items_info[item.filename] = types.SimpleNamespace(id=item.id,
+                                                                   created_at=item.created_at,
+                                                                   height=item.height,
+                                                                   width=item.width,
+                                                                   dataset=item.dataset,
+                                                                   platform_url=item.platform_url)
+
     raw_items_summary = dict()
+    summary_lines = dict()
     failed_items_errors = dict()
-    for filename, job in jobs.items():
-        success, result = job.get()
-        if success:
-            raw_items_summary[filename] = result
-        else:
-            failed_items_errors[filename] = result
-    pool.terminate()
-    pbar.close()
-
-    df, raw_items_summary = create_summary(ref_name=ref_name, test_name=test_name, raw_items_summary=raw_items_summary)
+    totals = {'ref': 0, 'test': 0, 'matched': 0}
+    pbar = tqdm.tqdm(total=len(ref_items) if isinstance(ref_items, entities.PagedEntities) else None,
+                     file=sys.stdout, desc='Measure Items')
+    tic = time.time()
+
+    def collect(future):
+        filename, ref_item, test_info, durations = pending.pop(future)
+        success, result = future.result()
+        pbar.update()
+        if not success:
+            fail_msg = 'failed measuring. ref_item: {!r}, test_item: {!r}'.format(ref_item.id, test_info.id)
+            failed_items_errors[filename] = '{}\n{}'.format(fail_msg, result)
+            return
+        (ref_item_duration_s, ref_item_duration), (test_item_duration_s, test_item_duration) = \
+            [d.result() if d is not None else (-1, '') for d in durations]
+        result.update({'ref_url': ref_item.platform_url,
+                       'test_url': test_info.platform_url,
+                       'filename': ref_item.filename,
+                       'ref_item_duration[s]': ref_item_duration_s,
+                       'test_item_duration[s]': test_item_duration_s,
+                       'diff_duration[s]': test_item_duration_s - ref_item_duration_s,
+                       'ref_item_duration': ref_item_duration,
+                       'test_item_duration': test_item_duration})
+        raw_items_summary[filename] = result
+        summary_lines[filename] = _summary_line(ref_column_name=ref_column_name,
+                                                test_column_name=test_column_name,
+                                                scores=result)
+        for tool_type in list(entities.AnnotationType):
+            if tool_type in result:
+                totals['ref'] += result[tool_type]['n_annotations_set_one']
+                totals['test'] += result[tool_type]['n_annotations_set_two']
+                totals['matched'] += result[tool_type]['n_annotations_matched_total']
+        elapsed = time.time() - tic
+        pbar.set_postfix({'items/s': '{:.1f}'.format(len(raw_items_summary) / elapsed if elapsed > 0 else 0),
+                          'matched': totals['matched']})
+
+    pending = dict()
+    pool = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 0 else None
+    durations_pool = ThreadPoolExecutor(max_workers=32) if measure_durations else None
+    try:
+        for page in ref_items:
+            pairs = [(ref_item, test_items_info[ref_item.filename])
+                     for ref_item in page if ref_item.filename in test_items_info]
+            if len(pairs) == 0:
+                continue
+            ref_annotations = _list_items_annotations(
+                dataset=ref_dataset if ref_dataset is not None else pairs[0][0].dataset,
+                items_sizes={ref_item.id: (ref_item.height, ref_item.width) for ref_item, _ in pairs})
+            test_annotations = _list_items_annotations(
+                dataset=test_dataset if test_dataset is not None else pairs[0][1].dataset,
+                items_sizes={test_info.id: (test_info.height, test_info.width) for _, test_info in pairs})
+            for ref_item, test_info in pairs:
+                kwargs = {'annotations_set_one': ref_annotations.pop(ref_item.id),
+                          'annotations_set_two': test_annotations.pop(test_info.id),
+                          'match_threshold': match_threshold,
+                          'ignore_labels': ignore_labels,
+                          'ignore_attributes': ignore_attributes}
+                if pool is None:
+                    future = Future()
+                    future.set_result(_measure_annotations_summary(**kwargs))
+                else:
+                    future = pool.submit(_measure_annotations_summary, **kwargs)
+                durations = [None, None]
+                if durations_pool is not None:
+                    durations = [durations_pool.submit(_item_duration, item=ref_item, project=ref_project),
+                                 durations_pool.submit(_item_duration, item=test_info, project=test_project)]
+                pending[future] = (ref_item.filename, ref_item, test_info, durations)
+                # bound the number of items in memory
+                while len(pending) >= 2 * max(num_workers, 1):
+                    done, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+                    for future_done in done:
+                        collect(future_done)
+        for future in list(pending.keys()):
+            collect(future)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if durations_pool is not None:
+            durations_pool.shutdown()
+        pbar.close()
+    elapsed = time.time() - tic
+    logger.info('Measured {} items in {:.1f}[s] ({:.1f} items/s). annotations: ref: {}, test: {}, matched: {}'.format(
+        len(raw_items_summary), elapsed, len(raw_items_summary) / elapsed if elapsed > 0 else 0,
+        totals['ref'], totals['test'], totals['matched']))
+
+    df = pd.DataFrame(list(summary_lines.values()))
+    # Drop column only if all the values are None
+    df = df.dropna(how='all', axis=1)
 
     if len(failed_items_errors) != 0:
         logger.error(failed_items_errors)
@@ -227,27 +411,32 @@ def measure_items(ref_items, ref_project, ref_dataset, ref_name,
     return df, raw_items_summary, failed_items_errors
 
 
+def _summary_line(ref_column_name, test_column_name, scores):
+    line = {'filename': scores['filename'],
+            ref_column_name: scores['ref_url'],
+            test_column_name: scores['test_url'],
+            'total_score': scores['total_mean_score'],
+            'ref_duration[s]': scores['ref_item_duration[s]'],
+            'test_duration[s]': scores['test_item_duration[s]'],
+            'diff_duration[s]': scores['diff_duration[s]']}
+    for tool_type in list(entities.AnnotationType):
+        if tool_type in scores:
+            res = scores[tool_type]
+            if isinstance(res, metrics.Results):
+                res = res.summary()
+            line['{}_annotation_score'.format(tool_type)] = res['mean_annotations_scores']
+            line['{}_attributes_score'.format(tool_type)] = res['mean_attributes_scores']
+            line['{}_ref_number'.format(tool_type)] = res['n_annotations_set_one']
+            line['{}_test_number'.format(tool_type)] = res['n_annotations_set_two']
+            line['{}_match_number'.format(tool_type)] = res['n_annotations_matched_total']
+    return line
+
+
 def create_summary(ref_name, test_name, raw_items_summary):
-    summary = list()
     ref_column_name = 'Ref-{!r}'.format(ref_name)
     test_column_name = 'Test-{!r}'.format(test_name)
-    for filename, scores in raw_items_summary.items():
-        line = {'filename': scores['filename'],
-                ref_column_name: scores['ref_url'],
-                test_column_name: scores['test_url'],
-                'total_score': scores['total_mean_score'],
-                'ref_duration[s]': scores['ref_item_duration[s]'],
-                'test_duration[s]': scores['test_item_duration[s]'],
-                'diff_duration[s]': scores['diff_duration[s]']}
-        for tool_type in list(entities.AnnotationType):
-            if tool_type in scores:
-                res = scores[tool_type].summary()
-                line['{}_annotation_score'.format(tool_type)] = res['mean_annotations_scores']
-                line['{}_attributes_score'.format(tool_type)] = res['mean_attributes_scores']
-                line['{}_ref_number'.format(tool_type)] = res['n_annotations_set_one']
-                line['{}_test_number'.format(tool_type)] = res['n_annotations_set_two']
-                line['{}_match_number'.format(tool_type)] = res['n_annotations_matched_total']
-        summary.append(line)
+    summary = [_summary_line(ref_column_name=ref_column_name, test_column_name=test_column_name, scores=scores)
+               for scores in raw_items_summary.values()]
     df = pd.DataFrame(summary)
     # Drop column only if all the values are None
     df = df.dropna(how='all', axis=1)
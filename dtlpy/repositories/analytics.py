@@ -1,5 +1,4 @@
 import logging
-import pandas as pd
 from dtlpy import entities, exceptions
 from ..services.api_client import ApiClient
 
@@ -22,7 +21,7 @@ class Analytics:
     ############
     #  methods #
     ############
-    def get_samples(self, query=None, return_field: str = None, return_raw: bool = False) -> pd.DataFrame:
+    def get_samples(self, query=None, return_field: str = None, return_raw: bool = False) -> 'pd.DataFrame':
         """
         Get Analytics table
 
@@ -43,6 +42,7 @@ class Analytics:
             res = response.json()
         if return_raw:
             return res
+        import pandas as pd
         if isinstance(res, dict):
             df = pd.DataFrame.from_dict(res, orient="index")
         elif isinstance(res, list):
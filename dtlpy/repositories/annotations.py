@@ -1,10 +1,18 @@
+from concurrent.futures import Future, wait as futures_wait
 from copy import deepcopy
 import traceback
+import itertools
+import threading
+import asyncio
 import logging
+import time
 import json
 import os
 from PIL import Image
 from io import BytesIO
+import numpy as np
+import requests
+import aiohttp
 import base64
 
 from .. import entities, exceptions, miscellaneous, _api_reference
@@ -13,6 +21,36 @@ from ..services.api_client import ApiClient
 logger = logging.getLogger(name='dtlpy')
 
 
+# connection errors and timeouts of the request itself (sync and async)
+_RETRIABLE_UPLOAD_EXCEPTIONS = (requests.exceptions.ConnectionError,
+                                requests.exceptions.Timeout,
+                                aiohttp.ClientConnectionError,
+                                asyncio.TimeoutError)
+
+
+def _is_retriable_upload_error(status_code=None, error=None):
+    """
+    Timeouts, throttling, server and connection errors are worth retrying. other client errors (4xx) are not,
+    and neither are other exceptions (e.g the response could not be parsed - the batch may have been created)
+
+    :param status_code: the response status code
+    :param error: the exception of the request (instead of a response)
+    """
+    if error is not None:
+        return isinstance(error, _RETRIABLE_UPLOAD_EXCEPTIONS)
+    if status_code is None:
+        return False
+    status_code = str(status_code)
+    return status_code in ['408', '429'] or status_code.startswith('5')
+
+
+def _is_retriable_upload_response(response):
+    if str(response.status_code) == '3001':
+        # sdk error of the async request - retry only if the request itself failed
+        return _is_retriable_upload_error(error=getattr(response.async_resp, 'error', None))
+    return _is_retriable_upload_error(status_code=response.status_code)
+
+
 class Annotations:
     """
     Annotations Repository
@@ -142,7 +180,8 @@ class Annotations:
         return response.json()
 
     @_api_reference.add(path='/datasets/{id}/query', method='post')
-    def list(self, filters: entities.Filters = None, page_offset: int = None, page_size: int = None):
+    def list(self, filters: entities.Filters = None, page_offset: int = None, page_size: int = None,
+             prefetch: int = 0, raw: bool = False, fields: list = None):
         """
         List Annotations of a specific item. You must get the item first and then list the annotations with the desired filters.
 
@@ -152,7 +191,12 @@ class Annotations:
         :param dtlpy.entities.filters.Filters filters: Filters entity or a dictionary containing filters parameters
         :param int page_offset: starting page
         :param int page_size: size of page
-        :return: Pages object
+        :param int prefetch: number of pages to read ahead in the background while iterating the pages (0 - disabled)
+        :param bool raw: if True, pages hold read-only EntityView objects over the json instead of Annotation entities.
+                         Use `view.to_entity()` to get the Annotation
+        :param list fields: keep only these (dot separated) json fields in the views, e.g ['label', 'itemId'].
+                            Implies raw. `view.to_entity()` will get the Annotation from the platform
+        :return: Pages object (or a list of views for an item with raw=True)
         :rtype: dtlpy.entities.paged_entities.PagedEntities
 
         **Example**:
@@ -202,6 +246,9 @@ class Annotations:
                                            filters=filters,
                                            page_offset=page_offset,
                                            page_size=page_size,
+                                           prefetch=prefetch,
+                                           raw=raw,
+                                           fields=fields,
                                            client_api=self._client_api)
             paged.get_page()
 
@@ -212,6 +259,8 @@ class Annotations:
                         annotations += page
                 else:
                     annotations = paged.items
+                if raw or fields is not None:
+                    return miscellaneous.List(annotations)
                 return entities.AnnotationCollection(annotations=annotations, item=self._item)
             else:
                 return paged
@@ -576,15 +625,13 @@ class Annotations:
                 last_frame = frame
         return annotation
 
-    def _create_batches_for_upload(self, annotations, merge=False):
+    def _iter_batches_for_upload(self, annotations):
         """
-        receives a list of annotations and split them into batches to optimize the upload
+        Serialize the annotations lazily, one batch at a time, so a batch can be uploaded while the next one is built
 
         :param annotations: list of all annotations
-        :param merge: bool - merge the new binary annotations with the existing annotations
-        :return: batch_annotations: list of list of annotation. each batch with size self._upload_batch_size
+        :return: generator of list of annotation json. each batch with size self._upload_batch_size
         """
-        annotation_batches = list()
         single_batch = list()
         for annotation in annotations:
             if isinstance(annotation, str):
@@ -602,10 +649,20 @@ class Annotations:
             annotation = self._annotation_encoding(annotation)
             single_batch.append(annotation)
             if len(single_batch) >= self._upload_batch_size:
-                annotation_batches.append(single_batch)
+                yield single_batch
                 single_batch = list()
         if len(single_batch) > 0:
-            annotation_batches.append(single_batch)
+            yield single_batch
+
+    def _create_batches_for_upload(self, annotations, merge=False):
+        """
+        receives a list of annotations and split them into batches to optimize the upload
+
+        :param annotations: list of all annotations
+        :param merge: bool - merge the new binary annotations with the existing annotations
+        :return: batch_annotations: list of list of annotation. each batch with size self._upload_batch_size
+        """
+        annotation_batches = list(self._iter_batches_for_upload(annotations=annotations))
         if merge and self.item:
             annotation_batches = self._merge_new_annotations(annotation_batches)
             annotation_batches = self._merge_to_exits_annotations(annotation_batches)
@@ -708,80 +765,136 @@ class Annotations:
 
         return annotations_batch
 
-    def _upload_single_batch(self, annotation_batch):
+    def _upload_batch_with_retries(self, annotation_batch, retries=None, retry_backoff=1):
+        """
+        Upload a single batch, retrying on timeouts, throttling and server errors
+
+        :param list annotation_batch: list of annotation json
+        :param int retries: number of retries after the first attempt. default: client_api.annotations_upload_retries
+        :param float retry_backoff: seconds to wait before the first retry (doubled on each retry)
+        :return: tuple of (success, list of uploaded annotations json or error, number of attempts)
+        """
+        if retries is None:
+            retries = self._client_api.annotations_upload_retries
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                suc, response = self._client_api.gen_request(req_type='post',
+                                                             path='/items/{}/annotations'.format(self.item.id),
+                                                             json_req=annotation_batch)
+            except Exception as e:
+                # only the request is retried - the batch is not posted again after a response was received
+                if attempt > retries or not _is_retriable_upload_error(error=e):
+                    return False, traceback.format_exc(), attempt
+                error = e
+            else:
+                if suc or attempt > retries or not _is_retriable_upload_response(response=response):
+                    break
+                error = 'status code: {}'.format(response.status_code)
+            wait = retry_backoff * (2 ** (attempt - 1))
+            logger.debug('Annotations batch upload failed (attempt {}), retrying in {}[s]: {}'.format(attempt,
+                                                                                                  wait,
+                                                                                                  error))
+            time.sleep(wait)
         try:
-            suc, response = self._client_api.gen_request(req_type='post',
-                                                         path='/items/{}/annotations'.format(self.item.id),
-                                                         json_req=annotation_batch)
             if self._client_api.check_response(suc, response, path='/annotations') is False:
-                return False, "Error suppressed"
+                return False, "Error suppressed", attempt
             return_annotations = response.json()
             if not isinstance(return_annotations, list):
                 return_annotations = [return_annotations]
-
-            status = True
-            result = return_annotations
+            return True, return_annotations, attempt
         except Exception:
-            status = False
-            result = traceback.format_exc()
-
-        return status, result
+            return False, traceback.format_exc(), attempt
 
     def _upload_annotations_batches(self, annotation_batches):
-        if len(annotation_batches) == 1:
-            # no need for threads
-            status, result = self._upload_single_batch(annotation_batch=annotation_batches[0])
-            if status is False:
-                logger.error(result)
-                logger.error('Annotation/s uploaded with errors')
-                # TODO need to raise errors?
-            uploaded_annotations = result
-        else:
-            # threading
-            pool = self._client_api.thread_pools(pool_name='annotation.upload')
-            jobs = [None for _ in range(len(annotation_batches))]
-            for i_ann, annotations_batch in enumerate(annotation_batches):
-                jobs[i_ann] = pool.submit(self._upload_single_batch,
-                                          annotation_batch=annotations_batch)
-            # get all results
-            results = [j.result() for j in jobs]
-            uploaded_annotations = [ann for ann_list in results for ann in ann_list[1] if ann_list[0] is True]
-            out_errors = [r[1] for r in results if r[0] is False]
-            if len(out_errors) != 0:
-                logger.error(out_errors)
-                logger.error('Annotation/s uploaded with errors')
-                # TODO need to raise errors?
+        """
+        Upload the batches with a bounded number of batches in flight
+
+        :param annotation_batches: list or generator of list of annotation json
+        :return: list of uploaded annotations json
+        """
+        with AnnotationsUploadQueue(client_api=self._client_api) as upload_queue:
+            future = upload_queue._put(annotations_repo=self, annotation_batches=annotation_batches)
+        uploaded_annotations = future.result()
         logger.info('Annotation/s uploaded successfully. num: {}'.format(len(uploaded_annotations)))
         return uploaded_annotations
 
+    async def _async_upload_single_batch(self, annotation_batch, retries, retry_backoff=1):
+        attempt = 0
+        async with self._client_api.event_loop.semaphore('annotations.upload.batch',
+                                                         n=self._client_api.annotations_upload_max_in_flight):
+            while True:
+                attempt += 1
+                success, response = await self._client_api.gen_async_request(req_type='post',
+                                                                             path='/items/{}/annotations'
+                                                                             .format(self.item.id),
+                                                                             json_req=annotation_batch)
+                if success or attempt > retries or not _is_retriable_upload_response(response=response):
+                    return success, response
+                await asyncio.sleep(retry_backoff * (2 ** (attempt - 1)))
+
     async def _async_upload_annotations(self, annotations, merge=False):
         """
         Async function to run from the uploader. will use asyncio to not break the async
+        The batches are posted concurrently, bounded by client_api.annotations_upload_max_in_flight across all items
+
         :param annotations: list of all annotations
         :param merge: bool - merge the new binary annotations with the existing annotations
         :return:
         """
         async with self._client_api.event_loop.semaphore('annotations.upload'):
             annotation_batch = self._create_batches_for_upload(annotations=annotations, merge=merge)
+            responses = await asyncio.gather(
+                *[self._async_upload_single_batch(annotation_batch=annotations_list,
+                                                  retries=self._client_api.annotations_upload_retries)
+                  for annotations_list in annotation_batch])
             output_annotations = list()
-            for annotations_list in annotation_batch:
-                success, response = await self._client_api.gen_async_request(req_type='post',
-                                                                             path='/items/{}/annotations'
-                                                                             .format(self.item.id),
-                                                                             json_req=annotations_list)
+            for success, response in responses:
                 if self._client_api.check_response(success, response, path='/annotations') is False:
-                    if len(output_annotations) > 0:
-                        logger.warning("Only {} annotations from {} annotations have been uploaded".
-                                       format(len(output_annotations), len(annotations)))
-                    return None
+                    continue
                 return_annotations = response.json()
                 if not isinstance(return_annotations, list):
                     return_annotations = [return_annotations]
                 output_annotations.extend(return_annotations)
+            if not all([success for success, _ in responses]):
+                if len(output_annotations) > 0:
+                    logger.warning("Only {} annotations from {} annotations have been uploaded".
+                                   format(len(output_annotations), len(annotations)))
+                return None
 
             result = entities.AnnotationCollection.from_json(_json=output_annotations, item=self.item)
             return result
 
+    def upload_queue(self, max_in_flight=None, retries=None):
+        """
+        Create a queue to upload annotations of many items concurrently.
+        Annotations are serialized in batches on the calling thread while the previous batches (of any item) are
+        uploaded in the background. The number of batches in flight is bounded, so `put` blocks when the upload falls
+        behind. Use as a context manager to wait for all the uploads on exit.
+
+        **Prerequisites**: Any user can upload annotations.
+
+        :param int max_in_flight: maximum number of batches being uploaded at once.
+         default: client_api.annotations_upload_max_in_flight (env ANNOTATIONS_UPLOAD_MAX_IN_FLIGHT)
+        :param int retries: number of retries of a failed batch.
+         default: client_api.annotations_upload_retries (env ANNOTATIONS_UPLOAD_RETRIES)
+        :return: AnnotationsUploadQueue object
+        :rtype: dtlpy.repositories.annotations.AnnotationsUploadQueue
+
+        **Example**:
+
+        .. code-block:: python
+
+            with dl.annotations.upload_queue(max_in_flight=32) as upload_queue:
+                for item, builder in predictions:
+                    upload_queue.put(item=item, annotations=builder)
+            print(upload_queue.stats())
+        """
+        return AnnotationsUploadQueue(client_api=self._client_api,
+                                      max_in_flight=max_in_flight,
+                                      retries=retries)
+
     @_api_reference.add(path='/items/{itemId}/annotations', method='post')
     def upload(self, annotations, merge=False) -> entities.AnnotationCollection:
         """
@@ -823,7 +936,11 @@ class Annotations:
             logger.warning('Annotation upload receives 0 annotations. Not doing anything')
             out_annotations = list()
         else:
-            annotation_batches = self._create_batches_for_upload(annotations=annotations, merge=merge)
+            if merge:
+                annotation_batches = self._create_batches_for_upload(annotations=annotations, merge=merge)
+            else:
+                # serialize and upload the batches as a stream
+                annotation_batches = self._iter_batches_for_upload(annotations=annotations)
             out_annotations = self._upload_annotations_batches(annotation_batches=annotation_batches)
         out_annotations = entities.AnnotationCollection.from_json(_json=out_annotations,
                                                                   item=self.item)
@@ -907,3 +1024,217 @@ class Annotations:
     ##################
     # async function #
     ##################
+
+
+class AnnotationsUploadQueue:
+    """
+    Cross-item annotations upload queue.
+
+    Each call to `put` serializes the annotations in batches on the calling thread and submits every batch to the
+    `annotation.upload` thread pool as soon as it is built, so serialization and http posts of all the items run
+    concurrently. The number of batches in flight is bounded by `max_in_flight` - `put` blocks when the upload falls
+    behind. A failed batch is retried on its own, and the queue keeps throughput and per-batch latency statistics.
+    """
+
+    def __init__(self, client_api: ApiClient, max_in_flight=None, retries=None, retry_backoff=1):
+        """
+        :param client_api: ApiClient
+        :param int max_in_flight: maximum number of batches being uploaded at once
+        :param int retries: number of retries of a failed batch
+        :param float retry_backoff: seconds to wait before the first retry (doubled on each retry)
+        """
+        if max_in_flight is None:
+            max_in_flight = client_api.annotations_upload_max_in_flight
+        if retries is None:
+            retries = client_api.annotations_upload_retries
+        if max_in_flight < 1:
+            raise exceptions.PlatformException(error='400', message='max_in_flight must be a positive integer')
+        self._client_api = client_api
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._pending = set()
+        # statistics
+        self._start_time = None
+        self._end_time = None
+        self._num_items = 0
+        self._num_annotations = 0
+        self._num_batches = 0
+        self._num_failed_batches = 0
+        self._num_retries = 0
+        self._latencies = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wait()
+
+    def put(self, item: entities.Item, annotations, merge=False) -> Future:
+        """
+        Add the annotations of an item to the upload queue. Blocks while the queue is full.
+
+        :param dtlpy.entities.item.Item item: the item to upload the annotations to
+        :param annotations: list of Annotation/json or AnnotationCollection
+        :param bool merge: optional - merge the new binary annotations with the existing annotations
+        :return: a future of the uploaded AnnotationCollection of the item
+        :rtype: concurrent.futures.Future
+        """
+        annotations_repo = item.annotations
+        if isinstance(annotations, entities.AnnotationCollection):
+            annotations = annotations.annotations
+        elif isinstance(annotations, (entities.Annotation, dict)):
+            annotations = [annotations]
+        if merge:
+            annotation_batches = annotations_repo._create_batches_for_upload(annotations=annotations, merge=merge)
+        else:
+            annotation_batches = annotations_repo._iter_batches_for_upload(annotations=annotations)
+        return self._put(annotations_repo=annotations_repo,
+                         annotation_batches=annotation_batches,
+                         to_collection=True)
+
+    def _put(self, annotations_repo: Annotations, annotation_batches, to_collection=False) -> Future:
+        """
+        Submit the batches of a single item
+
+        :param annotations_repo: Annotations repository of the item
+        :param annotation_batches: list or generator of list of annotation json
+        :param bool to_collection: the future result is an AnnotationCollection. otherwise a list of annotations json
+        :return: a future of the uploaded annotations of the item
+        """
+        item_future = Future()
+        # the first count is held until all the batches were submitted
+        state = {'remaining': 1, 'results': dict(), 'errors': list(), 'exception': None}
+
+        def finish():
+            uploaded = [ann
+                        for i_batch in sorted(state['results'])
+                        for ann in state['results'][i_batch]]
+            if len(state['errors']) > 0:
+                logger.error('Annotation/s uploaded with errors. item: {}, failed batches: {}'.format(
+                    annotations_repo.item.id, len(state['errors'])))
+            if state['exception'] is not None:
+                item_future.set_exception(state['exception'])
+            else:
+                if to_collection:
+                    uploaded = entities.AnnotationCollection.from_json(_json=uploaded, item=annotations_repo.item)
+                item_future.set_result(uploaded)
+            with self._lock:
+                self._pending.discard(item_future)
+                self._end_time = time.time()
+
+        def batch_done(i_batch, num_annotations, job):
+            try:
+                status, result, attempts, latency = job.result()
+            except Exception:
+                status, result, attempts, latency = False, traceback.format_exc(), 1, 0
+            finally:
+                self._in_flight.release()
+            if status is not True:
+                logger.error(result)
+            with self._lock:
+                self._num_retries += attempts - 1
+                self._latencies.append(latency)
+                if status is True:
+                    self._num_annotations += num_annotations
+                    state['results'][i_batch] = result
+                else:
+                    self._num_failed_batches += 1
+                    state['errors'].append(result)
+                state['remaining'] -= 1
+                done = state['remaining'] == 0
+            if done:
+                finish()
+
+        with self._lock:
+            if self._start_time is None:
+                self._start_time = time.time()
+            self._num_items += 1
+            self._pending.add(item_future)
+        try:
+            annotation_batches = iter(annotation_batches)
+            first_batch = next(annotation_batches, None)
+            second_batch = next(annotation_batches, None) if first_batch is not None else None
+            if first_batch is not None and second_batch is None:
+                # single batch - no need for threads
+                annotation_batches = [first_batch]
+                pool = None
+            else:
+                annotation_batches = itertools.chain([first_batch, second_batch], annotation_batches)
+                pool = self._client_api.thread_pools(pool_name='annotation.upload')
+            for i_batch, annotation_batch in enumerate(annotation_batches):
+                if annotation_batch is None:
+                    break
+                self._in_flight.acquire()
+                with self._lock:
+                    self._num_batches += 1
+                    state['remaining'] += 1
+                if pool is None:
+                    job = Future()
+                    job.set_result(self._upload_batch(annotations_repo, annotation_batch))
+                else:
+                    job = pool.submit(self._upload_batch, annotations_repo, annotation_batch)
+                job.add_done_callback(lambda j, i=i_batch, n=len(annotation_batch): batch_done(i, n, j))
+        except Exception as e:
+            # e.g an invalid annotation in the lazy serialization - the item fails when the submitted batches are done
+            state['exception'] = e
+            raise
+        finally:
+            with self._lock:
+                state['remaining'] -= 1
+                done = state['remaining'] == 0
+            if done:
+                finish()
+        return item_future
+
+    def _upload_batch(self, annotations_repo: Annotations, annotation_batch):
+        tic = time.time()
+        status, result, attempts = annotations_repo._upload_batch_with_retries(annotation_batch=annotation_batch,
+                                                                               retries=self.retries,
+                                                                               retry_backoff=self.retry_backoff)
+        return status, result, attempts, time.time() - tic
+
+    def wait(self, timeout=None):
+        """
+        Wait for all the queued uploads to finish
+
+        :param float timeout: maximum time to wait in seconds. None to wait forever
+        :return: True if all the uploads finished
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if len(pending) == 0:
+            return True
+        _, not_done = futures_wait(pending, timeout=timeout)
+        return len(not_done) == 0
+
+    def stats(self) -> dict:
+        """
+        Upload statistics
+
+        :return: dict of counts, throughput (annotations per second) and batch latency percentiles in seconds
+        """
+        with self._lock:
+            latencies = np.asarray(self._latencies)
+            if self._start_time is None:
+                duration = 0
+            elif len(self._pending) > 0 or self._end_time is None:
+                duration = time.time() - self._start_time
+            else:
+                duration = self._end_time - self._start_time
+            stats = {'items': self._num_items,
+                     'annotations': self._num_annotations,
+                     'batches': self._num_batches,
+                     'failed_batches': self._num_failed_batches,
+                     'retries': self._num_retries,
+                     'in_flight': len(self._pending),
+                     'duration': duration,
+                     'annotations_per_second': self._num_annotations / duration if duration > 0 else 0}
+        if latencies.size > 0:
+            stats['batch_latency'] = {'mean': float(latencies.mean()),
+                                      'p50': float(np.percentile(latencies, 50)),
+                                      'p95': float(np.percentile(latencies, 95)),
+                                      'max': float(latencies.max())}
+        return stats
@@ -208,7 +208,7 @@ class Codebases:
         return codebase
 
     @staticmethod
-    def get_current_version(all_versions_pages, zip_md):
+    def get_current_version(all_versions_pages, zip_md=None, source_hash=None):
         """
         This method returns the current version of the codebase and other versions found.
 
@@ -216,6 +216,7 @@ class Codebases:
 
         :param codebase all_versions_pages: codebase object
         :param zip_md: zipped file of codebase
+        :param str source_hash: the codebase source directory hash (Zipping.directory_hash)
         :return: current version and all versions found of codebase
         :rtype: int, int
 
@@ -232,8 +233,13 @@ class Codebases:
             # get latest version
             if int(os.path.splitext(v_item.item.name)[0]) > latest_version:
                 latest_version = int(os.path.splitext(v_item.item.name)[0])
+            system_metadata = v_item.item.metadata['system']
+            # check source hash to find same codebase
+            if source_hash is not None and system_metadata.get('sourceHash') == source_hash:
+                same_version_found = v_item
+                break
             # check md5 to find same codebase
-            if 'md5' in v_item.item.metadata['system'] and v_item.item.metadata['system']['md5'] == zip_md:
+            if zip_md is not None and system_metadata.get('md5') == zip_md:
                 same_version_found = v_item
                 break
         return latest_version + 1, same_version_found
@@ -282,12 +288,9 @@ class Codebases:
                 raise PlatformException(error='400', message='Not a directory: {}'.format(directory))
             directory = os.path.abspath(directory)
 
-            # create zipfile
-            miscellaneous.Zipping.zip_directory(zip_filename=zip_filename,
-                                                directory=directory,
-                                                ignore_directories=ignore_directories,
-                                                ignore_max_file_size=ignore_max_file_size)
-            zip_md = self.__file_hash(zip_filename)
+            # hash the sources - an unchanged codebase is not zipped or uploaded again
+            source_hash = miscellaneous.Zipping.directory_hash(directory=directory,
+                                                               ignore_directories=ignore_directories)
 
             # get latest version
             same_version_found = None
@@ -300,13 +303,20 @@ class Codebases:
                 current_version = 0
             else:
                 current_version, same_version_found = self.get_current_version(all_versions_pages=all_versions_pages,
-                                                                               zip_md=zip_md)
+                                                                               source_hash=source_hash)
 
             if same_version_found is not None:
-                # same md5 hash file found in version - return the matched version
+                # same sources found in version - return the matched version
                 codebase = same_version_found
             else:
                 # no matched version was found - create a new version
+                # create zipfile
+                miscellaneous.Zipping.zip_directory(zip_filename=zip_filename,
+                                                    directory=directory,
+                                                    ignore_directories=ignore_directories,
+                                                    ignore_max_file_size=ignore_max_file_size)
+                zip_md = self.__file_hash(zip_filename)
+
                 # read from zipped file
                 with open(zip_filename, 'rb') as f:
                     buffer = io.BytesIO(f.read())
@@ -323,6 +333,7 @@ class Codebases:
                     item.metadata['system'] = dict()
                 item.metadata['system']['description'] = description
                 item.metadata['system']['md5'] = zip_md
+                item.metadata['system']['sourceHash'] = source_hash
 
                 # add git info to metadata
                 if miscellaneous.GitUtils.is_git_repo(path=directory):
@@ -1,4 +1,6 @@
 import numpy as np
+import functools
+import asyncio
 import logging
 import time
 import tqdm
@@ -98,6 +100,7 @@ class Commands:
                          file=sys.stdout,
                          desc=f'Command {command_id}')
         num_tries = 1
+        last_progress = None
         while elapsed < timeout:
             command = self.get(command_id=command_id, url=url)
             pbar.set_description(f'Command {command.id} ({command.status})')
@@ -111,6 +114,10 @@ class Commands:
             if not command.in_progress():
                 break
             elapsed = time.time() - start
+            if last_progress is not None and command.progress != last_progress:
+                # still progressing - keep polling often
+                num_tries = 1
+            last_progress = command.progress
             sleep_time = np.min([timeout - elapsed, backoff_factor * (2 ** num_tries), MAX_SLEEP_TIME])
             num_tries += 1
             logger.debug(f"Command {command.id} is running for {elapsed:.2f}[s]. Sleeping for {sleep_time:.2f}[s]")
@@ -133,6 +140,100 @@ class Commands:
                                                                                       command.error))
         return command
 
+    def wait_many(self, command_ids, timeout=0, backoff_factor=1, max_sleep_time=MAX_SLEEP_TIME, on_complete=None,
+                  iteration_callback=None):
+        """
+        Wait for many commands at once. Each polling cycle gets all the commands that are still running in
+        parallel. The polling interval backs off while nothing changes and resets when any command progresses or
+        completes.
+
+        :param list command_ids: commands ids to wait to
+        :param int timeout: int, seconds to wait until TimeoutError is raised. if 0 - wait until done
+        :param float backoff_factor: A backoff factor to apply between attempts after the second try
+        :param float max_sleep_time: max seconds between polling
+        :param function on_complete: function to call with each command when it is done
+        :param function iteration_callback: function to call on each iteration with the list of the latest commands
+        :return: list of Command objects (same order as the input)
+        """
+        elapsed = 0
+        start = time.time()
+        if timeout is None or timeout <= 0:
+            timeout = np.inf
+
+        latest = {command_id: None for command_id in command_ids}
+        pending = list(latest.keys())
+        pool = self._client_api.thread_pools(pool_name='command.wait')
+        num_tries = 1
+        while len(pending) > 0:
+            changed = False
+            jobs = [pool.submit(self.get, command_id=command_id) for command_id in pending]
+            still_pending = list()
+            for command_id, job in zip(pending, jobs):
+                command = job.result()
+                previous = latest[command_id]
+                if previous is None or (previous.status, previous.progress) != (command.status, command.progress):
+                    changed = True
+                latest[command_id] = command
+                if command.in_progress():
+                    still_pending.append(command_id)
+                elif on_complete is not None:
+                    try:
+                        on_complete(command)
+                    except Exception as e:
+                        logger.warning('on_complete failed: {}'.format(e.__str__()))
+            pending = still_pending
+            if iteration_callback is not None:
+                try:
+                    iteration_callback([latest[command_id] for command_id in command_ids])
+                except Exception as e:
+                    logger.warning('iteration_callback failed: {}'.format(e.__str__()))
+            if len(pending) == 0:
+                break
+            elapsed = time.time() - start
+            if elapsed >= timeout:
+                raise TimeoutError("commands wait_many() got timeout. {} commands still running: {!r}".format(
+                    len(pending), pending[:10]))
+            if changed:
+                num_tries = 1
+            sleep_time = np.min([timeout - elapsed, backoff_factor * (2 ** num_tries), max_sleep_time])
+            num_tries += 1
+            logger.debug(f"{len(pending)} commands are running for {elapsed:.2f}[s]. Sleeping for {sleep_time:.2f}[s]")
+            time.sleep(sleep_time)
+
+        commands = [latest[command_id] for command_id in command_ids]
+        failed = [command for command in commands if command.status != entities.CommandsStatus.SUCCESS]
+        if len(failed) > 0:
+            raise exceptions.PlatformException(error='424',
+                                               message="{} commands did not succeed: {}".format(
+                                                   len(failed),
+                                                   ', '.join("{!r} {}: '{}'".format(command.id,
+                                                                                    command.status,
+                                                                                    command.error)
+                                                             for command in failed[:10])))
+        return miscellaneous.List(commands)
+
+    async def wait_many_async(self, command_ids, timeout=0, backoff_factor=1, max_sleep_time=MAX_SLEEP_TIME,
+                              on_complete=None, iteration_callback=None):
+        """
+        Async version of wait_many - waits in a worker thread without blocking the event loop
+
+        :param list command_ids: commands ids to wait to
+        :param int timeout: int, seconds to wait until TimeoutError is raised. if 0 - wait until done
+        :param float backoff_factor: A backoff factor to apply between attempts after the second try
+        :param float max_sleep_time: max seconds between polling
+        :param function on_complete: function to call with each command when it is done
+        :param function iteration_callback: function to call on each iteration with the list of the latest commands
+        :return: list of Command objects (same order as the input)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.wait_many,
+                                                                  command_ids=command_ids,
+                                                                  timeout=timeout,
+                                                                  backoff_factor=backoff_factor,
+                                                                  max_sleep_time=max_sleep_time,
+                                                                  on_complete=on_complete,
+                                                                  iteration_callback=iteration_callback))
+
     def abort(self, command_id: str):
         """
         Abort Command
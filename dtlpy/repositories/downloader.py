@@ -4,10 +4,13 @@ import json
 import logging
 import multiprocessing
 import os
+import queue
 import shutil
 import sys
 import tempfile
+import threading
 import traceback
+from concurrent.futures import wait
 from pathlib import Path
 from urllib.parse import unquote, urlparse
 
@@ -859,7 +862,7 @@ class Downloader:
                           overwrite,
                           annotation_options,
                           annotation_filters,
-                          chunk_size=8192,
+                          chunk_size=None,
                           thickness=1,
                           with_text=False,
                           alpha=1,
@@ -877,7 +880,7 @@ class Downloader:
         :param overwrite: overwrite the file is existing
         :param annotation_options: download annotations options: list(dl.ViewAnnotationOptions)
         :param annotation_filters: Filters entity to filter item's annotation
-        :param chunk_size: size of chunks to download - optional. default = 8192
+        :param chunk_size: size of chunks to download - optional. default - by the download size (64KB to 1MB)
         :param thickness: optional - line thickness, if -1 annotation will be filled, default =1
         :param with_text: optional - add text to annotations, default = False
         :param alpha: opacity value [0 1], default 1
@@ -889,11 +892,45 @@ class Downloader:
         if save_locally and os.path.isfile(local_filepath):
             need_to_download = overwrite
 
+        client_api = self.items_repository._client_api
         item, url, is_url, is_local_link = self.__get_link_source(item=item)
 
+        # same content already downloaded (e.g. from another dataset) - link from the blob store
+        downloaded = False
+        blob_store, blob_key = None, None
+        if need_to_download and save_locally and not is_url and not client_api.sdk_cache.use_cache:
+            blob_store = client_api.blob_store
+            if blob_store is not None:
+                blob_key = blob_store.key(item=item)
+            if blob_key is not None:
+                downloaded = blob_store.materialize(key=blob_key,
+                                                    filepath=local_filepath,
+                                                    size=blob_store.item_size(item=item))
+                if downloaded:
+                    blob_key = None
+        # large items - download in parallel byte ranges
+        if not downloaded and need_to_download and save_locally and self.__use_parallel_download(item=item,
+                                                                                                   is_url=is_url):
+            downloaded = self.__parallel_download(item=item, local_filepath=local_filepath)
+
         # save as byte stream
         data = io.BytesIO()
-        if need_to_download:
+        if downloaded:
+            data = local_filepath
+            # if image - can download annotation mask
+            if item.annotated and annotation_options:
+                self._download_img_annotations(item=item,
+                                               img_filepath=local_filepath,
+                                               annotation_options=annotation_options,
+                                               annotation_filters=annotation_filters,
+                                               local_path=local_path,
+                                               overwrite=overwrite,
+                                               thickness=thickness,
+                                               alpha=alpha,
+                                               with_text=with_text,
+                                               export_version=export_version
+                                               )
+        elif need_to_download:
             chunk_resume = {0: 0}
             start_point = 0
             download_done = False
@@ -932,6 +969,7 @@ class Downloader:
                         response.seek(0, 2)
                         total_length = response.tell()
                         response.seek(0)
+                    read_size = chunk_size if chunk_size is not None else self._chunk_size(total_length)
                     one_file_pbar = None
                     try:
                         one_file_progress_bar = total_length is not None and int(
@@ -967,9 +1005,9 @@ class Downloader:
                             with open(temp_file_path, "ab") as f:
                                 try:
                                     if is_local_link and isinstance(response, io.BufferedReader):
-                                        generator = iter(lambda: response.read(chunk_size), b'')
+                                        generator = iter(lambda: response.read(read_size), b'')
                                     else:
-                                        generator = response.iter_content(chunk_size=chunk_size)
+                                        generator = response.iter_content(chunk_size=read_size)
                                     for chunk in generator:
                                         if chunk:  # filter out keep-alive new chunks
                                             f.write(chunk)
@@ -1029,13 +1067,22 @@ class Downloader:
                         download_done = True
                     else:
                         try:
-                            if is_local_link and isinstance(response, io.BufferedReader):
-                                generator = iter(lambda: response.read(chunk_size), b'')
+                            if chunk_size is not None:
+                                read_size = chunk_size
+                            elif is_local_link:
+                                read_size = self._chunk_size(None)
+                            else:
+                                read_size = self._chunk_size(response.headers.get("content-length"))
+                            if not is_local_link and data.tell() == 0:
+                                data = self._read_to_buffer(response=response, chunk_size=read_size)
                             else:
-                                generator = response.iter_content(chunk_size=chunk_size)
-                            for chunk in generator:
-                                if chunk:  # filter out keep-alive new chunks
-                                    data.write(chunk)
+                                if is_local_link and isinstance(response, io.BufferedReader):
+                                    generator = iter(lambda: response.read(read_size), b'')
+                                else:
+                                    generator = response.iter_content(chunk_size=read_size)
+                                for chunk in generator:
+                                    if chunk:  # filter out keep-alive new chunks
+                                        data.write(chunk)
 
                             file_validation = True
                             if not is_url:
@@ -1067,8 +1114,249 @@ class Downloader:
                         data = np.array(Image.open(data))
         else:
             data = local_filepath
+        if blob_key is not None and os.path.isfile(local_filepath):
+            try:
+                blob_store.add(key=blob_key, filepath=local_filepath, size=blob_store.item_size(item=item))
+            except OSError as err:
+                logger.warning('Failed to add item {} to the blob store: {}'.format(item.id, err))
+        return data
+
+    @staticmethod
+    def _chunk_size(total_length):
+        """
+        Read size by the download length - 64KB for small files and up to 1MB for large ones
+        """
+        try:
+            total_length = int(total_length)
+        except (TypeError, ValueError):
+            return 64 * 1024
+        return min(max(total_length // 64, 64 * 1024), 1024 * 1024)
+
+    @staticmethod
+    def _read_to_buffer(response, chunk_size=1024 * 1024):
+        """
+        Read a response body into a BytesIO preallocated by the content length - the body is read straight into
+        the buffer, without joining chunks or growing the buffer.
+        Falls back to writing chunks if the length is unknown or the body is encoded.
+
+        :param response: streamed response
+        :param int chunk_size: read size
+        :return: BytesIO, positioned at the end of the data
+        """
+        content_length = response.headers.get('content-length')
+        if content_length is None or response.headers.get('content-encoding', 'identity') != 'identity':
+            data = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                data.write(chunk)
+            return data
+        size = int(content_length)
+        data = io.BytesIO(bytes(size))
+        position = 0
+        with data.getbuffer() as view:
+            while position < size:
+                chunk_view = view[position:position + chunk_size]
+                n_read = response.raw.readinto(chunk_view)
+                chunk_view.release()
+                if not n_read:
+                    break
+                position += n_read
+        # a short read is left to the size validation (and resume)
+        data.truncate(position)
+        data.seek(position)
         return data
 
+    @staticmethod
+    def _image_to_array(data, size=None, mode=None):
+        """
+        Decode an image once to a contiguous array.
+        With a target size, JPEGs are decoded in a reduced size (by the decoder scaling) before the resize.
+
+        :param data: image file-like object
+        :param tuple size: optional - (width, height) to resize to
+        :param str mode: optional - PIL mode to convert to (e.g 'RGB')
+        :return: read-only numpy array
+        """
+        image = Image.open(data)
+        if size is not None:
+            size = tuple(size)
+            image.draft(mode, size)
+        if mode is not None and image.mode != mode:
+            image = image.convert(mode)
+        if size is not None and image.size != size:
+            image = image.resize(size, Image.BILINEAR)
+        return np.asarray(image)
+
+    def _download_array(self, item, size=None, mode=None):
+        if isinstance(item, str):
+            item = self.items_repository.get(item_id=item)
+        client_api = self.items_repository._client_api
+        item, url, is_url, is_local_link = self.__get_link_source(item=item)
+        if 'image' not in item.mimetype and not is_url:
+            raise PlatformException(
+                error="400",
+                message='Download element type numpy.ndarray support for image only. '
+                        'Item Id: {} is {} type'.format(item.id, item.mimetype))
+        if client_api.sdk_cache.use_cache:
+            data = self.items_repository.download(items=item, save_locally=False)
+        elif is_url:
+            response = self.get_url_stream(url=url)
+            if is_local_link:
+                with response:
+                    return self._image_to_array(data=response, size=size, mode=mode)
+            with response:
+                data = self._read_to_buffer(response=response)
+        else:
+            path = "/items/{}/stream".format(item.id)
+            success, response = client_api.gen_request(req_type="get",
+                                                       headers={'x-dl-sanitize': '0'},
+                                                       path=path,
+                                                       stream=True,
+                                                       dataset_id=item.dataset_id)
+            if not success:
+                raise exceptions.PlatformException(response)
+            with response:
+                data = self._read_to_buffer(response=response)
+            expected_size = item.metadata.get('system', dict()).get('size')
+            if expected_size is not None and data.tell() != expected_size:
+                raise PlatformException(
+                    error='500',
+                    message='The downloaded file is corrupted. Please try again. If the issue repeats please contact support.')
+        data.seek(0)
+        return self._image_to_array(data=data, size=size, mode=mode)
+
+    def download_arrays(self, items, size=None, mode=None, raise_on_error=False):
+        """
+        Download images straight to numpy arrays, in parallel.
+        Each image is read into a buffer preallocated by its size and decoded once. With a target size, JPEGs are
+        decoded in a reduced size before the resize - much faster for large images.
+
+        :param list items: list of Item entities or item ids
+        :param tuple size: optional - (width, height) to resize the images to
+        :param str mode: optional - PIL mode to convert the images to (e.g 'RGB')
+        :param bool raise_on_error: raise on the first failed item. otherwise the failed items are None
+        :return: list of read-only numpy arrays, in the order of the items
+        """
+        pool = self.items_repository._client_api.thread_pools(pool_name='item.download')
+        jobs = [pool.submit(self._download_array, item=item, size=size, mode=mode) for item in items]
+        arrays = list()
+        for item, job in zip(items, jobs):
+            try:
+                arrays.append(job.result())
+            except Exception as err:
+                if raise_on_error:
+                    raise
+                logger.warning('Failed to download item {} to array: {}'.format(
+                    item if isinstance(item, str) else item.id, err))
+                arrays.append(None)
+        return arrays
+
+    def __use_parallel_download(self, item, is_url):
+        client_api = self.items_repository._client_api
+        if is_url or client_api.sdk_cache.use_cache or client_api.download_max_segments < 2:
+            return False
+        size = item.metadata.get('system', dict()).get('size')
+        return isinstance(size, int) and size >= max(client_api.download_parallel_min_size,
+                                                     2 * client_api.download_segment_size)
+
+    def __parallel_download(self, item, local_filepath):
+        """
+        Download an item in parallel byte ranges into a preallocated file.
+        Each segment is validated by its size and a failed segment is resumed from its last written byte -
+        the other segments are not downloaded again.
+
+        :param item: Item entity to download
+        :param local_filepath: item local filepath
+        :return: True if downloaded, False if the server does not support range requests
+        """
+        client_api = self.items_repository._client_api
+        path = "/items/{}/stream".format(item.id)
+        size = item.metadata['system']['size']
+        segment_size = max(client_api.download_segment_size, 1024 * 1024)
+        segments = queue.Queue()
+        for start in range(0, size, segment_size):
+            segments.put((start, min(start + segment_size, size)))
+        read_size = self._chunk_size(segment_size)
+        temp_file_path = local_filepath + '.download'
+        os.makedirs(os.path.dirname(local_filepath), exist_ok=True)
+        with open(temp_file_path, 'wb') as f:
+            f.truncate(size)
+
+        stop = threading.Event()
+        no_range = threading.Event()
+        one_file_pbar = tqdm.tqdm(total=size,
+                                  unit='B',
+                                  unit_scale=True,
+                                  unit_divisor=1024,
+                                  position=1,
+                                  file=sys.stdout,
+                                  disable=client_api.verbose.disable_progress_bar_download_item or size <= 10e6,
+                                  desc='Download Item')
+
+        def download_segment(f, start, end):
+            offset = start
+            for i_try in range(NUM_TRIES):
+                headers = {'x-dl-sanitize': '0', 'Range': 'bytes={}-{}'.format(offset, end - 1)}
+                response = None
+                try:
+                    success, response = client_api.gen_request(req_type="get",
+                                                               headers=headers,
+                                                               path=path,
+                                                               stream=True,
+                                                               dataset_id=item.dataset_id)
+                    if not success or response.status_code != 206:
+                        # errors (and servers without ranges) are left to the single stream download
+                        no_range.set()
+                        stop.set()
+                        return
+                    f.seek(offset)
+                    for chunk in response.iter_content(chunk_size=read_size):
+                        if stop.is_set():
+                            return
+                        chunk = chunk[:end - offset]
+                        f.write(chunk)
+                        offset += len(chunk)
+                        one_file_pbar.update(len(chunk))
+                except requests.exceptions.RequestException as err:
+                    logger.debug('Download item: {}. Segment {}-{} failed on byte {}, try {}/{}: {}'.format(
+                        item.filename, start, end, offset, i_try + 1, NUM_TRIES, err))
+                finally:
+                    if response is not None:
+                        response.close()
+                if offset == end:
+                    return
+            raise PlatformException(
+                error='500',
+                message='The downloaded file is corrupted. Please try again. If the issue repeats please contact support.')
+
+        def worker():
+            with open(temp_file_path, 'r+b') as f:
+                while not stop.is_set():
+                    try:
+                        start, end = segments.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        download_segment(f=f, start=start, end=end)
+                    except Exception:
+                        stop.set()
+                        raise
+
+        pool = client_api.thread_pools(pool_name='item.download.segment')
+        jobs = [pool.submit(worker) for _ in range(min(client_api.download_max_segments, segments.qsize()))]
+        wait(jobs)
+        one_file_pbar.close()
+        try:
+            for job in jobs:
+                job.result()
+        except Exception:
+            os.remove(temp_file_path)
+            raise
+        if no_range.is_set():
+            os.remove(temp_file_path)
+            return False
+        shutil.move(temp_file_path, local_filepath)
+        return True
+
     def __get_next_chunk(self, item, download_progress, chunk_resume):
         size_validation, file_size, resume = self.__file_validation(item=item,
                                                                     downloaded_file=download_progress)
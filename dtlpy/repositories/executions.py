@@ -1,4 +1,6 @@
+import functools
 import threading
+import asyncio
 import logging
 import time
 from copy import deepcopy
@@ -636,6 +638,148 @@ class Executions:
 
         return execution
 
+    def _get_many(self, execution_ids):
+        """
+        Get executions by ids - a single list query per page (instead of a get per execution).
+        Executions that are missing from the results are not returned
+
+        :param list execution_ids: executions ids
+        :return: dict of id to execution
+        """
+        executions = dict()
+        # executions list page size is at most 100
+        page_size = 100
+        for i_page in range(0, len(execution_ids), page_size):
+            page_ids = execution_ids[i_page:i_page + page_size]
+            filters = entities.Filters(resource=entities.FiltersResource.EXECUTION, page_size=len(page_ids))
+            filters.add(field='id', values=page_ids, operator=entities.FiltersOperations.IN)
+            if self.project is not None:
+                filters.add(field='projectId', values=self.project.id)
+            if self._service is not None:
+                filters.add(field='serviceId', values=self._service.id)
+            response = self._list(filters=filters)
+            if response is None:
+                raise exceptions.PlatformException(error='400', message='Failed to list executions')
+            for execution in self._build_entities_from_response(response_items=response.get('items', list())):
+                executions[execution.id] = execution
+        return executions
+
+    def wait_many(self,
+                  executions: list = None,
+                  execution_ids: list = None,
+                  timeout: int = None,
+                  backoff_factor=1,
+                  max_sleep_time=MAX_SLEEP_TIME,
+                  on_complete=None,
+                  iteration_callback=None) -> miscellaneous.List[entities.Execution]:
+        """
+        Wait for many executions at once. Each polling cycle is a single list query (by ids) for all the
+        executions that are still running. The polling interval backs off while nothing changes and resets when
+        any execution progresses or completes.
+
+        **Prerequisites**: You must be in the role of an *owner* or *developer*. You must have a service.
+
+        :param list executions: list of dl.Execution. must input one of executions or execution_ids
+        :param list execution_ids: list of executions ids
+        :param int timeout: seconds to wait until TimeoutError is raised. if <=0 - wait until done
+        :param float backoff_factor: A backoff factor to apply between attempts after the second try
+        :param float max_sleep_time: max seconds between polling
+        :param function on_complete: function to call with each execution when it is done
+        :param function iteration_callback: function to call on each iteration with the list of the latest executions
+        :return: list of the executions (same order as the input)
+        :rtype: list
+
+        **Example**:
+
+        .. code-block:: python
+
+            executions = project.executions.wait_many(execution_ids=['execution_id_1', 'execution_id_2'],
+                                                      on_complete=lambda e: print(e.id, e.latest_status['status']))
+        """
+        if executions is None:
+            if execution_ids is None:
+                raise ValueError('Must input at least one: [executions, execution_ids]')
+            executions = [None] * len(execution_ids)
+        else:
+            execution_ids = [execution.id for execution in executions]
+        latest = dict(zip(execution_ids, executions))
+        pending = [execution_id for execution_id in dict.fromkeys(execution_ids)]
+        elapsed = 0
+        start = time.time()
+        if timeout is None or timeout <= 0:
+            timeout = np.inf
+
+        num_tries = 1
+        while len(pending) > 0:
+            changed = False
+            updated = self._get_many(execution_ids=pending)
+            still_pending = list()
+            for execution_id in pending:
+                execution = updated.get(execution_id)
+                if execution is None:
+                    # not in the query results (yet) - get it directly
+                    execution = self.get(execution_id=execution_id)
+                previous = latest[execution_id]
+                if previous is None or previous.latest_status != execution.latest_status:
+                    changed = True
+                latest[execution_id] = execution
+                if execution.in_progress():
+                    still_pending.append(execution_id)
+                elif on_complete is not None:
+                    try:
+                        on_complete(execution)
+                    except Exception as e:
+                        logger.warning('on_complete failed: {}'.format(e.__str__()))
+            pending = still_pending
+            if iteration_callback is not None:
+                try:
+                    iteration_callback([latest[execution_id] for execution_id in execution_ids])
+                except Exception as e:
+                    logger.warning('iteration_callback failed: {}'.format(e.__str__()))
+            if len(pending) == 0:
+                break
+            elapsed = time.time() - start
+            if elapsed >= timeout:
+                raise TimeoutError(
+                    f"execution wait_many() got timeout. {len(pending)} executions still running: {pending[:10]!r}")
+            if changed:
+                # still progressing - keep polling often
+                num_tries = 1
+            sleep_time = np.min([timeout - elapsed, backoff_factor * (2 ** num_tries), max_sleep_time])
+            num_tries += 1
+            logger.debug(f"{len(pending)} executions are running for {elapsed:.2f}[s]. "
+                         f"Sleeping for {sleep_time:.2f}[s]")
+            time.sleep(sleep_time)
+
+        return miscellaneous.List([latest[execution_id] for execution_id in execution_ids])
+
+    async def wait_many_async(self,
+                              executions: list = None,
+                              execution_ids: list = None,
+                              timeout: int = None,
+                              backoff_factor=1,
+                              max_sleep_time=MAX_SLEEP_TIME,
+                              on_complete=None,
+                              iteration_callback=None) -> miscellaneous.List[entities.Execution]:
+        """
+        Async version of wait_many - waits in a worker thread without blocking the event loop
+
+        **Example**:
+
+        .. code-block:: python
+
+            executions = await project.executions.wait_many_async(execution_ids=['execution_id_1', 'execution_id_2'])
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.wait_many,
+                                                                  executions=executions,
+                                                                  execution_ids=execution_ids,
+                                                                  timeout=timeout,
+                                                                  backoff_factor=backoff_factor,
+                                                                  max_sleep_time=max_sleep_time,
+                                                                  on_complete=on_complete,
+                                                                  iteration_callback=iteration_callback))
+
     @_api_reference.add(path='/executions/{id}/terminate', method='post')
     def terminate(self, execution: entities.Execution):
         """
@@ -65,11 +65,12 @@ class Features:
         return response.json()
 
     @_api_reference.add(path='/features/vectors', method='post')
-    def list(self, filters: entities.Filters = None) -> entities.PagedEntities:
+    def list(self, filters: entities.Filters = None, prefetch: int = 0) -> entities.PagedEntities:
         """
         List of features
 
         :param dtlpy.entities.filters.Filters filters: Filters to query the features data
+        :param int prefetch: number of pages to read ahead in the background while iterating the pages (0 - disabled)
         :return: Pages object
         :rtype: dtlpy.entities.paged_entities.PagedEntities
         """
@@ -101,6 +102,7 @@ class Features:
                                        filters=filters,
                                        page_offset=filters.page,
                                        page_size=filters.page_size,
+                                       prefetch=prefetch,
                                        client_api=self._client_api)
         paged.get_page()
         return paged
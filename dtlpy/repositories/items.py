@@ -1,4 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import logging
+import queue
+import copy
+import math
+import tqdm
+import sys
 
 from .. import entities, exceptions, repositories, miscellaneous, _api_reference
 from ..services.api_client import ApiClient
@@ -147,7 +154,10 @@ class Items:
     def list(self,
              filters: entities.Filters = None,
              page_offset: int = None,
-             page_size: int = None
+             page_size: int = None,
+             prefetch: int = 0,
+             raw: bool = False,
+             fields: list = None
              ) -> entities.PagedEntities:
         """
         List items in a dataset.
@@ -157,6 +167,11 @@ class Items:
         :param dtlpy.entities.filters.Filters filters: Filters entity or a dictionary containing filters parameters
         :param int page_offset: start page
         :param int page_size: page size
+        :param int prefetch: number of pages to read ahead in the background while iterating the pages (0 - disabled)
+        :param bool raw: if True, pages hold read-only EntityView objects over the json instead of Item entities.
+                         Use `view.to_entity()` to get the Item
+        :param list fields: keep only these (dot separated) json fields in the views, e.g ['filename', 'metadata.user'].
+                            Implies raw. `view.to_entity()` will get the Item from the platform
         :return: Pages object
         :rtype: dtlpy.entities.paged_entities.PagedEntities
 
@@ -165,6 +180,8 @@ class Items:
         .. code-block:: python
 
             dataset.items.list(page_offset=0, page_size=100)
+            # only the item ids and filenames
+            dataset.items.list(fields=['filename'])
         """
         # default filters
         if filters is None:
@@ -197,10 +214,152 @@ class Items:
                                        filters=filters,
                                        page_offset=filters.page,
                                        page_size=filters.page_size,
+                                       prefetch=prefetch,
+                                       raw=raw,
+                                       fields=fields,
                                        client_api=self._client_api)
         paged.get_page()
         return paged
 
+    def _scan_partition(self, partition_filter: dict, page_size: int, user_query: str, raw: bool,
+                        output: queue.Queue, stop_event: threading.Event):
+        """
+        Iterate a single id range with a keyset cursor (sorted by id) and put the pages in the output queue
+        """
+        last_id = None
+        while not stop_event.is_set():
+            page_filter = copy.deepcopy(partition_filter)
+            page_filter['sort'] = {'id': entities.FiltersOrderByDirection.ASCENDING.value}
+            page_filter['page'] = 0
+            page_filter['pageSize'] = page_size
+            if last_id is not None:
+                page_filter['filter'].setdefault('$and', list()).append({'id': {'$gt': last_id}})
+            filters = entities.Filters(custom_filter=page_filter)
+            filters._user_query = user_query
+            result = self._list(filters=filters)
+            if result is None:
+                return
+            response_items = result.get('items', list())
+            if len(response_items) == 0:
+                return
+            if raw:
+                page = [entities.EntityView(_json=_json,
+                                            loader=lambda j: self._build_entities_from_response(response_items=[j])[0])
+                        for _json in response_items]
+            else:
+                page = self._build_entities_from_response(response_items=response_items)
+            while not stop_event.is_set():
+                try:
+                    output.put(page, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+            last_id = response_items[-1]['id']
+            # the server may cap the page size - the cursor continues until there is no next page
+            if not result.get('hasNextPage', False):
+                return
+
+    def scan(self,
+             filters: entities.Filters = None,
+             partitions: int = None,
+             workers: int = 8,
+             page_size: int = 1000,
+             raw: bool = False):
+        """
+        Iterate all the items matching the filters with several concurrent cursors.
+        The dataset is split by item id into `partitions` ranges (of about the same number of items) and `workers`
+        threads page through the ranges at the same time. Items are yielded as soon as a page arrives, so the order is
+        not defined. Use for full dataset scans - for a sorted list use `list()`.
+
+        **Prerequisites**: You must be in the role of an *owner* or *developer*.
+
+        :param dtlpy.entities.filters.Filters filters: Filters entity to filter the items (sort is ignored)
+        :param int partitions: number of id ranges to split the items into. default: 4 * workers
+        :param int workers: number of concurrent cursors
+        :param int page_size: page size of each cursor
+        :param bool raw: if True, yield read-only EntityView objects over the json instead of Item entities
+        :return: generator of items
+        :rtype: generator
+
+        **Example**:
+
+        .. code-block:: python
+
+            for item in dataset.items.scan(workers=16):
+                print(item.id)
+        """
+        if filters is None:
+            filters = entities.Filters()
+            filters._user_query = 'false'
+        elif not isinstance(filters, entities.Filters):
+            raise exceptions.PlatformException(error='400',
+                                               message='Unknown filters type: {!r}'.format(type(filters)))
+        if filters.resource != entities.FiltersResource.ITEM:
+            raise exceptions.PlatformException(
+                error='400',
+                message='Filters resource must to be FiltersResource.ITEM. Got: {!r}'.format(filters.resource))
+        if workers < 1:
+            raise exceptions.PlatformException(error='400', message='workers must be a positive integer')
+        if partitions is None:
+            partitions = 4 * workers
+        _, items_count = entities.Filters._get_first_last_item(items_repo=self, filters=filters)
+        if items_count == 0:
+            return
+        max_items = max(1, math.ceil(items_count / partitions))
+
+        output = queue.Queue(maxsize=2 * workers)
+        stop_event = threading.Event()
+        done = object()
+
+        def produce():
+            # submit each id range as soon as it is split
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    jobs = list()
+                    for partition_filter in entities.Filters._get_split_filters(dataset=self.dataset,
+                                                                                  filters=filters,
+                                                                                  max_items=max_items,
+                                                                                  max_workers=workers):
+                        if stop_event.is_set():
+                            break
+                        jobs.append(pool.submit(self._scan_partition,
+                                                partition_filter=partition_filter,
+                                                page_size=page_size,
+                                                user_query=filters._user_query,
+                                                raw=raw,
+                                                output=output,
+                                                stop_event=stop_event))
+                    for job in jobs:
+                        job.result()
+                output.put(done)
+            except Exception as e:
+                output.put(e)
+
+        producer = threading.Thread(target=produce, name='items-scan', daemon=True)
+        producer.start()
+        pbar = tqdm.tqdm(total=items_count,
+                         disable=self._client_api.verbose.disable_progress_bar_iterate_pages,
+                         file=sys.stdout, desc="Scan Items")
+        try:
+            while True:
+                page = output.get()
+                if page is done:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                pbar.update(len(page))
+                for item in page:
+                    yield item
+        finally:
+            stop_event.set()
+            # release the cursors if they are blocked on a full queue
+            while producer.is_alive():
+                try:
+                    output.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            pbar.close()
+
     @_api_reference.add(path='/items/{id}', method='get')
     def get(self,
             filepath: str = None,
@@ -583,6 +742,31 @@ class Items:
             raise_on_error=raise_on_error
         )
 
+    def download_arrays(self, items, size: tuple = None, mode: str = None, raise_on_error: bool = False):
+        """
+        Download images as numpy arrays (e.g. model input), in parallel and without saving to disk.
+
+        Each image is read into a buffer preallocated by its size and decoded once. When a target size is given,
+        JPEGs are decoded in a reduced size before the resize.
+
+        **Prerequisites**: You must be in the role of an *owner* or *developer*.
+
+        :param list items: list of Item entities or item ids
+        :param tuple size: optional - (width, height) to resize the images to
+        :param str mode: optional - PIL mode to convert the images to, e.g. 'RGB'
+        :param bool raise_on_error: raise on the first failed item. otherwise the failed items are None
+        :return: list of read-only numpy arrays, in the order of the items
+        :rtype: list
+
+        **Example**:
+
+        .. code-block:: python
+
+            arrays = dataset.items.download_arrays(items=items, size=(224, 224), mode='RGB')
+        """
+        downloader = repositories.Downloader(self)
+        return downloader.download_arrays(items=items, size=size, mode=mode, raise_on_error=raise_on_error)
+
     def upload(
             self,
             # what to upload
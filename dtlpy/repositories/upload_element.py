@@ -1,5 +1,4 @@
 import os
-import validators
 from dtlpy import PlatformException, entities
 
 
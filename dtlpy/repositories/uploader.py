@@ -1,12 +1,10 @@
 import sys
 from collections import deque
-import validators
 import traceback
 import tempfile
 import requests
 import asyncio
 import logging
-import pandas
 import shutil
 import json
 import time
@@ -37,6 +35,10 @@ class Uploader:
         self.mode = 'skip'
         self.num_files = 0
         self.i_item = 0
+        # external storage files are imported in batches
+        self._external_elements = list()
+        self._external_elements_bytes = 0
+        self._driver_path = None
         self.pbar = tqdm.tqdm(total=0,
                               disable=self.items_repository._client_api.verbose.disable_progress_bar_upload_items,
                               file=sys.stdout, desc='Upload Items')
@@ -87,7 +89,8 @@ class Uploader:
         ###################
         if overwrite:
             self.mode = 'overwrite'
-        if isinstance(local_path, pandas.DataFrame):
+        # pandas is imported only when used - if it was not imported the input can't be a DataFrame
+        if 'pandas' in sys.modules and isinstance(local_path, sys.modules['pandas'].DataFrame):
             futures = self._build_elements_from_df(local_path)
         else:
             start_time = time.time()
@@ -102,7 +105,11 @@ class Uploader:
                                                        export_version=export_version,
                                                        item_description=item_description)
             logger.debug(f"Building elements from inputs completed:  time taken: {time.time() - start_time}")
-        num_files = len(futures)
+        # send the last (partial) batch of external files
+        future = self._flush_external_elements()
+        if future is not None:
+            futures.append(future)
+        num_files = self.num_files
         while futures:
             futures.popleft().result()
         logger.info("Uploading {} items..".format(num_files))
@@ -295,12 +302,12 @@ class Uploader:
                     upload_elem = upload_element.FileUploadElement(all_upload_elements=all_upload_elements)
 
                 elif upload_item_element.startswith('external://'):
-                    try:
-                        driver_path = repositories.Drivers.get(driver_id=self.items_repository.dataset.driver).path
-                        all_upload_elements['driver_path'] = driver_path
-                    except Exception:
-                        logger.error("Attempting to upload external item without driver path. This may cause issues.")
+                    all_upload_elements['driver_path'] = self._get_driver_path()
                     upload_elem = upload_element.ExternalItemUploadElement(all_upload_elements=all_upload_elements)
+                    future = self._add_external_element(upload_elem)
+                    if future is not None:
+                        futures.append(future)
+                    continue
 
                 elif self.is_url(upload_item_element):
                     upload_elem = upload_element.UrlUploadElement(all_upload_elements=all_upload_elements)
@@ -365,7 +372,56 @@ class Uploader:
             loop=self.items_repository._client_api.event_loop.loop)
         return future
 
-    def _build_elements_from_df(self, df: pandas.DataFrame):
+    def _get_driver_path(self):
+        """
+        Path of the dataset driver, fetched once per upload
+        """
+        if self._driver_path is None:
+            try:
+                self._driver_path = repositories.Drivers.get(driver_id=self.items_repository.dataset.driver).path
+            except Exception:
+                logger.error("Attempting to upload external item without driver path. This may cause issues.")
+                self._driver_path = False
+        return self._driver_path if self._driver_path is not False else None
+
+    def _add_external_element(self, elem):
+        """
+        Add an external storage file to the current import batch. The batch is sent when it reaches
+        client_api.import_batch_size files or client_api.import_batch_bytes of payload
+
+        :param elem: ExternalItemUploadElement
+        :return: the future of the sent batch or None
+        """
+        client_api = self.items_repository._client_api
+        self.num_files += 1
+        self.i_item += 1
+        self.pbar.total += 1
+        self.reporter.upcount_num_workers()
+        self._external_elements.append(elem)
+        self._external_elements_bytes += len(elem.buffer) + len(elem.remote_filepath)
+        if len(self._external_elements) >= client_api.import_batch_size or \
+                self._external_elements_bytes >= client_api.import_batch_bytes:
+            return self._flush_external_elements()
+        return None
+
+    def _flush_external_elements(self):
+        """
+        Send the current import batch
+
+        :return: the future of the batch or None if empty
+        """
+        if len(self._external_elements) == 0:
+            return None
+        elements = self._external_elements
+        self._external_elements = list()
+        self._external_elements_bytes = 0
+        return asyncio.run_coroutine_threadsafe(
+            self.__external_import_batch(elements=elements,
+                                         pbar=self.pbar,
+                                         reporter=self.reporter),
+            loop=self.items_repository._client_api.event_loop.loop)
+
+    def _build_elements_from_df(self, df: 'pandas.DataFrame'):
         futures = deque()
         for index, row in df.iterrows():
             # DEFAULTS
@@ -381,7 +437,11 @@ class Uploader:
             futures += future
         return futures
 
-    async def __single_external_sync(self, element):
+    @staticmethod
+    def _external_import_entry(element):
+        """
+        Build the import request entry of an external storage file
+        """
         # Path format: anything before last "://" is scheme (external, provider s3/gs, etc.). After it: bucket_name/path_to_file.
         # API expects storageId as "bucket:key".
         idx = element.buffer.rfind('://')
@@ -402,17 +462,105 @@ class Uploader:
         req_json = dict()
         req_json['filename'] = element.remote_filepath
         req_json['storageId'] = f"{parts[0]}:{parts[1]}"
-        success, response = self.items_repository._client_api.gen_request(req_type='post',
-                                                                          path='/datasets/{}/imports'.format(
-                                                                              self.items_repository.dataset.id),
-                                                                          json_req=[req_json])
+        return req_json
 
-        if self.items_repository._client_api.check_response(success, response, path='/imports') is False:
-            return None
-        items = entities.Item.from_json(client_api=self.items_repository._client_api, _json=response.json()[0],
-                                        project=self.items_repository._dataset.project,
-                                        dataset=self.items_repository.dataset)
-        return items, response.headers.get('x-item-op', 'na')
+    @staticmethod
+    def _match_import_results(entries, response_items):
+        """
+        Map the import response back to the request entries - by position when the response has an entry per
+        request, otherwise by filename
+
+        :return: list of item json (or None if missing/failed) for each entry
+        """
+        if not isinstance(response_items, list):
+            response_items = [response_items]
+        if len(response_items) == len(entries):
+            matched = response_items
+        else:
+            by_filename = {r.get('filename'): r for r in response_items if isinstance(r, dict)}
+            matched = [by_filename.get(entry['filename']) for entry in entries]
+        return [r if isinstance(r, dict) and 'id' in r else None for r in matched]
+
+    async def __external_import_batch(self, elements, pbar, reporter):
+        """
+        Import a batch of external storage files in a single request.
+        The batch is posted again only on connection errors, throttling, timeout and server error responses
+        """
+        client_api = self.items_repository._client_api
+        entries = list()
+        valid_elements = list()
+        for element in elements:
+            try:
+                entries.append(self._external_import_entry(element))
+                valid_elements.append(element)
+            except Exception as e:
+                await self.__report_element(element=element, item=None, action='na', err=e,
+                                            trace=traceback.format_exc(), pbar=pbar, reporter=reporter)
+        if len(entries) == 0:
+            return
+        limiter = client_api.event_loop.adaptive_semaphore('items.import',
+                                                           limit=client_api.upload_concurrency,
+                                                           max_limit=client_api.upload_max_concurrency,
+                                                           adaptive=client_api.upload_adaptive_concurrency)
+        response_items = list()
+        action = 'na'
+        err = None
+        trace = None
+        async with limiter:
+            for i_try in range(NUM_TRIES):
+                last_try = i_try + 1 == NUM_TRIES
+                logger.debug("Import {n} external items. Try {i}/{t}".format(n=len(entries),
+                                                                            i=i_try + 1,
+                                                                            t=NUM_TRIES))
+                try:
+                    success, response = await asyncio.to_thread(client_api.gen_request,
+                                                                req_type='post',
+                                                                path='/datasets/{}/imports'.format(
+                                                                    self.items_repository.dataset.id),
+                                                                json_req=entries)
+                except Exception as e:
+                    err = e
+                    trace = traceback.format_exc()
+                    logger.debug("Import {n} external items. Try {i}/{t}. Fail.\n{trace}".format(n=len(entries),
+                                                                                                i=i_try + 1,
+                                                                                                t=NUM_TRIES,
+                                                                                                trace=trace))
+                    # only connection errors are retried - after a lost response (e.g read timeout)
+                    # the files may have been imported already
+                    if last_try or not isinstance(e, requests.exceptions.ConnectionError):
+                        break
+                    limiter.on_throttle()
+                    await asyncio.sleep(0.3 * (2 ** i_try))
+                    continue
+                if not success and not last_try and self._is_throttled(response):
+                    # throttling, timeout and server errors
+                    logger.debug("Import {n} external items. Try {i}/{t}. Fail. status code: {s}".format(
+                        n=len(entries), i=i_try + 1, t=NUM_TRIES, s=response.status_code))
+                    limiter.on_throttle()
+                    await asyncio.sleep(0.3 * (2 ** i_try))
+                    continue
+                try:
+                    if client_api.check_response(success, response, path='/imports') is not False:
+                        response_items = response.json()
+                        action = response.headers.get('x-item-op', 'na')
+                    err = None
+                    trace = None
+                    limiter.on_success()
+                except Exception as e:
+                    err = e
+                    trace = traceback.format_exc()
+                break
+        if err is None:
+            err = 'Item is missing from the import response'
+        for element, item_json in zip(valid_elements, self._match_import_results(entries, response_items)):
+            item = None
+            if item_json is not None:
+                item = entities.Item.from_json(client_api=client_api,
+                                               _json=item_json,
+                                               project=self.items_repository._dataset.project,
+                                               dataset=self.items_repository.dataset)
+            await self.__report_element(element=element, item=item, action=action, err=err, trace=trace,
+                                        pbar=pbar, reporter=reporter)
 
     async def __single_async_upload(self,
                                     filepath,
@@ -496,7 +644,7 @@ class Uploader:
         if self.items_repository._client_api.check_response(response.ok, response, path='/items') is False:
             return None
         if item_size != response.json().get('metadata', {}).get('system', {}).get('size', 0):
-            self.items_repository.delete(item_id=response.json()['id'])
+            await asyncio.to_thread(self.items_repository.delete, item_id=response.json()['id'])
             raise PlatformException(500,
                                     "The uploaded file is corrupted. "
                                     "Please try again. If it happens again please contact support.")
@@ -505,8 +653,26 @@ class Uploader:
                                                             dataset=self.items_repository.dataset)
         return item, response.headers.get('x-item-op', 'na')
 
+    @staticmethod
+    def _is_throttled(err):
+        """
+        Throttling, server and connection errors - a sign to lower the upload concurrency
+        """
+        status_code = str(getattr(err, 'status_code', ''))
+        return status_code in ['408', '429', '3001'] or status_code.startswith('5')
+
+    @staticmethod
+    def _load_json(filepath):
+        with open(filepath, 'r', encoding="utf8") as f:
+            return json.load(f)
+
     async def __upload_single_item_wrapper(self, element, pbar, reporter, mode):
-        async with self.items_repository._client_api.event_loop.semaphore('items.upload', 5):
+        client_api = self.items_repository._client_api
+        limiter = client_api.event_loop.adaptive_semaphore('items.upload',
+                                                           limit=client_api.upload_concurrency,
+                                                           max_limit=client_api.upload_max_concurrency,
+                                                           adaptive=client_api.upload_adaptive_concurrency)
+        async with limiter:
             # assert isinstance(element, UploadElement)
             item = False
             err = None
@@ -516,25 +682,25 @@ class Uploader:
             action = 'na'
             remote_folder, remote_name = os.path.split(element.remote_filepath)
 
-            if element.type == 'url':
-                saved_locally, element.buffer, temp_dir = self.url_to_data(element.buffer)
-            elif element.type == 'link':
-                element.buffer = self.link(ref=element.buffer.ref, dataset_id=element.buffer.dataset_id,
-                                           type=element.buffer.type, mimetype=element.buffer.mimetype)
-
-            for i_try in range(NUM_TRIES):
-                try:
-                    logger.debug("Upload item: {path}. Try {i}/{n}. Starting..".format(path=remote_name,
-                                                                                       i=i_try + 1,
-                                                                                       n=NUM_TRIES))
-                    if element.type == 'external_file':
-                        item, action = await self.__single_external_sync(element)
-                    else:
+            try:
+                # blocking calls run in a thread, to not stall the other uploads on the event loop
+                if element.type == 'url':
+                    saved_locally, element.buffer, temp_dir = await asyncio.to_thread(self.url_to_data,
+                                                                                      element.buffer)
+                elif element.type == 'link':
+                    element.buffer = self.link(ref=element.buffer.ref, dataset_id=element.buffer.dataset_id,
+                                               type=element.buffer.type, mimetype=element.buffer.mimetype)
+
+                for i_try in range(NUM_TRIES):
+                    try:
+                        logger.debug("Upload item: {path}. Try {i}/{n}. Starting..".format(path=remote_name,
+                                                                                           i=i_try + 1,
+                                                                                           n=NUM_TRIES))
                         if element.annotations_filepath is not None and \
                                 element.item_metadata == entities.ExportMetadata.FROM_JSON:
                             element.item_metadata = {}
-                            with open(element.annotations_filepath) as ann_f:
-                                item_metadata = json.load(ann_f)
+                            item_metadata = await asyncio.to_thread(self._load_json,
+                                                                    element.annotations_filepath)
                             if 'metadata' in item_metadata:
                                 element.item_metadata = item_metadata['metadata']
                         item, action = await self.__single_async_upload(filepath=element.buffer,
@@ -545,56 +711,69 @@ class Uploader:
                                                                         last_try=(i_try + 1) == NUM_TRIES,
                                                                         callback=None,
                                                                         item_description=element.item_description)
-                    logger.debug("Upload item: {path}. Try {i}/{n}. Success. Item id: {id}".format(path=remote_name,
-                                                                                                   i=i_try + 1,
-                                                                                                   n=NUM_TRIES,
-                                                                                                   id=item.id))
-                    if isinstance(item, entities.Item):
-                        break
-                    time.sleep(0.3 * (2 ** i_try))
-                except Exception as e:
-                    err = e
-                    trace = traceback.format_exc()
-                    logger.debug("Upload item: {path}. Try {i}/{n}. Fail.\n{trace}".format(path=remote_name,
-                                                                                           i=i_try + 1,
-                                                                                           n=NUM_TRIES,
-                                                                                           trace=trace))
-
-                finally:
-                    if saved_locally and os.path.isdir(temp_dir):
-                        shutil.rmtree(temp_dir)
-            if item:
-                if action in ['overwrite', 'created'] and element.annotations_filepath is not None:
-                    try:
-                        await self.__async_upload_annotations(annotations_filepath=element.annotations_filepath,
-                                                              item=item)
-                    except Exception:
-                        logger.exception('Error uploading annotations to item id: {}'.format(item.id))
-
-                reporter.set_index(status=action,
-                                   output=item.to_json(),
-                                   success=True,
-                                   ref=item.id)
-                if pbar is not None:
-                    pbar.update()
-                    self.items_repository._client_api.callbacks.run_on_event(
-                        event=self.items_repository._client_api.callbacks.CallbackEvent.ITEMS_UPLOAD,
-                        context={'item_id': item.id, 'dataset_id': item.dataset_id},
-                        progress=round(pbar.n / pbar.total * 100, 0))
+                        logger.debug("Upload item: {path}. Try {i}/{n}. Success. Item id: {id}".format(path=remote_name,
+                                                                                                       i=i_try + 1,
+                                                                                                       n=NUM_TRIES,
+                                                                                                       id=item.id))
+                        if isinstance(item, entities.Item):
+                            limiter.on_success()
+                            break
+                    except Exception as e:
+                        err = e
+                        trace = traceback.format_exc()
+                        logger.debug("Upload item: {path}. Try {i}/{n}. Fail.\n{trace}".format(path=remote_name,
+                                                                                               i=i_try + 1,
+                                                                                               n=NUM_TRIES,
+                                                                                               trace=trace))
+                        if self._is_throttled(e):
+                            limiter.on_throttle()
+                    if i_try + 1 < NUM_TRIES:
+                        await asyncio.sleep(0.3 * (2 ** i_try))
+            except Exception as e:
+                err = e
+                trace = traceback.format_exc()
+            finally:
+                if saved_locally and os.path.isdir(temp_dir):
+                    shutil.rmtree(temp_dir)
+            await self.__report_element(element=element, item=item, action=action, err=err, trace=trace,
+                                        pbar=pbar, reporter=reporter)
+
+    async def __report_element(self, element, item, action, err, trace, pbar, reporter):
+        """
+        Upload the element annotations (if any) and report the result
+        """
+        client_api = self.items_repository._client_api
+        if item:
+            if action in ['overwrite', 'created'] and element.annotations_filepath is not None:
+                try:
+                    await self.__async_upload_annotations(annotations_filepath=element.annotations_filepath,
+                                                          item=item)
+                except Exception:
+                    logger.exception('Error uploading annotations to item id: {}'.format(item.id))
+
+            reporter.set_index(status=action,
+                               output=item.to_json(),
+                               success=True,
+                               ref=item.id)
+            if pbar is not None:
+                pbar.update()
+                client_api.callbacks.run_on_event(
+                    event=client_api.callbacks.CallbackEvent.ITEMS_UPLOAD,
+                    context={'item_id': item.id, 'dataset_id': item.dataset_id},
+                    progress=round(pbar.n / pbar.total * 100, 0))
+        else:
+            if isinstance(element.buffer, str):
+                ref = element.buffer
+            elif hasattr(element.buffer, "name"):
+                ref = element.buffer.name
             else:
-                if isinstance(element.buffer, str):
-                    ref = element.buffer
-                elif hasattr(element.buffer, "name"):
-                    ref = element.buffer.name
-                else:
-                    ref = 'Unknown'
-                reporter.set_index(ref=ref, status='error',
-                                   success=False,
-                                   error="{}\n{}".format(err, trace))
+                ref = 'Unknown'
+            reporter.set_index(ref=ref, status='error',
+                               success=False,
+                               error="{}\n{}".format(err, trace))
 
     async def __async_upload_annotations(self, annotations_filepath, item):
-        with open(annotations_filepath, 'r', encoding="utf8") as f:
-            annotations = json.load(f)
+        annotations = await asyncio.to_thread(self._load_json, annotations_filepath)
         # wait for coroutines on the current event loop
         return await item.annotations._async_upload_annotations(annotations=annotations['annotations'])
 
@@ -645,6 +824,7 @@ class Uploader:
 
     @staticmethod
     def is_url(url):
+        import validators
         try:
             return validators.url(url)
         except Exception:
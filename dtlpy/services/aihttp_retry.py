@@ -82,8 +82,15 @@ class _RequestContext:
 
 
 class RetryClient:
-    def __init__(self, logger: Any = None, *args: Any, **kwargs: Any) -> None:
-        self._client = ClientSession(*args, **kwargs)
+    def __init__(self, logger: Any = None, *args: Any, client_session: Optional[ClientSession] = None,
+                 **kwargs: Any) -> None:
+        # a shared (pooled) session is borrowed and never closed by the retry client
+        if client_session is None:
+            self._client = ClientSession(*args, **kwargs)
+            self._owns_client = True
+        else:
+            self._client = client_session
+            self._owns_client = False
         self._closed = False
 
         if logger is None:
@@ -121,7 +128,8 @@ class RetryClient:
         return self._request(self._client.delete, url, **kwargs)
 
     async def close(self) -> None:
-        await self._client.close()
+        if self._owns_client:
+            await self._client.close()
         self._closed = True
 
     async def __aenter__(self) -> 'RetryClient':
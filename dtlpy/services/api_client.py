@@ -6,9 +6,9 @@ import requests_toolbelt
 import multiprocessing
 import threading
 import traceback
-import datetime
 import requests
 import aiohttp
+import weakref
 import logging
 import asyncio
 import certifi
@@ -19,6 +19,7 @@ import tqdm
 import json
 import sys
 import ssl
+import atexit
 import jwt
 import os
 import io
@@ -28,10 +29,10 @@ from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
 from functools import wraps
 import numpy as np
-import inspect
 from requests.models import Response
 from dtlpy.caches.cache import CacheManger, CacheConfig
-from .calls_counter import CallsCounter
+from dtlpy.caches.blob_store import BlobStore
+from .calls_counter import CallsCounter, RequestsMetrics
 from .cookie import CookieIO
 from .logins import login, logout, login_secret, login_m2m, gate_url_from_host
 from .async_utils import AsyncResponse, AsyncUploadStream, AsyncResponseError, AsyncThreadEventLoop
@@ -41,7 +42,6 @@ from .aihttp_retry import RetryClient
 from .. import miscellaneous, exceptions, __version__
 
 logger = logging.getLogger(name='dtlpy')
-threadLock = threading.Lock()
 
 
 def format_message(message):
@@ -50,6 +50,12 @@ def format_message(message):
     return message
 
 
+def _close_async_sessions_at_exit(client_ref):
+    client = client_ref()
+    if client is not None:
+        client.close_async_sessions()
+
+
 class VerboseLoggingLevel:
     DEBUG = "debug"
     INFO = "info"
@@ -546,11 +552,7 @@ class Decorators:
     def token_expired_decorator(method):
         @wraps(method)
         def decorated_method(inst, *args, **kwargs):
-            # save event
-            frm = inspect.stack()[1]
-
             # before the method call
-            kwargs.update({'stack': frm})
             if inst.token_expired():
                 if inst.renew_token_method() is False:
                     raise exceptions.PlatformException('600', 'Token expired, Please login.'
@@ -596,13 +598,18 @@ class ApiClient:
         self.last_response = None
         self.last_request = None
         self.platform_exception = None
-        self.last_curl = None
+        self._last_curl = None
+        # (token, expiration) of the last decoded token
+        self._token_expiration = (None, None)
         self.minimal_print = True
         # start refresh token
         self.refresh_token_active = True
         # event and pools
         self._thread_pools = dict()
         self._event_loop = None
+        self._async_sessions = dict()
+        self._async_sessions_lock = threading.Lock()
+        self._async_sessions_atexit = False
         self._pid = os.getpid()
         self._login_domain = None
         self.__gate_url_for_requests = None
@@ -610,10 +617,17 @@ class ApiClient:
         # TODO- remove before release - only for debugging
         self._stopped_pools = list()
 
+        # cookie: seconds to hold the changes before writing them to the file (0 to write on each change),
+        # read only to never write the file (e.g read only file systems)
+        self.cookie_write_delay = float(os.environ.get('COOKIE_WRITE_DELAY', 0))
+        self.cookie_read_only = os.environ.get('COOKIE_READ_ONLY', 'false').lower() == 'true'
         if cookie_filepath is None:
-            self.cookie_io = CookieIO.init()
+            self.cookie_io = CookieIO.init(write_delay=self.cookie_write_delay,
+                                           read_only=self.cookie_read_only)
         else:
-            self.cookie_io = CookieIO(path=cookie_filepath)
+            self.cookie_io = CookieIO(path=cookie_filepath,
+                                      write_delay=self.cookie_write_delay,
+                                      read_only=self.cookie_read_only)
         assert isinstance(self.cookie_io, CookieIO)
         self.state_io = CookieIO.init_local_cookie(create=False)
         assert isinstance(self.state_io, CookieIO)
@@ -635,18 +649,22 @@ class ApiClient:
         # API calls counter
         counter_filepath = os.path.join(os.path.dirname(self.cookie_io.COOKIE), 'calls_counter.json')
         self.calls_counter = CallsCounter(filepath=counter_filepath)
+        # API requests metrics (per endpoint calls, bytes and latency)
+        self.metrics = RequestsMetrics()
 
         # create a global thread pool to run multi threading
         if num_processes is None:
             num_processes = 3 * multiprocessing.cpu_count()
         self._num_processes = num_processes
         self._thread_pools_names = {'item.download': num_processes,
+                                    'item.download.segment': num_processes,
                                     'item.status_update': num_processes,
                                     'item.page': num_processes,
                                     'annotation.upload': num_processes,
                                     'annotation.download': num_processes,
                                     'annotation.update': num_processes,
                                     'entity.create': num_processes,
+                                    'command.wait': num_processes,
                                     'dataset.download': num_processes}
         # set logging level
         logging.getLogger(name='dtlpy').handlers[0].setLevel(logging._nameToLevel[self.verbose.logging_level.upper()])
@@ -660,6 +678,44 @@ class ApiClient:
         # self.event_tracker.start()
         self.upload_session_timeout = int(os.environ.get('UPLOAD_SESSION_TIMEOUT', 0))
         self.upload_chunk_timeout = int(os.environ.get('UPLOAD_CHUNK_TIMEOUT', 2 * 60))
+        # items upload concurrency (per event loop). adaptive - grow while uploads succeed and back off on throttling
+        self.upload_concurrency = int(os.environ.get('UPLOAD_CONCURRENCY', 5))
+        self.upload_max_concurrency = int(os.environ.get('UPLOAD_MAX_CONCURRENCY', 4 * self.upload_concurrency))
+        self.upload_adaptive_concurrency = os.environ.get('UPLOAD_ADAPTIVE_CONCURRENCY', 'false').lower() == 'true'
+        # large items are downloaded in parallel byte ranges - segment size, connections per item and minimal size
+        self.download_segment_size = int(os.environ.get('DOWNLOAD_SEGMENT_SIZE', 16 * 1024 * 1024))
+        self.download_max_segments = int(os.environ.get('DOWNLOAD_MAX_SEGMENTS', 8))
+        self.download_parallel_min_size = int(os.environ.get('DOWNLOAD_PARALLEL_MIN_SIZE', 64 * 1024 * 1024))
+        # content-addressed store of the downloaded items (dedupe across datasets). disabled if no path is set
+        self.blob_store_path = os.environ.get('BLOB_STORE_PATH', None)
+        self.blob_store_max_size = int(os.environ.get('BLOB_STORE_MAX_SIZE', 0))
+        self.blob_store_link_mode = os.environ.get('BLOB_STORE_LINK_MODE', 'auto')
+        self._blob_store = None
+        # external storage files are imported in batches - by number of files and request payload size
+        self.import_batch_size = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+        self.import_batch_bytes = int(os.environ.get('IMPORT_BATCH_BYTES', 1024 * 1024))
+        # pooled async connections (shared by all the async requests of an event loop)
+        self.async_connection_limit = int(os.environ.get('ASYNC_CONNECTION_LIMIT', 100))
+        self.async_connection_limit_per_host = int(os.environ.get('ASYNC_CONNECTION_LIMIT_PER_HOST', 0))
+        self.async_keepalive_timeout = float(os.environ.get('ASYNC_KEEPALIVE_TIMEOUT', 30))
+        self.async_dns_cache_ttl = int(os.environ.get('ASYNC_DNS_CACHE_TTL', 300))
+        # annotations upload - batches in flight (across all items) and retries of a failed batch
+        self.annotations_upload_max_in_flight = int(os.environ.get('ANNOTATIONS_UPLOAD_MAX_IN_FLIGHT',
+                                                                   self._num_processes))
+        self.annotations_upload_retries = int(os.environ.get('ANNOTATIONS_UPLOAD_RETRIES', 3))
+
+    @property
+    def blob_store(self):
+        """
+        Local content-addressed store of the downloaded items. None if BLOB_STORE_PATH is not set
+        """
+        if self._blob_store is None and self.blob_store_path:
+            with self.lock:
+                if self._blob_store is None:
+                    self._blob_store = BlobStore(path=self.blob_store_path,
+                                                 max_size=self.blob_store_max_size,
+                                                 link_mode=self.blob_store_link_mode)
+        return self._blob_store
 
     @property
     def event_loop(self):
@@ -703,7 +759,11 @@ class ApiClient:
             else:
                 raise Exception("config should be of type str or CacheConfig")
             try:
-                self.cache = CacheManger(cache_configs=[cache_config], bin_cache_size=self.sdk_cache.bin_size)
+                self.cache = CacheManger(cache_configs=[cache_config],
+                                         bin_cache_size=self.sdk_cache.bin_size,
+                                         memory_cache_items=int(os.environ.get('MEMORY_CACHE_ITEMS', 1000)),
+                                         memory_cache_size=int(os.environ.get('MEMORY_CACHE_SIZE', 64)),
+                                         memory_cache_ttl=int(os.environ.get('MEMORY_CACHE_TTL', 60)))
                 self.cache.ping()
                 self.sdk_cache.use_cache = True
             except Exception as e:
@@ -713,6 +773,7 @@ class ApiClient:
     def __del__(self):
         for name, pool in self._thread_pools.items():
             pool.shutdown()
+        self.close_async_sessions()
 
     def _build_request_headers(self, headers=None):
         if headers is None:
@@ -759,8 +820,64 @@ class ApiClient:
         self._thread_pools = dict()
         self.session = None
         self._event_loop = None
+        # the parent's sessions are bound to the parent's event loops - never reuse (or close) them
+        self._async_sessions = dict()
+        self._async_sessions_lock = threading.Lock()
         self.lock = threading.Lock()
 
+    def _get_async_session(self):
+        """
+        Get the pooled aiohttp session of the running event loop. Created on first use.
+
+        :return: aiohttp.ClientSession
+        """
+        self._check_fork()
+        loop = asyncio.get_running_loop()
+        with self._async_sessions_lock:
+            # drop sessions of loops that are already closed
+            for closed_loop in [l for l in self._async_sessions if l.is_closed()]:
+                self._async_sessions.pop(closed_loop)
+            session = self._async_sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(limit=self.async_connection_limit,
+                                                 limit_per_host=self.async_connection_limit_per_host,
+                                                 keepalive_timeout=self.async_keepalive_timeout,
+                                                 ttl_dns_cache=self.async_dns_cache_ttl,
+                                                 use_dns_cache=True)
+                # shared between all requests - cookies set by one response must not be sent with the others
+                session = aiohttp.ClientSession(connector=connector,
+                                                cookie_jar=aiohttp.DummyCookieJar(),
+                                                timeout=aiohttp.ClientTimeout(total=0))
+                self._async_sessions[loop] = session
+                if not self._async_sessions_atexit:
+                    self._async_sessions_atexit = True
+                    atexit.register(_close_async_sessions_at_exit, weakref.ref(self))
+        return session
+
+    def close_async_sessions(self):
+        """
+        Close all pooled aiohttp sessions (and their connections)
+        """
+        with self._async_sessions_lock:
+            sessions = self._async_sessions
+            self._async_sessions = dict()
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for loop, session in sessions.items():
+            if session.closed or loop.is_closed():
+                continue
+            try:
+                if loop is running_loop:
+                    loop.create_task(session.close())
+                elif loop.is_running():
+                    asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+                else:
+                    loop.run_until_complete(session.close())
+            except Exception as e:
+                logger.debug('Failed closing async session: {}'.format(e))
+
     def thread_pools(self, pool_name):
         self._check_fork()
         if pool_name not in self._thread_pools_names:
@@ -865,6 +982,15 @@ class ApiClient:
         assert isinstance(self._error_suppression, ErrorSuppression)
         return self._error_suppression
 
+    @property
+    def cache_stats(self):
+        """
+        Hit/miss/eviction statistics of the in-process entities cache (empty if the cache is off)
+        """
+        if self.cache is None:
+            return dict()
+        return self.cache.stats()
+
     @property
     def cache_state(self):
         if self._cache_state is None:
@@ -1020,7 +1146,7 @@ class ApiClient:
                                                  data=data)
         return curl
 
-    def _build_gen_request(self, req_type, path, headers, json_req, files, data):
+    def _prepare_request(self, req_type, path, headers, json_req, files, data):
         req_type = req_type.upper()
         valid_request_type = ['GET', 'DELETE', 'POST', 'PUT', 'PATCH']
         assert req_type in valid_request_type, '[ERROR] type: %s NOT in valid requests' % req_type
@@ -1033,16 +1159,36 @@ class ApiClient:
                                data=data,
                                headers=self._build_request_headers(headers=headers))
         # prepare to send
-        prepared = req.prepare()
-        # save curl for debug
+        return req.prepare()
+
+    @staticmethod
+    def _request_to_curl(prepared):
         command = "curl -X {method} -H {headers} -d '{data}' '{uri}'"
-        method = prepared.method
-        uri = prepared.url
-        data = prepared.body
         headers = ['"{0}: {1}"'.format(k, v) for k, v in prepared.headers.items()]
         headers = " -H ".join(headers)
-        curl = command.format(method=method, headers=headers, data=data, uri=uri)
-        return curl, prepared
+        return command.format(method=prepared.method, headers=headers, data=prepared.body, uri=prepared.url)
+
+    def _build_gen_request(self, req_type, path, headers, json_req, files, data):
+        prepared = self._prepare_request(req_type=req_type,
+                                         path=path,
+                                         headers=headers,
+                                         json_req=json_req,
+                                         files=files,
+                                         data=data)
+        return self._request_to_curl(prepared), prepared
+
+    @property
+    def last_curl(self):
+        """
+        curl command of the last request (built on first access)
+        """
+        if self._last_curl is None and isinstance(self.last_request, requests.PreparedRequest):
+            self._last_curl = self._request_to_curl(self.last_request)
+        return self._last_curl
+
+    @last_curl.setter
+    def last_curl(self, curl):
+        self._last_curl = curl
 
     def _convert_json_to_response(self, response_json):
         the_response = Response()
@@ -1179,13 +1325,14 @@ class ApiClient:
         :param log_error: if true - print the error log of the request
         :return:
         """
-        curl, prepared = self._build_gen_request(req_type=req_type,
-                                                 path=path,
-                                                 headers=headers,
-                                                 json_req=json_req,
-                                                 files=files,
-                                                 data=data)
-        self.last_curl = curl
+        prepared = self._prepare_request(req_type=req_type,
+                                         path=path,
+                                         headers=headers,
+                                         json_req=json_req,
+                                         files=files,
+                                         data=data)
+        # the debug curl is built from the last request only when accessed
+        self.last_curl = None
         self.last_request = prepared
         # send request
         try:
@@ -1250,21 +1397,15 @@ class ApiClient:
                                headers=headers_req)
         # prepare to send
         prepared = req.prepare()
-        # save curl for debug
-        command = "curl -X {method} -H {headers} -d '{data}' '{uri}'"
-        headers = ['"{0}: {1}"'.format(k, v) for k, v in prepared.headers.items()]
-        headers = " -H ".join(headers)
-        curl = command.format(method=prepared.method,
-                              headers=headers,
-                              data=prepared.body,
-                              uri=prepared.url)
-        self.last_curl = curl
+        # the debug curl is built from the last request only when accessed
+        self.last_curl = None
         self.last_request = prepared
         # send request
+        response = None
+        tic = time.time()
         try:
             timeout = aiohttp.ClientTimeout(total=0)
-            async with RetryClient(headers=headers_req,
-                                   timeout=timeout) as session:
+            async with RetryClient(client_session=self._get_async_session()) as session:
                 try:
                     async with session._request(request=session._client.request,
                                                 url=self.base_gate_url + path,
@@ -1272,6 +1413,7 @@ class ApiClient:
                                                 json=json_req,
                                                 data=data,
                                                 headers=headers_req,
+                                                timeout=timeout,
                                                 chunked=stream,
                                                 retry_attempts=5,
                                                 ssl=self.verify,
@@ -1317,8 +1459,11 @@ class ApiClient:
                 except Exception as err:
                     response = AsyncResponseError(error=err, trace=traceback.format_exc())
                 finally:
-                    with threadLock:
-                        self.calls_counter.add()
+                    self._record_request(method=req_type,
+                                         path=path,
+                                         response=response,
+                                         tic=tic,
+                                         bytes_sent=self._body_size(prepared.body))
         except Exception:
             logger.error(self.print_request(req=prepared, to_return=True))
             raise
@@ -1373,51 +1518,58 @@ class ApiClient:
                     pass
 
         timeout = aiohttp.ClientTimeout(total=self.upload_session_timeout)
-        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-            try:
-                form = aiohttp.FormData({})
-                form.add_field('type', item_type)
-                form.add_field('path', os.path.join(remote_path, uploaded_filename).replace('\\', '/'))
-                if item_metadata is not None:
-                    form.add_field('metadata', json.dumps(item_metadata))
-                if item_description is not None:
-                    form.add_field('description', item_description)
-                form.add_field('file', AsyncUploadStream(buffer=to_upload,
-                                                         callback=callback,
-                                                         name=uploaded_filename,
-                                                         chunk_timeout=self.upload_chunk_timeout))
-                url = '{}?mode={}'.format(self.base_gate_url + remote_url, mode)
-
-                # use SSL context
-                ssl_context = None
-                if self.use_ssl_context:
-                    ssl_context = ssl.create_default_context(cafile=certifi.where())
-                async with session.post(url,
-                                        data=form,
-                                        verify_ssl=self.verify,
-                                        ssl=ssl_context) as resp:
-                    self.last_request = resp.request_info
-                    command = "curl -X {method} -H {headers} -d '{uri}'"
-                    headers = ['"{0}: {1}"'.format(k, v) for k, v in resp.request_info.headers.items()]
-                    headers = " -H ".join(headers)
-                    self.last_curl = command.format(method=resp.request_info.method,
-                                                    headers=headers,
-                                                    uri=resp.request_info.url)
-                    text = await resp.text()
-                    try:
-                        _json = await resp.json()
-                    except:
-                        _json = dict()
-                    response = AsyncResponse(text=text,
-                                             _json=_json,
-                                             async_resp=resp)
-            except Exception as err:
-                response = AsyncResponseError(error=err, trace=traceback.format_exc())
-            finally:
-                if pbar is not None:
-                    pbar.close()
-                with threadLock:
-                    self.calls_counter.add()
+        session = self._get_async_session()
+        response = None
+        tic = time.time()
+        try:
+            form = aiohttp.FormData({})
+            form.add_field('type', item_type)
+            form.add_field('path', os.path.join(remote_path, uploaded_filename).replace('\\', '/'))
+            if item_metadata is not None:
+                form.add_field('metadata', json.dumps(item_metadata))
+            if item_description is not None:
+                form.add_field('description', item_description)
+            form.add_field('file', AsyncUploadStream(buffer=to_upload,
+                                                     callback=callback,
+                                                     name=uploaded_filename,
+                                                     chunk_timeout=self.upload_chunk_timeout))
+            url = '{}?mode={}'.format(self.base_gate_url + remote_url, mode)
+
+            # use SSL context
+            ssl_context = None
+            if self.use_ssl_context:
+                ssl_context = ssl.create_default_context(cafile=certifi.where())
+            async with session.post(url,
+                                    data=form,
+                                    headers=headers,
+                                    timeout=timeout,
+                                    verify_ssl=self.verify,
+                                    ssl=ssl_context) as resp:
+                self.last_request = resp.request_info
+                command = "curl -X {method} -H {headers} -d '{uri}'"
+                headers = ['"{0}: {1}"'.format(k, v) for k, v in resp.request_info.headers.items()]
+                headers = " -H ".join(headers)
+                self.last_curl = command.format(method=resp.request_info.method,
+                                                headers=headers,
+                                                uri=resp.request_info.url)
+                text = await resp.text()
+                try:
+                    _json = await resp.json()
+                except:
+                    _json = dict()
+                response = AsyncResponse(text=text,
+                                         _json=_json,
+                                         async_resp=resp)
+        except Exception as err:
+            response = AsyncResponseError(error=err, trace=traceback.format_exc())
+        finally:
+            if pbar is not None:
+                pbar.close()
+            self._record_request(method='POST',
+                                 path=remote_url,
+                                 response=response,
+                                 tic=tic,
+                                 bytes_sent=item_size)
         if response.ok and self.cache is not None:
             try:
                 self.cache.write(list_entities_json=[response.json()])
@@ -1470,12 +1622,48 @@ class ApiClient:
                                   pool_connections=np.sum(list(self._thread_pools_names.values())))
             self.session.mount('http://', adapter)
             self.session.mount('https://', adapter)
-        resp = self.session.send(request=prepared, stream=stream, verify=self.verify, timeout=120)
+        tic = time.time()
+        resp = None
+        try:
+            resp = self.session.send(request=prepared, stream=stream, verify=self.verify, timeout=120)
+        finally:
+            self._record_request(method=prepared.method,
+                                 path=prepared.path_url,
+                                 response=resp,
+                                 tic=tic,
+                                 bytes_sent=self._body_size(prepared.body))
+        return resp
 
-        with threadLock:
-            self.calls_counter.add()
+    @staticmethod
+    def _body_size(body):
+        if isinstance(body, (bytes, str)):
+            return len(body)
+        return 0
 
-        return resp
+    def _record_request(self, method, path, response, tic, bytes_sent=0):
+        """
+        Count the request and add it to the requests metrics
+        """
+        self.calls_counter.add()
+        status_code = getattr(response, 'status_code', None)
+        bytes_received = 0
+        if response is not None:
+            try:
+                content_length = response.headers.get('content-length')
+                if content_length is not None:
+                    bytes_received = int(content_length)
+                elif isinstance(getattr(response, '_content', None), bytes):
+                    bytes_received = len(response._content)
+                elif isinstance(getattr(response, 'text', None), str):
+                    bytes_received = len(response.text)
+            except Exception:
+                pass
+        self.metrics.record(method=method,
+                            path=path,
+                            status_code=status_code,
+                            latency=time.time() - tic,
+                            bytes_sent=bytes_sent,
+                            bytes_received=bytes_received)
 
     @staticmethod
     def check_proxy():
@@ -1511,24 +1699,12 @@ class ApiClient:
         :param t: time ahead interval in seconds
         """
         try:
-            if self.token is None or self.token == '':
+            token = self.token
+            if token is None or token == '':
                 expired = True
             else:
-                # oxsec-disable jwt-signature-disabled - Client-side SDK: signature verification disabled intentionally to check token expiration; server validates on API calls
-                payload = jwt.decode(
-                    self.token,
-                    options={
-                        "verify_signature": False,
-                        "verify_exp": False,
-                        "verify_aud": False,
-                        "verify_iss": False,
-                    }
-                )
-                d = datetime.datetime.now(datetime.timezone.utc)
-                epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
-                now = (d - epoch).total_seconds()
-                exp = payload['exp']
-                if now < (exp - t):
+                exp = self._get_token_expiration(token=token)
+                if time.time() < (exp - t):
                     expired = False
                 else:
                     expired = True
@@ -1543,6 +1719,26 @@ class ApiClient:
                 expired = False
         return expired
 
+    def _get_token_expiration(self, token):
+        """
+        Expiration (epoch seconds) of the token - decoded once per token
+        """
+        cached_token, exp = self._token_expiration
+        if cached_token != token:
+            # oxsec-disable jwt-signature-disabled - Client-side SDK: signature verification disabled intentionally to check token expiration; server validates on API calls
+            payload = jwt.decode(
+                token,
+                options={
+                    "verify_signature": False,
+                    "verify_exp": False,
+                    "verify_aud": False,
+                    "verify_iss": False,
+                }
+            )
+            exp = payload['exp']
+            self._token_expiration = (token, exp)
+        return exp
+
     @staticmethod
     def is_json_serializable(response):
         try:
@@ -1561,10 +1757,13 @@ class ApiClient:
         :return:
         """
         try:
+            if not self.verbose.print_all_responses:
+                # nothing to print - don't parse the response
+                return
             if resp is None:
                 resp = self.last_response
             is_json_serializable, results = self.is_json_serializable(response=resp)
-            if self.verbose.print_all_responses and is_json_serializable:
+            if is_json_serializable:
                 if isinstance(results, dict):
                     to_print = miscellaneous.List([results])
                 elif isinstance(results, list):
@@ -1,6 +1,7 @@
 import threading
 import asyncio
 import logging
+import time
 import io
 
 logger = logging.getLogger(name='dtlpy')
@@ -42,10 +43,90 @@ class AsyncThreadEventLoop(threading.Thread):
             self._semaphores[name] = asyncio.BoundedSemaphore(n)
         return self._semaphores[name]
 
+    def adaptive_semaphore(self, name, limit, max_limit=None, adaptive=False):
+        """
+        Get (or create) a named AdaptiveSemaphore. Must be called from the event loop thread.
+        The configuration of an existing semaphore is updated if changed
+        """
+        semaphore = self._semaphores.get(name)
+        if not isinstance(semaphore, AdaptiveSemaphore):
+            semaphore = AdaptiveSemaphore(limit=limit, max_limit=max_limit, adaptive=adaptive)
+            self._semaphores[name] = semaphore
+        else:
+            semaphore.configure(limit=limit, max_limit=max_limit, adaptive=adaptive)
+        return semaphore
+
     def stop(self):
         self.loop.call_soon_threadsafe(self.loop.stop)  # here
 
 
+class AdaptiveSemaphore:
+    """
+    asyncio concurrency limit that can change while running.
+    With adaptive=True the limit grows by one after `limit` successful calls (up to max_limit) and is halved when
+    the server throttles or fails (down to 1) - additive increase, multiplicative decrease.
+    Decreases are at most once per `cooldown` seconds, so a burst of failures of the same congestion counts once.
+    """
+
+    def __init__(self, limit, max_limit=None, adaptive=False, cooldown=1):
+        self._condition = asyncio.Condition()
+        self._in_use = 0
+        self._successes = 0
+        self._last_decrease = 0
+        self.cooldown = cooldown
+        self._config = None
+        self.configure(limit=limit, max_limit=max_limit, adaptive=adaptive)
+
+    def configure(self, limit, max_limit=None, adaptive=False):
+        if (limit, max_limit, adaptive) == self._config:
+            return
+        self._config = (limit, max_limit, adaptive)
+        self.limit = max(1, limit)
+        self.max_limit = max(self.limit, max_limit if max_limit is not None else 4 * self.limit)
+        self.adaptive = adaptive
+
+    @property
+    def in_use(self):
+        return self._in_use
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+    async def release(self):
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify(max(1, self.limit - self._in_use))
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+    def on_success(self):
+        if not self.adaptive:
+            return
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self._successes = 0
+            self.limit += 1
+            logger.debug('AdaptiveSemaphore: limit increased to {}'.format(self.limit))
+
+    def on_throttle(self):
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self.limit = max(1, self.limit // 2)
+        logger.debug('AdaptiveSemaphore: limit decreased to {}'.format(self.limit))
+
+
 class AsyncResponse:
     def __init__(self, text, _json, async_resp):
         self.text = text
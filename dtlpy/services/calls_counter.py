@@ -1,37 +1,183 @@
+import threading
+import weakref
+import copy
+import atexit
+import bisect
+import time
+import re
+
 from .cookie import CookieIO
 
+# ids in the request path are replaced so calls are grouped by endpoint (e.g /items/{id}/annotations)
+_PATH_ID_REGEX = re.compile(r'/(?:[0-9a-fA-F]{24}|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-'
+                            r'[0-9a-fA-F]{12}|\d+)(?=/|$)')
+# latency histogram buckets upper bounds, in seconds (last bucket is +inf)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _flush_at_exit(counter_ref):
+    counter = counter_ref()
+    if counter is not None:
+        counter.flush()
+
+
+def _merge_counts(base, shard):
+    base[0] += shard[0]
+
+
+def _merge_metrics(base, shard):
+    for key, values in list(shard.items()):
+        total = base.get(key)
+        if total is None:
+            total = base[key] = [0, 0, 0, 0, 0., [0] * (len(LATENCY_BUCKETS) + 1)]
+        for i_value in range(5):
+            total[i_value] += values[i_value]
+        total[5] = [a + b for a, b in zip(total[5], values[5])]
+
+
+class _Shards:
+    """
+    Per thread values. each thread updates only its own shard, so no lock is needed on the hot path.
+    Reading sums all the shards (a lock is taken only to register a new thread).
+    The shards of threads that ended are merged into a base shard, so short-lived threads do not pile up
+    """
+
+    def __init__(self, factory, merge):
+        self._factory = factory
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._base = factory()
+        # list of (thread weak reference, shard)
+        self._shards = list()
+
+    def get(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._factory()
+            self._local.shard = shard
+            with self._lock:
+                self._merge_ended()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    @staticmethod
+    def _is_alive(thread_ref):
+        thread = thread_ref()
+        return thread is not None and thread.is_alive()
+
+    def _merge_ended(self):
+        """
+        Merge the shards of the threads that ended into the base (the lock must be held).
+        A thread that ended does not update its shard anymore
+        """
+        alive = list()
+        ended = list()
+        for thread_ref, shard in self._shards:
+            if self._is_alive(thread_ref):
+                alive.append((thread_ref, shard))
+            else:
+                ended.append(shard)
+        if len(ended) == 0:
+            return
+        # a new base - readers may still be summing the current one
+        base = copy.deepcopy(self._base)
+        for shard in ended:
+            self._merge(base, shard)
+        self._base = base
+        self._shards = alive
+
+    def all(self):
+        with self._lock:
+            self._merge_ended()
+            return [self._base] + [shard for _, shard in self._shards]
+
+    def clear(self):
+        with self._lock:
+            self._base = self._factory()
+            self._shards = list()
+            self._local = threading.local()
+
 
 class CallsCounter:
-    def __init__(self, filepath):
+    def __init__(self, filepath, flush_interval=30):
+        """
+        Count the API calls. Calls are counted in memory (per thread) and added to the counter file
+        every flush_interval seconds and on exit.
+
+        :param str filepath: counter file path
+        :param float flush_interval: seconds between writes of the counter file
+        """
         self.io = CookieIO(filepath)
         self.state = 'off'
-        self.number = 0
+        self.flush_interval = flush_interval
+        self._shards = _Shards(factory=lambda: [0], merge=_merge_counts)
+        self._flushed = 0
+        self._file_number = 0
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
         self.load()
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @property
+    def number(self):
+        """
+        Number of calls - from the counter file plus the calls of this process that were not flushed yet
+        """
+        return self._file_number + self._pending()
+
+    def _pending(self):
+        return sum(shard[0] for shard in self._shards.all()) - self._flushed
 
     def add(self):
         if self.state == 'on':
-            self.load()
-            self.number += 1
+            self._shards.get()[0] += 1
+            if time.monotonic() - self._last_flush > self.flush_interval:
+                self.flush(blocking=False)
+
+    def flush(self, blocking=True):
+        """
+        Add the in-memory counts to the counter file
+
+        :param bool blocking: wait if another thread is flushing. otherwise skip
+        """
+        if not self._flush_lock.acquire(blocking=blocking):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            pending = self._pending()
+            if pending == 0:
+                return
+            calls = self.io.get('calls_counter')
+            number = calls['number'] if calls is not None else 0
+            self._flushed += pending
+            self._file_number = number + pending
             self.save()
+        finally:
+            self._flush_lock.release()
 
     def reset(self):
-        self.number = 0
-        self.save()
+        with self._flush_lock:
+            self._shards.clear()
+            self._flushed = 0
+            self._file_number = 0
+            self.save()
 
     def save(self):
         self.io.put('calls_counter', {'state': self.state,
-                                      'number': self.number})
+                                      'number': self._file_number})
 
     def on(self):
         self.state = 'on'
         self.save()
 
     def off(self):
+        self.flush()
         self.state = 'off'
         self.save()
 
     def on_exit(self):
-        self.save()
+        self.flush()
 
     def load(self):
         calls = self.io.get('calls_counter')
@@ -41,4 +187,108 @@ class CallsCounter:
                      'number': 0}
             self.io.put('calls_counter', calls)
         self.state = calls['state']
-        self.number = calls['number']
+        self._file_number = calls['number']
+
+
+class RequestsMetrics:
+    def __init__(self):
+        """
+        In-memory metrics of the API requests, grouped by method and endpoint:
+        calls, errors, bytes sent and received and a latency histogram.
+        Each thread records to its own shard - the totals are merged on read.
+        """
+        self._shards = _Shards(factory=dict, merge=_merge_metrics)
+
+    @staticmethod
+    def endpoint(path):
+        """
+        Normalize a request path to its endpoint - remove the host and query and replace the ids
+
+        :param str path: request path or url
+        :return: endpoint
+        """
+        path = path.split('?', 1)[0]
+        if '://' in path:
+            path = '/' + path.split('://', 1)[1].split('/', 1)[-1]
+        return _PATH_ID_REGEX.sub('/{id}', path)
+
+    def record(self, method, path, status_code, latency, bytes_sent=0, bytes_received=0):
+        """
+        Record a single request
+
+        :param str method: request method
+        :param str path: request path or url
+        :param int status_code: response status code
+        :param float latency: request duration in seconds
+        :param int bytes_sent: request body size
+        :param int bytes_received: response body size
+        """
+        shard = self._shards.get()
+        key = (method.upper(), self.endpoint(path))
+        values = shard.get(key)
+        if values is None:
+            # calls, errors, bytes sent, bytes received, total latency, histogram
+            values = shard[key] = [0, 0, 0, 0, 0., [0] * (len(LATENCY_BUCKETS) + 1)]
+        values[0] += 1
+        if status_code is None or status_code >= 400:
+            values[1] += 1
+        values[2] += bytes_sent or 0
+        values[3] += bytes_received or 0
+        values[4] += latency
+        values[5][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    @staticmethod
+    def _percentile(histogram, count, q):
+        """
+        Upper bound of the histogram bucket that holds the q quantile
+        """
+        rank = q * count
+        cumulative = 0
+        for i_bucket, bucket_count in enumerate(histogram):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS[i_bucket] if i_bucket < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+    def summary(self):
+        """
+        Metrics per endpoint
+
+        :return: dict of '<METHOD> <endpoint>' to its metrics. latencies are in seconds,
+         p50/p95/p99 are the upper bounds of the histogram buckets
+        :rtype: dict
+        """
+        merged = dict()
+        for shard in self._shards.all():
+            _merge_metrics(merged, shard)
+        summary = dict()
+        for (method, endpoint), (calls, errors, bytes_sent, bytes_received, latency, histogram) in sorted(
+                merged.items()):
+            summary['{} {}'.format(method, endpoint)] = {
+                'calls': calls,
+                'errors': errors,
+                'bytes_sent': bytes_sent,
+                'bytes_received': bytes_received,
+                'latency_mean': latency / calls if calls > 0 else 0,
+                'latency_p50': self._percentile(histogram, calls, 0.5),
+                'latency_p95': self._percentile(histogram, calls, 0.95),
+                'latency_p99': self._percentile(histogram, calls, 0.99),
+                'latency_histogram': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['inf'], histogram))
+            }
+        return summary
+
+    def totals(self):
+        """
+        Metrics of all the endpoints together
+
+        :return: dict of calls, errors, bytes sent and bytes received
+        :rtype: dict
+        """
+        totals = {'calls': 0, 'errors': 0, 'bytes_sent': 0, 'bytes_received': 0}
+        for metrics in self.summary().values():
+            for key in totals:
+                totals[key] += metrics[key]
+        return totals
+
+    def reset(self):
+        self._shards.clear()
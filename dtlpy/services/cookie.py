@@ -2,6 +2,10 @@
 Dataloop cookie state
 """
 
+import threading
+import weakref
+import atexit
+import copy
 import os
 import time
 import json
@@ -15,21 +19,48 @@ logger = logging.getLogger(name='dtlpy')
 NUM_TRIES = 3
 
 
+def _flush_at_exit(cookie_ref):
+    cookie = cookie_ref()
+    if cookie is not None:
+        cookie.flush()
+
+
 class CookieIO:
     """
-    Cookie interface for Dataloop parameters
+    Cookie interface for Dataloop parameters.
+
+    The file is loaded once and kept in memory - it is read again only when it was changed by another
+    process (by its modification time). Writes replace the file atomically (write to a temp file and rename),
+    so reading does not need the file lock.
     """
 
-    def __init__(self, path, create=True, local=False):
+    def __init__(self, path, create=True, local=False, write_delay=0, read_only=False):
+        """
+        :param str path: cookie file path
+        :param bool create: create the file if not exists
+        :param bool local: local (working directory) state cookie
+        :param float write_delay: seconds to hold the changes in memory before writing them (together) to the file.
+         0 to write on each put. pending changes are written on exit
+        :param bool read_only: never write the file - changes are kept in memory only
+        """
         self.COOKIE = path
         self.local = local
+        self.write_delay = write_delay
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._cfg = None
+        self._stat = None
+        self._dirty = dict()
+        self._timer = None
+        self._pid = os.getpid()
+        self._atexit = False
         if create:
             self.create()
 
     @staticmethod
-    def init():
+    def init(write_delay=0, read_only=False):
         global_cookie_file = os.path.join(DATALOOP_PATH, 'cookie.json')
-        return CookieIO(global_cookie_file)
+        return CookieIO(global_cookie_file, write_delay=write_delay, read_only=read_only)
 
     @staticmethod
     def init_local_cookie(create=False):
@@ -42,6 +73,8 @@ class CookieIO:
         return CookieIO(package_json_file, create=create, local=True)
 
     def create(self):
+        if self.read_only:
+            return
         # create directory '.dataloop' if not exists
         if not os.path.isdir(os.path.dirname(self.COOKIE)):
             os.makedirs(os.path.dirname(self.COOKIE))
@@ -50,66 +83,170 @@ class CookieIO:
             logger.debug('COOKIE.create: File: {}'.format(self.COOKIE))
             self.reset()
         try:
-            with FileLock(self.COOKIE + ".lock"):
-                with open(self.COOKIE, 'r') as f:
-                    json.load(f)
+            with self._lock:
+                self._load()
         except ValueError:
             print('FATAL ERROR: COOKIE {!r} is corrupted. please fix or delete the file.'.format(self.COOKIE))
             raise SystemExit
 
-    def read_json(self, create=False):
-        # which cookie
-        if self.local:
-            self.COOKIE = os.path.join(os.getcwd(), '.dataloop', 'state.json')
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.COOKIE)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read_file(self):
+        cfg = {}
+        for i in range(NUM_TRIES):
+            try:
+                with open(self.COOKIE, 'r') as fp:
+                    cfg = json.load(fp)
+                break
+            except FileNotFoundError:
+                break
+            except Exception:
+                # e.g. written in place by an older version - try again
+                if i == (NUM_TRIES - 1):
+                    raise
+                time.sleep(random.random())
+                continue
+        return cfg
 
-        # check if file exists - and create
-        if not os.path.isfile(self.COOKIE) and create:
-            self.create()
+    def _write_file(self, cfg):
+        temp_path = '{}.{}.{}.tmp'.format(self.COOKIE, os.getpid(), threading.get_ident())
+        try:
+            with open(temp_path, 'w') as fp:
+                json.dump(cfg, fp, indent=2)
+            os.replace(temp_path, self.COOKIE)
+        finally:
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+
+    def _load(self):
+        """
+        Get the in-memory cookie. read the file again only if it was changed since the last read
+        (the lock must be held)
+        """
+        stat = self._file_stat()
+        if self._cfg is None or stat != self._stat:
+            cfg = self._read_file() if stat is not None else {}
+            # changes that were not written yet override the file
+            cfg.update(self._dirty)
+            self._cfg = cfg
+            self._stat = stat
+        return self._cfg
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._lock = threading.RLock()
+            self._timer = None
 
-        # check if file exists
-        if not os.path.isfile(self.COOKIE):
-            logger.debug('COOKIE.read: File does not exist: {}. Return None'.format(self.COOKIE))
-            cfg = {}
-        else:
-            # read cookie
-            cfg = {}
-            for i in range(NUM_TRIES):
-                try:
-                    with FileLock(self.COOKIE + ".lock"):
-                        with open(self.COOKIE, 'r') as fp:
-                            cfg = json.load(fp)
-                    break
-                except Exception:
-                    if i == (NUM_TRIES - 1):
-                        raise
-                    time.sleep(random.random())
-                    continue
-        return cfg
+    def read_json(self, create=False):
+        self._check_fork()
+        with self._lock:
+            # which cookie
+            if self.local:
+                cookie = os.path.join(os.getcwd(), '.dataloop', 'state.json')
+                if cookie != self.COOKIE:
+                    self.COOKIE = cookie
+                    self._cfg = None
+                    self._dirty = dict()
+
+            # check if file exists - and create
+            if not os.path.isfile(self.COOKIE) and create:
+                self.create()
+
+            # check if file exists
+            if not os.path.isfile(self.COOKIE) and len(self._dirty) == 0:
+                logger.debug('COOKIE.read: File does not exist: {}. Return None'.format(self.COOKIE))
+            return copy.deepcopy(self._load())
 
     def get(self, key):
         if key not in ['calls_counter']:
             # ignore logging for some keys
             logger.debug('COOKIE.read: key: {}'.format(key))
-        cfg = self.read_json()
-        if key in cfg.keys():
-            value = cfg[key]
-        else:
-            logger.debug(msg='Key not in platform cookie file: {}. Return None'.format(key))
-            value = None
+        self._check_fork()
+        with self._lock:
+            if self.local:
+                cfg = self.read_json()
+            else:
+                cfg = self._load()
+            if key in cfg.keys():
+                # a copy - changes to the value are saved only with put
+                value = copy.deepcopy(cfg[key])
+            else:
+                logger.debug(msg='Key not in platform cookie file: {}. Return None'.format(key))
+                value = None
         return value
 
     def put(self, key, value):
         if key not in ['calls_counter']:
             # ignore logging for some keys
             logger.debug('COOKIE.write: key: {}'.format(key))
-        # read and write
-        cfg = self.read_json(create=True)
-        cfg[key] = value
-        with FileLock(self.COOKIE + ".lock"):
-            with open(self.COOKIE, 'w') as fp:
-                json.dump(cfg, fp, indent=2)
+        self._check_fork()
+        with self._lock:
+            if not self.read_only and not os.path.isfile(self.COOKIE):
+                self.create()
+            value = copy.deepcopy(value)
+            self._dirty[key] = value
+            self._load()[key] = value
+            if self.read_only:
+                return
+            if self.write_delay > 0:
+                self._schedule_flush()
+                return
+        self.flush()
+
+    def _schedule_flush(self):
+        if not self._atexit:
+            self._atexit = True
+            atexit.register(_flush_at_exit, weakref.ref(self))
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Write the pending changes to the file
+        """
+        if self.read_only:
+            return
+        self._check_fork()
+        with self._lock:
+            self._timer = None
+            if len(self._dirty) == 0:
+                return
+            dirty = self._dirty
+            self._dirty = dict()
+        try:
+            with FileLock(self.COOKIE + ".lock"):
+                # read the file again - keep the changes of other processes
+                cfg = self._read_file()
+                cfg.update(dirty)
+                self._write_file(cfg)
+                stat = self._file_stat()
+        except Exception:
+            with self._lock:
+                # keep the changes for the next flush
+                dirty.update(self._dirty)
+                self._dirty = dirty
+            raise
+        with self._lock:
+            # changes that were made while writing are still pending
+            cfg.update(self._dirty)
+            self._cfg = cfg
+            self._stat = stat
 
     def reset(self):
-        with FileLock(self.COOKIE + ".lock"):
-            with open(self.COOKIE, 'w') as fp:
-                json.dump({}, fp, indent=2)
+        self._check_fork()
+        with self._lock:
+            self._dirty = dict()
+            self._cfg = {}
+            if self.read_only:
+                return
+            with FileLock(self.COOKIE + ".lock"):
+                self._write_file({})
+                self._stat = self._file_stat()
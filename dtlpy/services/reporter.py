@@ -5,7 +5,6 @@ import threading
 from .. import services
 from .. import exceptions
 import logging
-from ..caches import dl_cache
 
 logger = logging.getLogger(name='dtlpy')
 CHUNK = 200000
@@ -58,6 +57,7 @@ class Reporter:
 
     def build_cache(self):
         if self.cache_mode:
+            from ..caches import dl_cache
             try:
                 self._reports = {'errors': dl_cache.DiskCache('errors-' + self.key),
                                  'output': dl_cache.DiskCache('output-' + self.key),
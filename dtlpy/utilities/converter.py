@@ -54,7 +54,7 @@ class COCOUtils:
     @staticmethod
     def polygon_to_rle(geo, height, width):
         segmentation = [float(n) for n in geo.flatten()]
-        area = np.sum(entities.Segmentation.from_polygon(geo=geo, label=None, shape=(height, width)).geo > 0)
+        area = entities.Segmentation.from_polygon(geo=geo, label=None, shape=(height, width)).area
         return [segmentation], int(area)
 
     @staticmethod
@@ -1534,8 +1534,13 @@ class Converter:
             area = float(h * w)
             if annotation.type == 'binary':
                 # segmentation = COCOUtils.binary_mask_to_rle(binary_mask=annotation.geo, height=height, width=width)
-                segmentation = COCOUtils.binary_mask_to_rle_encode(binary_mask=annotation.geo)
-                area = int(annotation.geo.sum())
+                # full size mask for the rle, without keeping it on the annotation
+                definition = annotation.annotation_definition
+                mask_left, mask_top, mask = definition.cropped_mask
+                binary_mask = np.zeros(definition.shape, dtype=np.uint8)
+                binary_mask[mask_top:mask_top + mask.shape[0], mask_left:mask_left + mask.shape[1]] = mask > 0
+                segmentation = COCOUtils.binary_mask_to_rle_encode(binary_mask=binary_mask)
+                area = definition.area
                 iscrowd = 1
             elif annotation.type in ['segment']:
                 segmentation, area = COCOUtils.polygon_to_rle(geo=annotation.geo, height=height, width=width)